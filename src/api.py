@@ -1,17 +1,45 @@
 # src/api.py
 from __future__ import annotations
 
+import hashlib
+import hmac
 import json
+import os
+import queue
+import threading
 import time
 import logging
+from collections import OrderedDict
+from concurrent.futures import Future
+from contextlib import asynccontextmanager, contextmanager
 from pathlib import Path
-from typing import Optional
+from typing import Any, AsyncIterator, Callable, Dict, List, NamedTuple, Optional
+
+_IMPORT_T0 = time.perf_counter()  # início do import do app (base do tempo de startup / TTFB)
 
 import joblib
 import numpy as np
 import pandas as pd
-from fastapi import FastAPI, Request
-from pydantic import BaseModel, Field
+import scipy.sparse as sp
+from fastapi import FastAPI, HTTPException, Request, Response
+from fastapi.responses import StreamingResponse
+from starlette.concurrency import run_in_threadpool
+from pydantic import BaseModel, Field, ValidationError, model_validator
+from sklearn.feature_extraction.text import CountVectorizer, TfidfVectorizer
+from sklearn.preprocessing import normalize
+
+from src.compiled_scorer import (
+    COMPILED_MODEL_FILE,
+    SHARED_MODEL_FILE,
+    CompiledScorer,
+    concat_cand_part,
+    file_sha256,
+)
+from src.candidate_index import CANDIDATE_INDEX_FILE, CandidateIndex
+from src.feature_store import FEATURE_STORE_FILE, FeatureStore
+from src.serving_metrics import CONTENT_TYPE as METRICS_CONTENT_TYPE
+from src.serving_metrics import Counter as MetricCounter, Gauge, Histogram, Registry
+from src.text_utils import tokenize
 
 # --------------------------------------------------------------------------------------
 # Configs e caminhos
@@ -22,10 +50,127 @@ DATA_DIR = ROOT / "data"
 THRESHOLD_FILE = MODELS_DIR / "decision_threshold.json"
 
 DEFAULT_THRESHOLD = 0.59
+MAX_BATCH_ITEMS = 1000
+
+
+def _env_int(name: str, default: int) -> int:
+    try:
+        return int(os.environ.get(name, default))
+    except ValueError:
+        return default
+
+
+def _env_flag(name: str, default: bool = False) -> bool:
+    raw = os.environ.get(name)
+    if raw is None:
+        return default
+    return raw.strip().lower() in {"1", "true", "yes", "on"}
+
+
+# Scorer compilado (src/compiled_scorer.py) tem prioridade quando existe e veio do pipeline atual (source_digest)
+COMPILED_MODEL_ENABLED = _env_flag("COMPILED_MODEL_ENABLED", True)
+
+# Vários workers (src/serve.py): scorer em layout só-arrays aberto com mmap, páginas compartilhadas entre processos
+MODEL_MMAP_ENABLED = _env_flag("MODEL_MMAP_ENABLED")
+
+# Micro-batching (opt-in): agrupa /predict concorrentes numa única chamada ao pipeline
+MICROBATCH_ENABLED = _env_flag("MICROBATCH_ENABLED")
+MICROBATCH_MAX_SIZE = _env_int("MICROBATCH_MAX_SIZE", 32)
+MICROBATCH_MAX_WAIT_US = _env_int("MICROBATCH_MAX_WAIT_US", 2000)
+MICROBATCH_MAX_QUEUE = _env_int("MICROBATCH_MAX_QUEUE", 1024)
+MICROBATCH_RESULT_TIMEOUT_S = 30.0
+
+# Cache de predições (0 desliga): LRU limitado por tamanho + TTL em segundos
+PREDICT_CACHE_SIZE = _env_int("PREDICT_CACHE_SIZE", 4096)
+PREDICT_CACHE_TTL_S = _env_int("PREDICT_CACHE_TTL_S", 300)
+
+# Streaming NDJSON: linhas pontuadas em blocos de tamanho fixo (memória constante)
+STREAM_CHUNK_SIZE = _env_int("STREAM_CHUNK_SIZE", 256)
+MAX_STREAM_LINE_BYTES = _env_int("MAX_STREAM_LINE_BYTES", 1 << 20)
+
+# Registro de vagas (POST /jobs): texto tokenizado/vetorizado uma vez, LRU limitado
+JOBS_REGISTRY_SIZE = _env_int("JOBS_REGISTRY_SIZE", 10000)
+
+# Feature store (src/feature_store.py) para /predict_by_ids; LRU só das chaves quentes
+FEATURE_STORE_PATH = Path(os.environ.get("FEATURE_STORE_PATH", FEATURE_STORE_FILE))
+FEATURE_STORE_CACHE_SIZE = _env_int("FEATURE_STORE_CACHE_SIZE", 4096)
+
+# Recuperação top-K (POST /retrieve): índice invertido -> shortlist -> modelo completo
+CANDIDATE_INDEX_PATH = Path(os.environ.get("CANDIDATE_INDEX_PATH", CANDIDATE_INDEX_FILE))
+RETRIEVAL_SHORTLIST = _env_int("RETRIEVAL_SHORTLIST", 500)
+RETRIEVAL_BUDGET_MS = _env_int("RETRIEVAL_BUDGET_MS", 250)
+RETRIEVAL_CHUNK = _env_int("RETRIEVAL_CHUNK", 128)
+
+# score_tecnico no servidor: LRU dos conjuntos de tokens por vaga (chave = hash do texto)
+JOB_TOKENS_CACHE_SIZE = _env_int("JOB_TOKENS_CACHE_SIZE", 1024)
+SCORE_MODE_SERVER = "server"  # mode="server" força o cálculo no servidor
+
+# Hot reload: token de /admin/reload (sem token, o endpoint fica desligado) e watcher (polling) de MODELS_DIR
+ADMIN_TOKEN = os.environ.get("ADMIN_TOKEN")
+MODEL_WATCH_ENABLED = _env_flag("MODEL_WATCH_ENABLED")
+MODEL_WATCH_INTERVAL_S = _env_int("MODEL_WATCH_INTERVAL_S", 5)
 
 _model = None
 _threshold = DEFAULT_THRESHOLD
 _model_loaded = False
+_adapter: Optional[str] = None
+_adapter_model = None  # modelo para o qual _adapter foi resolvido
+_model_version: Optional[str] = None  # hash do artefato carregado
+_swap_lock = threading.Lock()  # troca atômica de modelo/threshold/adaptador/versão
+_reload_lock = threading.Lock()  # no máximo um reload por vez
+_last_reload: Dict[str, Any] = {"status": "never"}
+_model_load_seconds: Optional[float] = None
+_load_lock = threading.Lock()
+
+# Startup: o modelo é carregado em background (lifespan); /ready só responde 200 depois do warm-up
+_startup: Dict[str, Any] = {
+    "state": "idle",  # idle -> loading -> ready | error
+    "error": None,
+    "import_seconds": None,
+    "model_load_seconds": None,
+    "warmup_seconds": None,
+    "ready_seconds": None,
+    "first_response_seconds": None,
+}
+
+# --------------------------------------------------------------------------------------
+# Métricas (expostas em GET /metrics, formato texto do Prometheus)
+# --------------------------------------------------------------------------------------
+METRICS = Registry()
+REQUESTS_TOTAL = METRICS.register(MetricCounter(
+    "decision_requests_total", "Requisições HTTP por rota, método e status.", ("route", "method", "status")
+))
+REQUEST_SECONDS = METRICS.register(Histogram(
+    "decision_request_duration_seconds", "Latência total por rota, método e status.", ("route", "method", "status")
+))
+STAGE_SECONDS = METRICS.register(Histogram(
+    "decision_stage_duration_seconds",
+    "Latência por etapa interna: validation, adapter, vectorization, classifier, serialization.",
+    ("stage",),
+))
+MODEL_LOADS_TOTAL = METRICS.register(MetricCounter(
+    "decision_model_loads_total", "Cargas de modelo concluídas (startup + reloads)."
+))
+
+
+@contextmanager
+def _stage(name: str):
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        STAGE_SECONDS.observe(time.perf_counter() - start, stage=name)
+
+
+def _mark_validated(request: Request) -> None:
+    """Chamado na entrada do handler: tempo desde o middleware = leitura do corpo + validação."""
+    t0 = getattr(request.state, "t0", None)
+    if t0 is not None:
+        STAGE_SECONDS.observe(time.perf_counter() - t0, stage="validation")
+
+
+def _mark_handler_done(request: Request) -> None:
+    request.state.t_handler_end = time.perf_counter()
 
 
 def _load_threshold() -> float:
@@ -38,35 +183,162 @@ def _load_threshold() -> float:
     return DEFAULT_THRESHOLD
 
 
-def _load_model():
-    """Tenta carregar model_cv.joblib e, se não existir, model.joblib."""
-    global _model, _model_loaded
-    for path in (MODELS_DIR / "model_cv.joblib", MODELS_DIR / "model.joblib"):
-        if path.exists():
-            _model = joblib.load(path)
-            _model_loaded = True
-            return
+def _model_candidates() -> List[Path]:
+    """
+    model_cv.joblib > model.joblib, precedidos do scorer compilado (e, com MODEL_MMAP_ENABLED,
+    do scorer em layout compartilhado); se o compilado vem do pipeline atual, `_read_model` confere.
+    """
+    sources = [p for p in (MODELS_DIR / "model_cv.joblib", MODELS_DIR / "model.joblib") if p.exists()]
+    compiled = []
+    if MODEL_MMAP_ENABLED and SHARED_MODEL_FILE.exists():
+        compiled.append(SHARED_MODEL_FILE)
+    if COMPILED_MODEL_ENABLED and COMPILED_MODEL_FILE.exists():
+        compiled.append(COMPILED_MODEL_FILE)
+    return compiled + sources
+
+
+def _file_digest(path: Path) -> str:
+    return file_sha256(path)[:12]
+
+
+def _read_model() -> tuple:
+    """
+    Lê o primeiro artefato disponível (ver `_model_candidates`) -> (modelo, versão, caminho).
+    Um scorer compilado só é usado se o `source_digest` dele for o sha256 do pipeline atual.
+    """
+    candidates = _model_candidates()
+    compiled = (SHARED_MODEL_FILE, COMPILED_MODEL_FILE)
+    source = next((p for p in candidates if p not in compiled), None)
+    source_digest: Optional[str] = None
+    for path in candidates:
+        try:
+            model = joblib.load(path, mmap_mode="r" if path == SHARED_MODEL_FILE else None)
+        except Exception:
+            if path in compiled:
+                continue  # compilado ilegível: cai para o pipeline original
+            raise
+        if path in compiled and source is not None:
+            source_digest = source_digest or file_sha256(source)
+            if getattr(model, "source_digest", None) != source_digest:
+                logging.getLogger("uvicorn.error").warning(
+                    "%s não foi gerado a partir de %s; usando o pipeline (recompile com src/compiled_scorer.py)",
+                    path.name, source.name,
+                )
+                continue
+        return model, _file_digest(path), path
     raise RuntimeError(
         "Nenhum modelo encontrado. Treine com: python src\\train_baseline.py ou python src\\train_cv.py"
     )
 
 
-_threshold = _load_threshold()
-try:
-    _load_model()
-except Exception:
-    _model_loaded = False
+def _swap_model(model, version: Optional[str], adapter: str, threshold: Optional[float] = None) -> None:
+    """Publica o novo estado de uma vez; requisições em voo seguem com o snapshot antigo."""
+    global _model, _model_loaded, _model_version, _adapter, _adapter_model, _threshold
+    with _swap_lock:
+        _model, _model_version = model, version
+        _adapter, _adapter_model = adapter, model
+        if threshold is not None:
+            _threshold = threshold
+        _model_loaded = True
+    _cache.clear()
+    _jobs.drop_counts()
+    _reset_index()  # o índice de candidatos pertence ao pipeline anterior: recarrega na próxima busca
+
+
+def _load_model(threshold: Optional[float] = None):
+    """
+    Tenta carregar model_cv.joblib e, se não existir, model.joblib.
+    Se houver um scorer compilado atualizado, ele é usado no lugar do pipeline.
+    Resolve o adaptador de entrada (ver `_resolve_adapter`), aquece o modelo e só
+    então faz a troca atômica; com `threshold`, o threshold é trocado junto.
+    """
+    global _model_load_seconds
+    start = time.perf_counter()
+    model, version, _ = _read_model()
+    adapter = _resolve_adapter(model)
+    _predict_proba_rows(model, _PROBE_ROWS, adapter)  # warm-up fora do lock
+    _swap_model(model, version, adapter, threshold)
+    _model_load_seconds = time.perf_counter() - start
+    MODEL_LOADS_TOTAL.inc()
+
 
 # --------------------------------------------------------------------------------------
 # Schemas
 # --------------------------------------------------------------------------------------
 class PredictRequest(BaseModel):
-    job_text: str = Field(..., min_length=1)
+    # texto da vaga ou o código de uma vaga registrada em POST /jobs (um dos dois)
+    job_text: Optional[str] = Field(default=None, min_length=1)
+    vaga_code: Optional[str] = Field(default=None, min_length=1)
     cand_text: str = Field(..., min_length=1)
-    score_tecnico: float = Field(..., ge=0.0)
+    # opcional: ausente (ou mode="server") -> calculado no servidor com o Jaccard do treino
+    score_tecnico: Optional[float] = Field(default=None, ge=0.0)
     situacao_norm: str = Field(..., min_length=1)
     mode: Optional[str] = Field(default="raw")
 
+    @model_validator(mode="after")
+    def _job_source(self):
+        if (self.job_text is None) == (self.vaga_code is None):
+            raise ValueError("Informe job_text ou vaga_code (exatamente um dos dois).")
+        return self
+
+
+class JobRegisterRequest(BaseModel):
+    vaga_code: str = Field(..., min_length=1)
+    job_text: str = Field(..., min_length=1)
+
+
+class JobInfo(BaseModel):
+    vaga_code: str
+    n_chars: int
+    n_tokens: int
+    digest: str
+    vectorized: bool  # contagens do vocabulário pré-calculadas para o modelo em uso
+    replaced: Optional[bool] = None
+
+
+class PredictByIdsRequest(BaseModel):
+    vaga_code: str = Field(..., min_length=1)
+    candidato_code: str = Field(..., min_length=1)
+    situacao_norm: str = Field(..., min_length=1)
+    score_tecnico: Optional[float] = Field(default=None, ge=0.0)
+    mode: Optional[str] = Field(default="raw")
+
+
+class RetrieveRequest(BaseModel):
+    job_text: Optional[str] = Field(default=None, min_length=1)
+    vaga_code: Optional[str] = Field(default=None, min_length=1)
+    top_k: int = Field(default=50, ge=1, le=MAX_BATCH_ITEMS)
+    shortlist: Optional[int] = Field(default=None, ge=1)  # default: RETRIEVAL_SHORTLIST
+    budget_ms: Optional[float] = Field(default=None, gt=0)  # default: RETRIEVAL_BUDGET_MS
+    situacao_norm: str = Field(default="prospect", min_length=1)
+
+    @model_validator(mode="after")
+    def _job_source(self):
+        if (self.job_text is None) == (self.vaga_code is None):
+            raise ValueError("Informe job_text ou vaga_code (exatamente um dos dois).")
+        return self
+
+
+class RetrieveItem(BaseModel):
+    rank: int
+    candidato_code: str
+    similarity: float
+    score_tecnico: float
+    y_prob: float
+    y_pred: int
+
+
+class RetrieveResponse(BaseModel):
+    n_pool: int
+    n_matched: int
+    n_shortlist: int
+    n_rescored: int
+    truncated: bool  # orçamento de latência esgotado antes de repontuar a shortlist inteira
+    threshold: float
+    model_version: Optional[str] = None
+    timings_ms: Dict[str, float]
+    results: List[RetrieveItem]
+
 
 class PredictResponse(BaseModel):
     y_prob: float
@@ -74,13 +346,84 @@ class PredictResponse(BaseModel):
     details: dict
 
 
+class PredictBatchRequest(BaseModel):
+    # itens crus: cada um é validado individualmente como PredictRequest,
+    # para que um item inválido não derrube o lote inteiro
+    items: List[Dict[str, Any]]
+
+
+class PredictBatchItem(BaseModel):
+    index: int
+    y_prob: Optional[float] = None
+    y_pred: Optional[int] = None
+    error: Optional[Any] = None
+
+
+class PredictBatchResponse(BaseModel):
+    n_items: int
+    n_ok: int
+    n_errors: int
+    threshold: float
+    model_version: Optional[str] = None
+    results: List[PredictBatchItem]
+
+
+class RankCandidate(BaseModel):
+    cand_text: str = Field(..., min_length=1)
+    score_tecnico: Optional[float] = Field(default=None, ge=0.0)
+    situacao_norm: str = Field(..., min_length=1)
+    candidato_code: Optional[str] = None
+
+
+class RankRequest(BaseModel):
+    job_text: str = Field(..., min_length=1)
+    candidates: List[RankCandidate]
+    top_k: Optional[int] = Field(default=None, ge=1)
+    mode: Optional[str] = Field(default="raw")
+
+
+class RankItem(BaseModel):
+    rank: int
+    index: int
+    candidato_code: Optional[str] = None
+    y_prob: float
+    y_pred: int
+    score_tecnico: float
+
+
+class RankResponse(BaseModel):
+    n_candidates: int
+    threshold: float
+    model_version: Optional[str] = None
+    results: List[RankItem]
+
+
 # --------------------------------------------------------------------------------------
 # App
 # --------------------------------------------------------------------------------------
+@asynccontextmanager
+async def _lifespan(app: FastAPI):
+    """Aceita conexões na hora; modelo carrega/aquece numa thread (ver GET /ready)."""
+    global _watcher, _batcher
+    _startup["import_seconds"] = time.perf_counter() - _IMPORT_T0
+    if not _model_loaded:
+        threading.Thread(target=_background_load, name="model-loader", daemon=True).start()
+    if MODEL_WATCH_ENABLED and _watcher is None:
+        _watcher = ModelWatcher(MODEL_WATCH_INTERVAL_S).start()
+    yield
+    if _watcher is not None:
+        _watcher.stop()
+        _watcher = None
+    if _batcher is not None:
+        _batcher.stop()  # resolve as requisições ainda na fila
+        _batcher = None
+
+
 app = FastAPI(
     title="Decision Match API",
     version="1.0.0",
     description="API para predição de match candidato-vaga (baseline TF-IDF + features simples).",
+    lifespan=_lifespan,
 )
 
 # --- Logging de requisições (latência + status) ---
@@ -89,84 +432,1501 @@ logger = logging.getLogger("uvicorn.access")
 @app.middleware("http")
 async def log_requests(request: Request, call_next):
     start = time.perf_counter()
+    request.state.t0 = start
     response = await call_next(request)
-    dur_ms = (time.perf_counter() - start) * 1000
+    end = time.perf_counter()
+    if _startup["first_response_seconds"] is None:
+        _startup["first_response_seconds"] = end - _IMPORT_T0  # TTFB desde o import do app
+    dur_ms = (end - start) * 1000
     logger.info(f"{request.method} {request.url.path} {response.status_code} {dur_ms:.1f}ms")
+
+    # rota como template (ex.: /predict) para não explodir a cardinalidade com 404s
+    route = getattr(request.scope.get("route"), "path", "unmatched")
+    labels = {"route": route, "method": request.method, "status": str(response.status_code)}
+    REQUESTS_TOTAL.inc(**labels)
+    REQUEST_SECONDS.observe(end - start, **labels)
+    t_handler_end = getattr(request.state, "t_handler_end", None)
+    if t_handler_end is not None:
+        STAGE_SECONDS.observe(end - t_handler_end, stage="serialization")
     return response
 
 
 @app.get("/health")
 def health():
-    return {"status": "ok", "model_loaded": bool(_model_loaded), "threshold": _threshold}
+    """Liveness: o processo responde (o modelo pode ainda estar carregando; ver /ready)."""
+    return {
+        "status": "ok",
+        "model_loaded": bool(_model_loaded),
+        "threshold": _threshold,
+        "adapter": _adapter if _model_loaded else None,
+    }
+
+
+def _is_ready() -> bool:
+    return bool(_model_loaded) and _startup["state"] != "loading"
+
+
+@app.get("/ready")
+def ready(response: Response):
+    """Readiness: 200 só com o modelo carregado e aquecido; 503 enquanto carrega ou se a carga falhou."""
+    ok = _is_ready()
+    if not ok:
+        response.status_code = 503
+    return {
+        "status": "ready" if ok else ("error" if _startup["state"] == "error" else "loading"),
+        "model_version": _model_version if ok else None,
+        "startup": dict(_startup),
+    }
 
 
 # --------------------------------------------------------------------------------------
 # Helpers de predição (tolerantes a diferentes formatos do pipeline)
 # --------------------------------------------------------------------------------------
-def _predict_proba_flexible(model, req_dict: dict) -> float:
+FEATURE_COLS = ["job_text", "cand_text", "situacao_norm", "score_tecnico"]
+
+
+def _concat_text(req_dict: dict) -> str:
+    return (
+        f"[JOB]{req_dict['job_text']} "
+        f"[CAND]{req_dict['cand_text']} "
+        f"[SIT]{req_dict['situacao_norm']} "
+        f"[SCORE]{req_dict['score_tecnico']}"
+    )
+
+
+def _positive_proba(raw) -> np.ndarray:
+    """Extrai a coluna da classe 1 de qualquer retorno de predict_proba (array ou lista)."""
+    return np.asarray(raw, dtype=float)[:, 1]
+
+
+def _predict_proba_flexible_batch(model, rows: List[dict]) -> np.ndarray:
     """
-    Tenta prever com múltiplos formatos de entrada:
-    (1) DF com colunas originais do treino
-    (2) DF com coluna 'text' concatenada
-    (3) lista 1D com string concatenada
+    Versão vetorizada de `_predict_proba_flexible`: uma única chamada a
+    predict_proba para todas as linhas, com os mesmos formatos de fallback.
     """
     # (1) tentar com colunas originais
     try:
-        df_full = pd.DataFrame([{
-            "job_text": req_dict["job_text"],
-            "cand_text": req_dict["cand_text"],
-            "situacao_norm": req_dict["situacao_norm"],
-            "score_tecnico": req_dict["score_tecnico"],
-        }])
-        return float(model.predict_proba(df_full)[0][1])
+        df_full = pd.DataFrame([{c: r[c] for c in FEATURE_COLS} for r in rows], columns=FEATURE_COLS)
+        return _positive_proba(model.predict_proba(df_full))
     except Exception:
         pass
 
-    # monta texto concatenado uma vez só
-    text_concat = (
-        f"[JOB]{req_dict['job_text']} "
-        f"[CAND]{req_dict['cand_text']} "
-        f"[SIT]{req_dict['situacao_norm']} "
-        f"[SCORE]{req_dict['score_tecnico']}"
-    )
+    # monta textos concatenados uma vez só
+    texts = [_concat_text(r) for r in rows]
 
     # (2) tentar com DF {'text': ...}
     try:
-        df_text = pd.DataFrame({"text": [text_concat]})
-        return float(model.predict_proba(df_text)[0][1])
+        df_text = pd.DataFrame({"text": texts})
+        return _positive_proba(model.predict_proba(df_text))
     except Exception:
         pass
 
     # (3) tentar com lista 1D
     try:
-        return float(model.predict_proba([text_concat])[0][1])
+        return _positive_proba(model.predict_proba(texts))
     except Exception as e:
         # se nada deu certo, propaga o último erro (mais informativo)
         raise e
 
 
-@app.post("/predict", response_model=PredictResponse)
-def predict(req: PredictRequest):
+def _predict_proba_flexible(model, req_dict: dict) -> float:
+    """
+    Tenta prever com múltiplos formatos de entrada:
+    (1) DF com colunas originais do treino
+    (2) DF com coluna 'text' concatenada
+    (3) lista 1D com string concatenada
+    """
+    return float(_predict_proba_flexible_batch(model, [req_dict])[0])
+
+
+# --------------------------------------------------------------------------------------
+# Adaptador de entrada resolvido uma vez por modelo (sem try/except por requisição)
+# --------------------------------------------------------------------------------------
+ADAPTER_ORDER = ["columns", "text_df", "text_list"]
+FLEXIBLE_ADAPTER = "flexible"
+
+_ADAPTERS = {
+    "records": lambda rows: rows,  # CompiledScorer: lista de dicts, sem pandas
+    "columns": lambda rows: pd.DataFrame(
+        [{c: r[c] for c in FEATURE_COLS} for r in rows], columns=FEATURE_COLS
+    ),
+    "text_df": lambda rows: pd.DataFrame({"text": [_concat_text(r) for r in rows]}),
+    "text_list": lambda rows: [_concat_text(r) for r in rows],
+}
+
+_PROBE_ROWS = [
+    {"job_text": "python sql", "cand_text": "python", "situacao_norm": "prospect", "score_tecnico": 0.5},
+    {"job_text": "java", "cand_text": "java spring", "situacao_norm": "prospect", "score_tecnico": 0.1},
+]
+
+
+def _inspect_adapter(model) -> Optional[str]:
+    """Palpite barato a partir das colunas vistas no fit (Pipeline/ColumnTransformer)."""
+    if isinstance(model, CompiledScorer):
+        return "records"
+    names = getattr(model, "feature_names_in_", None)
+    if names is None:
+        steps = getattr(model, "steps", None)
+        first = steps[0][1] if steps else None
+        transformers = getattr(first, "transformers", None) or []
+        cols: List[str] = []
+        for _, _, c in transformers:
+            if isinstance(c, str):
+                cols.append(c)
+            elif isinstance(c, (list, tuple)) and all(isinstance(x, str) for x in c):
+                cols.extend(c)
+        names = cols or None
+    if names is None:
+        return None
+    names = set(map(str, names))
+    if names == {"text"}:
+        return "text_df"
+    if names and names <= set(FEATURE_COLS):
+        return "columns"
+    return None
+
+
+def _resolve_adapter(model) -> str:
+    """
+    Descobre qual formato de entrada o modelo aceita. A inspeção só define a
+    ordem de tentativa; a escolha é confirmada por uma sonda de 2 linhas (que
+    também rejeita saídas com número de linhas errado). Se nada passar, cai no
+    caminho `flexible` (try/except por requisição, comportamento antigo).
+    """
+    hint = _inspect_adapter(model)
+    order = ([hint] if hint else []) + [a for a in ADAPTER_ORDER if a != hint]
+    for name in order:
+        try:
+            out = np.asarray(model.predict_proba(_ADAPTERS[name](_PROBE_ROWS)), dtype=float)
+        except Exception:
+            continue
+        if out.ndim == 2 and out.shape[0] == len(_PROBE_ROWS) and out.shape[1] >= 2:
+            return name
+    return FLEXIBLE_ADAPTER
+
+
+def _bind_adapter(model) -> str:
+    global _adapter, _adapter_model
+    name = _resolve_adapter(model)
+    _adapter, _adapter_model = name, model
+    return name
+
+
+def _adapter_for(model) -> str:
+    # o modelo pode ter sido trocado por fora de _load_model (ex.: testes)
+    if _adapter is None or _adapter_model is not model:
+        return _bind_adapter(model)
+    return _adapter
+
+
+def _predict_proba_rows(model, rows: List[dict], adapter: Optional[str] = None) -> np.ndarray:
+    """Uma chamada a predict_proba com o adaptador já resolvido para `model`."""
+    adapter = adapter or _adapter_for(model)
+    if adapter == FLEXIBLE_ADAPTER:
+        with _stage("classifier"):
+            return _predict_proba_flexible_batch(model, rows)
+    with _stage("adapter"):
+        X = _ADAPTERS[adapter](rows)
+    steps = getattr(model, "steps", None)
+    if not steps or len(steps) < 2:
+        # scorer compilado / modelos opacos: vetorização + classificador numa etapa só
+        with _stage("classifier"):
+            return _positive_proba(model.predict_proba(X))
+    # Pipeline sklearn: mesmo fluxo de Pipeline.predict_proba, separado por etapa
+    with _stage("vectorization"):
+        for _, step in steps[:-1]:
+            if step is not None and step != "passthrough":
+                X = step.transform(X)
+    with _stage("classifier"):
+        return _positive_proba(steps[-1][1].predict_proba(X))
+
+
+class _Snapshot(NamedTuple):
+    model: Any
+    adapter: str
+    threshold: float
+    version: Optional[str]
+
+
+def _snapshot() -> _Snapshot:
+    """Estado consistente do modelo servido, fixado no início de cada requisição."""
     if not _model_loaded:
-        _load_model()
+        _ensure_model()  # requisição antes do fim da carga em background: espera por ela
+    with _swap_lock:
+        model, threshold, version = _model, _threshold, _model_version
+        adapter = _adapter if _adapter_model is model else None
+    return _Snapshot(model, adapter or _adapter_for(model), threshold, version)
+
+
+# --------------------------------------------------------------------------------------
+# Micro-batching de /predict concorrentes
+# --------------------------------------------------------------------------------------
+class MicroBatcher:
+    """
+    Agrupa requisições concorrentes em lotes e roda uma única chamada vetorizada.
+
+    Cada chamador recebe um `Future`; uma thread dedicada drena a fila até
+    `max_batch_size` itens ou até `max_wait_us` após o primeiro item do lote,
+    o que vier antes. A fila é limitada por `max_queue` (excedente -> queue.Full).
+    Cada item pode levar uma `tag` (ex.: snapshot do modelo); o lote é dividido
+    por tag e `predict_fn(rows, tag)` é chamado uma vez por grupo.
+    `stop()` não deixa Future pendente: o que sobrou na fila é processado (ou recebe
+    exceção, se a thread não terminou a tempo) e novos `submit` levantam RuntimeError.
+    """
+
+    def __init__(self, predict_fn, max_batch_size: int, max_wait_us: int, max_queue: int):
+        self.predict_fn = predict_fn
+        self.max_batch_size = max(1, int(max_batch_size))
+        self.max_wait_us = max(0, int(max_wait_us))
+        self.max_queue = max(1, int(max_queue))
+        self._queue: "queue.Queue[tuple[dict, Any, Future]]" = queue.Queue(maxsize=self.max_queue)
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._stopping = threading.Event()
+        self.n_batches = 0
+        self.n_items = 0
+        self.n_rejected = 0
+        self.max_batch_seen = 0
+
+    def start(self) -> "MicroBatcher":
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._stopping.clear()
+                self._thread = threading.Thread(target=self._run, name="microbatcher", daemon=True)
+                self._thread.start()
+        return self
+
+    def stop(self, timeout: float = 1.0) -> None:
+        with self._lock:  # depois daqui, nenhum submit entra na fila
+            self._stopping.set()
+        stuck = False
+        if self._thread is not None:
+            self._thread.join(timeout=timeout)
+            stuck = self._thread.is_alive()
+        leftover = []
+        while True:
+            try:
+                leftover.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        if not leftover:
+            return
+        if stuck:
+            # a thread segue presa num predict: não arrisca outro; falha rápido
+            err = RuntimeError("MicroBatcher parado antes de processar a requisição.")
+            for _, _, fut in leftover:
+                fut.set_exception(err)
+        else:
+            for i in range(0, len(leftover), self.max_batch_size):
+                self._process(leftover[i : i + self.max_batch_size])
+
+    def submit(self, row: dict, tag: Any = None) -> Future:
+        fut: Future = Future()
+        with self._lock:
+            if self._stopping.is_set():
+                raise RuntimeError("MicroBatcher parado.")
+            try:
+                self._queue.put_nowait((row, tag, fut))
+            except queue.Full:
+                self.n_rejected += 1
+                raise
+        return fut
+
+    def _collect(self) -> List[tuple]:
+        try:
+            first = self._queue.get(timeout=0.1)
+        except queue.Empty:
+            return []
+        batch = [first]
+        deadline = time.perf_counter() + self.max_wait_us / 1e6
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.perf_counter()
+            try:
+                if remaining <= 0:
+                    batch.append(self._queue.get_nowait())
+                else:
+                    batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self) -> None:
+        while not self._stopping.is_set():
+            batch = self._collect()
+            if batch:
+                self._process(batch)
+
+    def _process(self, batch: List[tuple]) -> None:
+        groups: List[tuple] = []  # [(tag, rows, futures)], na ordem de chegada
+        for row, tag, fut in batch:
+            for g in groups:
+                if g[0] == tag:
+                    g[1].append(row)
+                    g[2].append(fut)
+                    break
+            else:
+                groups.append((tag, [row], [fut]))
+        for tag, rows, futs in groups:
+            try:
+                probas = [float(p) for p in self.predict_fn(rows, tag)]
+                if len(probas) != len(rows):
+                    raise ValueError(f"Modelo devolveu {len(probas)} probabilidades para {len(rows)} linhas.")
+            except Exception as e:
+                for fut in futs:
+                    fut.set_exception(e)
+            else:
+                for fut, proba in zip(futs, probas):
+                    fut.set_result(proba)
+        with self._lock:
+            self.n_batches += 1
+            self.n_items += len(batch)
+            self.max_batch_seen = max(self.max_batch_seen, len(batch))
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "max_batch_size": self.max_batch_size,
+                "max_wait_us": self.max_wait_us,
+                "max_queue": self.max_queue,
+                "queue_depth": self._queue.qsize(),
+                "batches": self.n_batches,
+                "items": self.n_items,
+                "rejected": self.n_rejected,
+                "avg_batch_size": (self.n_items / self.n_batches) if self.n_batches else 0.0,
+                "max_batch_seen": self.max_batch_seen,
+            }
+
+
+_batcher: Optional[MicroBatcher] = None
+_batcher_lock = threading.Lock()
+
+
+def _batched_predict(rows: List[dict], snap: Optional[_Snapshot]) -> np.ndarray:
+    # cada grupo usa o snapshot fixado pelas suas requisições
+    snap = snap or _snapshot()
+    return _predict_proba_rows(snap.model, rows, snap.adapter)
+
+
+def _get_batcher() -> Optional[MicroBatcher]:
+    global _batcher
+    if _batcher is None and MICROBATCH_ENABLED:
+        with _batcher_lock:
+            if _batcher is None:
+                _batcher = MicroBatcher(
+                    _batched_predict,
+                    max_batch_size=MICROBATCH_MAX_SIZE,
+                    max_wait_us=MICROBATCH_MAX_WAIT_US,
+                    max_queue=MICROBATCH_MAX_QUEUE,
+                ).start()
+    return _batcher
+
+
+def _predict_one(snap: _Snapshot, req_dict: dict) -> float:
+    batcher = _get_batcher()
+    if batcher is None:
+        return float(_predict_proba_rows(snap.model, [req_dict], snap.adapter)[0])
+    try:
+        fut = batcher.submit(req_dict, snap)
+    except queue.Full:
+        raise HTTPException(status_code=503, detail="Fila de micro-batching cheia; tente novamente.")
+    except RuntimeError:
+        raise HTTPException(status_code=503, detail="Micro-batching encerrado (desligamento); tente novamente.")
+    return fut.result(timeout=MICROBATCH_RESULT_TIMEOUT_S)
+
+
+# --------------------------------------------------------------------------------------
+# score_tecnico calculado no servidor (mesmo tokenize/Jaccard do treino, src/text_utils.py)
+# --------------------------------------------------------------------------------------
+class TokenSetCache:
+    """LRU limitado dos conjuntos de tokens de vagas, com chave = sha1 do texto."""
+
+    def __init__(self, max_size: int):
+        self.max_size = max(0, int(max_size))
+        self._data: "OrderedDict[str, frozenset]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, text: str) -> frozenset:
+        key = hashlib.sha1(text.encode("utf-8")).hexdigest()
+        with self._lock:
+            tokens = self._data.get(key)
+            if tokens is not None:
+                self._data.move_to_end(key)
+                self.hits += 1
+                return tokens
+            self.misses += 1
+        tokens = frozenset(tokenize(text))
+        if self.max_size:
+            with self._lock:
+                self._data[key] = tokens
+                while len(self._data) > self.max_size:
+                    self._data.popitem(last=False)
+        return tokens
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"max_size": self.max_size, "size": len(self._data), "hits": self.hits, "misses": self.misses}
+
+
+_job_tokens = TokenSetCache(JOB_TOKENS_CACHE_SIZE)
+
+
+def _jaccard(a: frozenset, b: set) -> float:
+    # idêntico a text_utils.score_tecnico
+    if not a or not b:
+        return 0.0
+    return float(len(a & b) / len(a | b))
+
+
+def _resolve_score(job_text: str, cand_text: str, score: Optional[float], mode: Optional[str],
+                   job_tokens: Optional[frozenset] = None, cand_tokens: Optional[frozenset] = None) -> tuple:
+    """-> (score_tecnico, origem): usa o do cliente, salvo se ausente ou mode="server"."""
+    if score is not None and mode != SCORE_MODE_SERVER:
+        return float(score), "client"
+    if job_tokens is None:
+        job_tokens = _job_tokens.get(job_text)
+    if cand_tokens is None:
+        cand_tokens = tokenize(cand_text)
+    return _jaccard(job_tokens, cand_tokens), "server"
+
+
+# --------------------------------------------------------------------------------------
+# Registro de vagas (POST /jobs): vaga_code -> texto já tokenizado/vetorizado
+# --------------------------------------------------------------------------------------
+class UnknownJobError(LookupError):
+    pass
+
+
+class RegisteredJob:
+    """
+    Vaga registrada: texto, tokens (score_tecnico) e contagens do vocabulário por versão do modelo
+    (Counter no scorer compilado; linha esparsa do CountVectorizer no Pipeline sklearn).
+    """
+
+    def __init__(self, vaga_code: str, text: str):
+        self.vaga_code = vaga_code
+        self.text = text
+        self.tokens = frozenset(tokenize(text))
+        self.digest = hashlib.sha1(text.encode("utf-8")).hexdigest()[:12]
+        self._counts: Optional[tuple] = None  # (versão do modelo, Counter)
+
+    def counts_for(self, model, version: Optional[str]):
+        cached = self._counts
+        if cached is None or cached[0] != version:
+            cached = self._counts = (version, _job_counts(model, self.text))
+        return cached[1]
+
+    def drop_counts(self) -> None:
+        self._counts = None
+
+    def vectorized_for(self, version: Optional[str]) -> bool:
+        return self._counts is not None and self._counts[0] == version
+
+    def info(self, **extra) -> JobInfo:
+        return JobInfo(
+            vaga_code=self.vaga_code,
+            n_chars=len(self.text),
+            n_tokens=len(self.tokens),
+            digest=self.digest,
+            vectorized=self.vectorized_for(_model_version),
+            **extra,
+        )
+
 
-    req_dict = {
-        "job_text": req.job_text,
-        "cand_text": req.cand_text,
-        "situacao_norm": req.situacao_norm,
-        "score_tecnico": req.score_tecnico,
+class JobRegistry:
+    """LRU limitado de vagas registradas; vagas despejadas precisam ser registradas de novo."""
+
+    def __init__(self, max_size: int):
+        self.max_size = max(0, int(max_size))
+        self._data: "OrderedDict[str, RegisteredJob]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def register(self, vaga_code: str, text: str) -> tuple:
+        """-> (vaga, substituiu?); tokenização fora do lock."""
+        job = RegisteredJob(vaga_code, text)
+        with self._lock:
+            replaced = self._data.pop(vaga_code, None) is not None
+            if self.max_size:
+                self._data[vaga_code] = job
+                while len(self._data) > self.max_size:
+                    self._data.popitem(last=False)
+                    self.evictions += 1
+        return job, replaced
+
+    def get(self, vaga_code: str) -> RegisteredJob:
+        with self._lock:
+            job = self._data.get(vaga_code)
+            if job is None:
+                self.misses += 1
+                raise UnknownJobError(f"vaga_code '{vaga_code}' não registrado (POST /jobs).")
+            self._data.move_to_end(vaga_code)
+            self.hits += 1
+            return job
+
+    def delete(self, vaga_code: str) -> bool:
+        with self._lock:
+            return self._data.pop(vaga_code, None) is not None
+
+    def drop_counts(self) -> None:
+        """Troca de modelo: descarta as contagens da versão anterior (recalculadas sob demanda)."""
+        with self._lock:
+            jobs = list(self._data.values())
+        for job in jobs:
+            job.drop_counts()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "max_size": self.max_size,
+                "size": len(self._data),
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+            }
+
+
+_jobs = JobRegistry(JOBS_REGISTRY_SIZE)
+
+
+def _request_row(req: PredictRequest) -> tuple:
+    """
+    -> (linha com as FEATURE_COLS, origem do score, vaga registrada ou None).
+    Com vaga_code, usa o texto/tokens do registro; vaga desconhecida -> UnknownJobError.
+    """
+    job = _jobs.get(req.vaga_code) if req.vaga_code is not None else None
+    job_text = job.text if job is not None else req.job_text
+    score, source = _resolve_score(
+        job_text, req.cand_text, req.score_tecnico, req.mode, job.tokens if job is not None else None
+    )
+    row = {"job_text": job_text, "cand_text": req.cand_text, "situacao_norm": req.situacao_norm, "score_tecnico": score}
+    return row, source, job
+
+
+def _vectorizes_jobs(model) -> bool:
+    return isinstance(model, CompiledScorer) and model.additive
+
+
+def _job_vectors_supported(snap: _Snapshot) -> bool:
+    """Vaga pode ser vetorizada uma vez e somada aos candidatos (scorer compilado ou Pipeline aditivo)."""
+    if isinstance(snap.model, CompiledScorer):
+        return snap.model.additive
+    return snap.adapter == "columns" and _additive_tfidf_pipeline(snap.model) is not None
+
+
+def _job_counts(model, job_text: str):
+    """Contagens de `[JOB]texto` no vocabulário do modelo (ver `_job_vectors_supported`)."""
+    if isinstance(model, CompiledScorer):
+        return model.job_counts(job_text)
+    _, tfidf, _ = _additive_tfidf_pipeline(model)
+    with _stage("vectorization"):
+        return CountVectorizer.transform(tfidf, [f"[JOB]{job_text}"])
+
+
+def _registered_job_proba(snap: _Snapshot, job: RegisteredJob, row: dict) -> float:
+    """Só a parte do candidato é tokenizada; a vaga vem pré-vetorizada do registro."""
+    counts = job.counts_for(snap.model, snap.version)
+    if isinstance(snap.model, CompiledScorer):
+        with _stage("classifier"):
+            return float(snap.model.proba_from_job_counts(counts, [row])[0])
+    return float(_rank_proba_broadcast(*_additive_tfidf_pipeline(snap.model), job.text, [row], job_counts=counts)[0])
+
+
+# --------------------------------------------------------------------------------------
+# Cache de predições (LRU + TTL)
+# --------------------------------------------------------------------------------------
+class PredictionCache:
+    """
+    Cache em memória de probabilidades por requisição normalizada.
+
+    LRU limitado a `max_size` entradas, cada uma válida por `ttl_s` segundos.
+    O cache fica associado a um modelo (`bind`): ao trocar de modelo, tudo é
+    descartado; a chave também carrega a versão do modelo e o threshold.
+    """
+
+    def __init__(self, max_size: int, ttl_s: float):
+        self.max_size = max(0, int(max_size))
+        self.ttl_s = float(ttl_s)
+        self._data: "OrderedDict[str, tuple[float, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._owner = None
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_size > 0
+
+    @staticmethod
+    def make_key(req_dict: dict, version: Optional[str], threshold: float) -> str:
+        norm = {
+            "job_text": str(req_dict["job_text"]).strip(),
+            "cand_text": str(req_dict["cand_text"]).strip(),
+            "situacao_norm": str(req_dict["situacao_norm"]).strip(),
+            "score_tecnico": float(req_dict["score_tecnico"]),
+            "model_version": version,
+            "threshold": float(threshold),
+        }
+        raw = json.dumps(norm, sort_keys=True, ensure_ascii=False)
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    def bind(self, model) -> None:
+        with self._lock:
+            if self._owner is not model:
+                self._data.clear()
+                self._owner = model
+
+    def get(self, key: str) -> Optional[float]:
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                self.misses += 1
+                return None
+            value, expires_at = item
+            if time.monotonic() >= expires_at:
+                del self._data[key]
+                self.expirations += 1
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key: str, value: float) -> None:
+        if not self.enabled:
+            return
+        with self._lock:
+            self._data[key] = (float(value), time.monotonic() + self.ttl_s)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_size:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+            self._owner = None
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "enabled": self.enabled,
+                "max_size": self.max_size,
+                "ttl_s": self.ttl_s,
+                "size": len(self._data),
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "hit_rate": (self.hits / lookups) if lookups else 0.0,
+            }
+
+
+_cache = PredictionCache(PREDICT_CACHE_SIZE, PREDICT_CACHE_TTL_S)
+
+
+def _cached_predict(snap: _Snapshot, req_dict: dict, compute: Optional[Callable[[], float]] = None) -> float:
+    """`compute` substitui a predição padrão (ex.: vaga/candidato já vetorizados)."""
+    compute = compute or (lambda: _predict_one(snap, req_dict))
+
+    # snapshot antigo (troca de modelo no meio da requisição) não lê nem grava no cache
+    if not _cache.enabled or snap.model is not _model:
+        return compute()
+    _cache.bind(snap.model)
+    key = PredictionCache.make_key(req_dict, snap.version, snap.threshold)
+    proba = _cache.get(key)
+    if proba is None:
+        proba = compute()
+        _cache.put(key, proba)
+    return proba
+
+
+# --------------------------------------------------------------------------------------
+# Hot reload (endpoint admin + watcher opcional de MODELS_DIR)
+# --------------------------------------------------------------------------------------
+def _reload(reason: str = "admin") -> Dict[str, Any]:
+    """Carrega e aquece o novo modelo fora do caminho das requisições e troca atomicamente."""
+    global _last_reload
+    if not _reload_lock.acquire(blocking=False):
+        return {"status": "in_progress"}
+    start = time.perf_counter()
+    previous = _model_version
+    try:
+        _load_model(threshold=_load_threshold())
+        _last_reload = {
+            "status": "ok",
+            "reason": reason,
+            "previous_version": previous,
+            "version": _model_version,
+        }
+    except Exception as e:
+        # falha no reload mantém o modelo antigo servindo
+        _last_reload = {"status": "error", "reason": reason, "error": str(e), "version": previous}
+    finally:
+        _last_reload["duration_ms"] = (time.perf_counter() - start) * 1000
+        _last_reload["at"] = time.time()
+        _reload_lock.release()
+    return dict(_last_reload)
+
+
+def _watched_files() -> List[Path]:
+    return _model_candidates() + [THRESHOLD_FILE]
+
+
+def _files_signature() -> tuple:
+    sig = []
+    for p in _watched_files():
+        try:
+            st = p.stat()
+        except OSError:
+            continue
+        sig.append((str(p), st.st_mtime_ns, st.st_size))
+    return tuple(sig)
+
+
+class ModelWatcher:
+    """Polling de mtime/tamanho dos artefatos; dispara `_reload` quando algo muda."""
+
+    def __init__(self, interval_s: float, on_change=None):
+        self.interval_s = max(0.1, float(interval_s))
+        self.on_change = on_change or (lambda: _reload(reason="watcher"))
+        self._stopping = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._last = _files_signature()
+
+    def check(self) -> bool:
+        sig = _files_signature()
+        if sig == self._last:
+            return False
+        self._last = sig
+        self.on_change()
+        return True
+
+    def _run(self) -> None:
+        while not self._stopping.wait(self.interval_s):
+            try:
+                self.check()
+            except Exception:
+                logging.getLogger(__name__).exception("Falha no watcher de modelos")
+
+    def start(self) -> "ModelWatcher":
+        self._thread = threading.Thread(target=self._run, name="model-watcher", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._stopping.set()
+
+
+_watcher: Optional[ModelWatcher] = None
+
+
+# --------------------------------------------------------------------------------------
+# Carga inicial (threshold + modelo)
+# --------------------------------------------------------------------------------------
+# threshold é um JSON pequeno e fica no import; o modelo carrega no lifespan (ou na primeira requisição)
+_threshold = _load_threshold()
+
+_WARMUP_PAYLOAD = {
+    "job_text": "Analista de testes QA com Selenium e Java",
+    "cand_text": "Selenium WebDriver, Java, Cucumber, testes automatizados",
+    "situacao_norm": "prospect",
+    "mode": SCORE_MODE_SERVER,
+}
+
+
+def _warmup() -> float:
+    """Requisição sintética pelo caminho completo de /predict (validação, score, modelo, serialização)."""
+    start = time.perf_counter()
+    req = PredictRequest(**_WARMUP_PAYLOAD)
+    snap = _snapshot()
+    row, _, _ = _request_row(req)
+    p = float(_predict_proba_rows(snap.model, [row], snap.adapter)[0])
+    PredictResponse(y_prob=p, y_pred=int(p >= snap.threshold), details={}).model_dump_json()
+    return time.perf_counter() - start
+
+
+def _ensure_model() -> None:
+    """Carrega + aquece uma única vez (background do lifespan ou primeira requisição, o que vier antes)."""
+    with _load_lock:
+        if _model_loaded:
+            return
+        _startup.update(state="loading", error=None)
+        try:
+            _load_model()
+            _startup["model_load_seconds"] = _model_load_seconds
+            _startup["warmup_seconds"] = _warmup()
+        except Exception as e:
+            _startup.update(state="error", error=str(e))
+            raise
+        _startup["state"] = "ready"
+        _startup["ready_seconds"] = time.perf_counter() - _IMPORT_T0
+
+
+def _background_load() -> None:
+    try:
+        _ensure_model()
+    except Exception:
+        logging.getLogger("uvicorn.error").exception("Falha ao carregar o modelo no startup")
+
+
+@app.get("/stats")
+def stats():
+    batcher = _get_batcher()
+    return {
+        "microbatch": {"enabled": batcher is not None, **(batcher.stats() if batcher else {})},
+        "cache": _cache.stats(),
+        "job_tokens": _job_tokens.stats(),
+        "jobs": _jobs.stats(),
+        "feature_store": _store.stats() if _store is not None else None,
+        "candidate_index": _index.stats() if _index is not None else None,
     }
 
-    proba = _predict_proba_flexible(_model, req_dict)
-    y_pred = int(proba >= _threshold)
 
+def _runtime_gauges() -> None:
+    """Gauges lidos no scrape (estado do modelo, cache e micro-batching)."""
+    METRICS.register(Gauge(
+        "decision_model_info", "Modelo servido (valor 1), com versão e adaptador como labels.",
+        lambda: [((_model_version or "", _adapter or ""), 1)] if _model_loaded else [],
+        ("version", "adapter"),
+    ))
+    METRICS.register(Gauge(
+        "decision_model_load_seconds", "Duração da última carga de modelo (leitura + adaptador + warm-up).",
+        lambda: [((), _model_load_seconds)] if _model_load_seconds is not None else [],
+    ))
+    METRICS.register(Gauge(
+        "decision_threshold", "Threshold de decisão em uso.", lambda: [((), _threshold)],
+    ))
+    METRICS.register(Gauge(
+        "decision_startup_seconds",
+        "Startup desde o import do app: import, model_load, warmup, ready e first_response (TTFB).",
+        lambda: [((k[: -len("_seconds")],), v) for k, v in _startup.items() if k.endswith("_seconds") and v is not None],
+        ("phase",),
+    ))
+    METRICS.register(Gauge(
+        "decision_ready", "1 quando o modelo está carregado e aquecido (GET /ready).",
+        lambda: [((), int(_is_ready()))],
+    ))
+    METRICS.register(Gauge(
+        "decision_cache_events", "Eventos do cache de predições (contadores acumulados).",
+        lambda: [((k,), _cache.stats()[k]) for k in ("hits", "misses", "evictions", "expirations")],
+        ("event",),
+    ))
+    METRICS.register(Gauge(
+        "decision_cache_size", "Entradas no cache de predições.", lambda: [((), _cache.stats()["size"])],
+    ))
+    METRICS.register(Gauge(
+        "decision_microbatch_queue_depth", "Itens aguardando na fila de micro-batching.",
+        lambda: [((), _batcher.stats()["queue_depth"])] if _batcher is not None else [],
+    ))
+
+
+_runtime_gauges()
+
+
+@app.get("/metrics")
+def metrics():
+    return Response(content=METRICS.render(), media_type=METRICS_CONTENT_TYPE)
+
+
+@app.post("/admin/reload")
+def admin_reload(request: Request, wait: bool = True):
+    if not ADMIN_TOKEN:
+        raise HTTPException(status_code=403, detail="Reload remoto desabilitado: defina ADMIN_TOKEN.")
+    if not hmac.compare_digest(request.headers.get("X-Admin-Token", "").encode(), ADMIN_TOKEN.encode()):
+        raise HTTPException(status_code=403, detail="Token de admin inválido.")
+    if not wait:
+        threading.Thread(target=_reload, name="model-reload", daemon=True).start()
+        return {"status": "scheduled", "version": _model_version}
+    result = _reload()
+    if result["status"] == "error":
+        raise HTTPException(status_code=500, detail=result)
+    if result["status"] == "in_progress":
+        raise HTTPException(status_code=409, detail="Reload já em andamento.")
+    return result
+
+
+@app.get("/admin/reload")
+def admin_reload_status():
+    return {"version": _model_version, "last_reload": _last_reload}
+
+
+@app.post("/jobs", response_model=JobInfo)
+def register_job(req: JobRegisterRequest):
+    """
+    Registra (ou substitui) uma vaga: o texto é tokenizado e, com o scorer compilado ou o
+    Pipeline TF-IDF aditivo, vetorizado uma única vez por versão do modelo. Depois, /predict
+    aceita `vaga_code` no lugar de `job_text`.
+    """
+    job, replaced = _jobs.register(req.vaga_code, req.job_text)
+    snap = _snapshot()
+    if _job_vectors_supported(snap):
+        job.counts_for(snap.model, snap.version)
+    return job.info(replaced=replaced)
+
+
+@app.get("/jobs/{vaga_code}", response_model=JobInfo)
+def get_job(vaga_code: str):
+    try:
+        return _jobs.get(vaga_code).info()
+    except UnknownJobError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+
+
+@app.delete("/jobs/{vaga_code}")
+def delete_job(vaga_code: str):
+    if not _jobs.delete(vaga_code):
+        raise HTTPException(status_code=404, detail=f"vaga_code '{vaga_code}' não registrado.")
+    return {"status": "deleted", "vaga_code": vaga_code}
+
+
+@app.post("/predict", response_model=PredictResponse)
+def predict(req: PredictRequest, request: Request):
+    _mark_validated(request)
+    snap = _snapshot()
+
+    try:
+        req_dict, score_source, job = _request_row(req)
+    except UnknownJobError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    score = req_dict["score_tecnico"]
+
+    compute = None
+    if job is not None and _job_vectors_supported(snap):
+        compute = lambda: _registered_job_proba(snap, job, req_dict)  # noqa: E731
+    proba = _cached_predict(snap, req_dict, compute)
+    y_pred = int(proba >= snap.threshold)
+
+    _mark_handler_done(request)
     return PredictResponse(
         y_prob=proba,
         y_pred=y_pred,
         details={
             "mode": req.mode,
-            "score_tecnico": req.score_tecnico,
+            "vaga_code": req.vaga_code,
+            "score_tecnico": score,
+            "score_source": score_source,
+            "situacao_norm": req.situacao_norm,
+            "threshold": snap.threshold,
+            "model_version": snap.version,
+        },
+    )
+
+
+_store: Optional[FeatureStore] = None
+_store_lock = threading.Lock()
+
+
+def _get_store() -> FeatureStore:
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                try:
+                    _store = FeatureStore(FEATURE_STORE_PATH, FEATURE_STORE_CACHE_SIZE)
+                except FileNotFoundError as e:
+                    raise HTTPException(
+                        status_code=503, detail=f"{e}. Gere com: python src/feature_store.py"
+                    )
+    return _store
+
+
+def _job_by_code(vaga_code: str, store: Optional[FeatureStore]) -> tuple:
+    """-> (vaga registrada ou None, texto, tokens, vetor do store ou None): /jobs primeiro, depois o store."""
+    try:
+        job = _jobs.get(vaga_code)
+        return job, job.text, job.tokens, None
+    except UnknownJobError:
+        stored = store.job(vaga_code) if store is not None else None
+        if stored is None:
+            raise HTTPException(status_code=404, detail=f"vaga_code '{vaga_code}' não registrado nem no feature store.")
+        return None, stored.text, stored.tokens, stored.vec
+
+
+@app.post("/predict_by_ids", response_model=PredictResponse)
+def predict_by_ids(req: PredictByIdsRequest, request: Request):
+    """
+    Pontua o par (vaga_code, candidato_code) sem textos no payload: candidato vem do feature
+    store; a vaga vem do registro de /jobs ou, se não estiver lá, do feature store.
+    """
+    _mark_validated(request)
+    store = _get_store()
+    cand = store.candidate(req.candidato_code)
+    if cand is None:
+        raise HTTPException(status_code=404, detail=f"candidato_code '{req.candidato_code}' não está no feature store.")
+    job, job_text, job_tokens, job_vec = _job_by_code(req.vaga_code, store)
+
+    snap = _snapshot()
+    score, score_source = _resolve_score(job_text, cand.text, req.score_tecnico, req.mode, job_tokens, cand.tokens)
+    req_dict = {"job_text": job_text, "cand_text": cand.text, "situacao_norm": req.situacao_norm, "score_tecnico": score}
+
+    compute = None
+    model = snap.model
+    if _vectorizes_jobs(model) and cand.vec is not None and store.vocab_digest == model.vocab_digest():
+        # vetores do store valem para este vocabulário: só situação + score são analisados
+        def compute() -> float:
+            with _stage("classifier"):
+                if job is not None:
+                    job_counts = job.counts_for(model, snap.version)
+                else:
+                    job_counts = job_vec if job_vec is not None else model.job_counts(job_text)
+                return float(model.proba_from_job_counts(job_counts, [req_dict], cand_counts=[cand.vec])[0])
+    elif job is not None and _job_vectors_supported(snap):
+        compute = lambda: _registered_job_proba(snap, job, req_dict)  # noqa: E731
+
+    proba = _cached_predict(snap, req_dict, compute)
+    _mark_handler_done(request)
+    return PredictResponse(
+        y_prob=proba,
+        y_pred=int(proba >= snap.threshold),
+        details={
+            "mode": req.mode,
+            "vaga_code": req.vaga_code,
+            "candidato_code": req.candidato_code,
+            "score_tecnico": score,
+            "score_source": score_source,
             "situacao_norm": req.situacao_norm,
-            "threshold": _threshold,
+            "threshold": snap.threshold,
+            "model_version": snap.version,
+        },
+    )
+
+
+@app.post("/predict_batch", response_model=PredictBatchResponse)
+def predict_batch(req: PredictBatchRequest, request: Request):
+    if len(req.items) > MAX_BATCH_ITEMS:
+        raise HTTPException(
+            status_code=413,
+            detail=f"Lote com {len(req.items)} itens excede o limite de {MAX_BATCH_ITEMS}.",
+        )
+    results: List[PredictBatchItem] = [PredictBatchItem(index=i) for i in range(len(req.items))]
+    valid_idx: List[int] = []
+    valid_rows: List[dict] = []
+    for i, item in enumerate(req.items):
+        try:
+            row, _, _ = _request_row(PredictRequest(**item))
+        except ValidationError as e:
+            results[i].error = json.loads(e.json())
+            continue
+        except UnknownJobError as e:
+            results[i].error = str(e)
+            continue
+        valid_idx.append(i)
+        valid_rows.append(row)
+    _mark_validated(request)  # envelope + validação item a item
+    snap = _snapshot()
+
+    if valid_rows:
+        # uma única passada pelo pipeline para todos os itens válidos
+        probas = _predict_proba_rows(snap.model, valid_rows, snap.adapter)
+        for i, proba in zip(valid_idx, probas):
+            results[i].y_prob = float(proba)
+            results[i].y_pred = int(proba >= snap.threshold)
+
+    _mark_handler_done(request)
+    return PredictBatchResponse(
+        n_items=len(results),
+        n_ok=len(valid_rows),
+        n_errors=len(results) - len(valid_rows),
+        threshold=snap.threshold,
+        model_version=snap.version,
+        results=results,
+    )
+
+
+def _additive_tfidf_pipeline(model) -> Optional[tuple]:
+    """
+    (ColumnTransformer, TfidfVectorizer, classificador) se `model` seguir o formato de
+    make_pipeline() com TF-IDF aditivo (analisador 'word' padrão, só unigramas): aí as
+    contagens do texto concatenado são a soma das contagens da vaga e do candidato.
+    """
+    try:
+        col, clf = model.named_steps["prep"], model.named_steps["clf"]
+        tfidf = col.named_transformers_["text"].named_steps["tfidf"]
+        col.output_indices_
+    except (AttributeError, KeyError, TypeError):
+        return None
+    if (
+        not isinstance(tfidf, TfidfVectorizer)
+        or tfidf.analyzer != "word"
+        or tfidf.tokenizer is not None
+        or tfidf.preprocessor is not None
+        or tfidf.ngram_range[1] != 1
+    ):
+        return None
+    return col, tfidf, clf
+
+
+def _rank_proba_broadcast(col, tfidf: TfidfVectorizer, clf, job_text: str, cand_rows: List[dict],
+                          job_counts: Optional[sp.csr_matrix] = None) -> np.ndarray:
+    """
+    Mesmo resultado de `Pipeline.predict_proba`, com a vaga tokenizada uma vez: as
+    contagens da vaga (1 linha; `job_counts` se já vier do registro de /jobs) são somadas
+    às de cada candidato antes do idf/normalização.
+    """
+    with _stage("vectorization"):
+        job = job_counts if job_counts is not None else CountVectorizer.transform(tfidf, [f"[JOB]{job_text}"])
+        counts = CountVectorizer.transform(tfidf, [concat_cand_part(r) for r in cand_rows])
+        counts = (counts + sp.csr_matrix(np.ones((len(cand_rows), 1))) @ job).tocsr()
+        if tfidf.binary:
+            counts.data[:] = 1
+        # TfidfTransformer.transform
+        counts = counts.astype(np.float64)
+        if tfidf.sublinear_tf:
+            np.log(counts.data, counts.data)
+            counts.data += 1
+        if tfidf.use_idf:
+            counts = counts @ sp.diags(tfidf.idf_)
+        if tfidf.norm:
+            counts = normalize(counts, norm=tfidf.norm, copy=False)
+
+        # demais ramos do ColumnTransformer (ex.: scaler do score), na ordem das colunas de saída
+        X = _ADAPTERS["columns"]([{"job_text": job_text, **r} for r in cand_rows])
+        blocks = []
+        for name, trans, cols in col.transformers_:
+            sl = col.output_indices_[name]
+            if sl.stop == sl.start:
+                continue
+            block = counts if name == "text" else X[cols] if trans == "passthrough" else trans.transform(X[cols])
+            blocks.append((sl.start, block))
+        Xt = sp.hstack([sp.csr_matrix(b) for _, b in sorted(blocks, key=lambda t: t[0])], format="csr")
+    with _stage("classifier"):
+        return _positive_proba(clf.predict_proba(Xt))
+
+
+def _rank_proba(snap: _Snapshot, job_text: str, cand_rows: List[dict],
+                job: Optional[RegisteredJob] = None) -> np.ndarray:
+    """
+    Vaga tokenizada uma vez: no scorer compilado (`rank_proba`) e, com TF-IDF aditivo,
+    no Pipeline sklearn (`_rank_proba_broadcast`; com `job`, as contagens do registro).
+    Demais modelos: uma única chamada vetorizada com a vaga repetida em cada linha.
+    """
+    if isinstance(snap.model, CompiledScorer):
+        return snap.model.rank_proba(job_text, cand_rows)
+    parts = _additive_tfidf_pipeline(snap.model) if snap.adapter == "columns" else None
+    if parts is not None:
+        job_counts = job.counts_for(snap.model, snap.version) if job is not None else None
+        return _rank_proba_broadcast(*parts, job_text, cand_rows, job_counts=job_counts)
+    rows = [{"job_text": job_text, **r} for r in cand_rows]
+    return _predict_proba_rows(snap.model, rows, snap.adapter)
+
+
+@app.post("/rank", response_model=RankResponse)
+def rank(req: RankRequest, request: Request):
+    _mark_validated(request)
+    if len(req.candidates) > MAX_BATCH_ITEMS:
+        raise HTTPException(
+            status_code=413,
+            detail=f"Ranking com {len(req.candidates)} candidatos excede o limite de {MAX_BATCH_ITEMS}.",
+        )
+    snap = _snapshot()
+
+    cand_rows = [
+        {
+            "cand_text": c.cand_text,
+            "situacao_norm": c.situacao_norm,
+            "score_tecnico": _resolve_score(req.job_text, c.cand_text, c.score_tecnico, req.mode)[0],
+        }
+        for c in req.candidates
+    ]
+    probas = _rank_proba(snap, req.job_text, cand_rows) if cand_rows else np.empty(0)
+
+    # ordem estável: empates mantêm a ordem de entrada
+    order = np.argsort(-probas, kind="stable")
+    if req.top_k is not None:
+        order = order[: req.top_k]
+
+    results = [
+        RankItem(
+            rank=pos,
+            index=int(i),
+            candidato_code=req.candidates[i].candidato_code,
+            y_prob=float(probas[i]),
+            y_pred=int(probas[i] >= snap.threshold),
+            score_tecnico=cand_rows[i]["score_tecnico"],
+        )
+        for pos, i in enumerate(order, start=1)
+    ]
+    _mark_handler_done(request)
+    return RankResponse(
+        n_candidates=len(cand_rows),
+        threshold=snap.threshold,
+        model_version=snap.version,
+        results=results,
+    )
+
+
+# --------------------------------------------------------------------------------------
+# Streaming NDJSON (backfills): lê, pontua em blocos e devolve conforme processa
+# --------------------------------------------------------------------------------------
+_OVERSIZED = object()
+
+
+class _DuplexStreamingResponse(StreamingResponse):
+    """
+    StreamingResponse que lê o corpo enquanto responde. O original (ASGI < 2.4) escuta
+    `http.disconnect` numa task paralela, que consumiria as mensagens do corpo; aqui a
+    desconexão chega pelo próprio `request.stream()` (ClientDisconnect).
+    """
+
+    async def __call__(self, scope, receive, send) -> None:
+        await self.stream_response(send)
+
+
+async def _iter_ndjson_lines(request: Request) -> AsyncIterator[Any]:
+    """Quebra o corpo em linhas sem bufferizá-lo; linhas maiores que o limite viram `_OVERSIZED`."""
+    buf = b""
+    skipping = False
+    async for chunk in request.stream():
+        buf += chunk
+        while True:
+            nl = buf.find(b"\n")
+            if nl < 0:
+                break
+            line, buf = buf[:nl], buf[nl + 1:]
+            yield _OVERSIZED if skipping or len(line) > MAX_STREAM_LINE_BYTES else line
+            skipping = False
+        if len(buf) > MAX_STREAM_LINE_BYTES:
+            buf, skipping = b"", True
+    if skipping:
+        yield _OVERSIZED
+    elif buf:
+        yield _OVERSIZED if len(buf) > MAX_STREAM_LINE_BYTES else buf
+
+
+def _parse_stream_line(raw: bytes) -> tuple:
+    """-> (linha normalizada, None) ou (None, erro)."""
+    try:
+        obj = json.loads(raw)
+        if not isinstance(obj, dict):
+            return None, "Cada linha deve ser um objeto JSON (PredictRequest)."
+        row, _, _ = _request_row(PredictRequest(**obj))
+    except ValidationError as e:
+        return None, json.loads(e.json())
+    except UnknownJobError as e:
+        return None, str(e)
+    except ValueError as e:
+        return None, f"JSON inválido: {e}"
+    return row, None
+
+
+def _ndjson(obj: dict) -> bytes:
+    return (json.dumps(obj, ensure_ascii=False) + "\n").encode("utf-8")
+
+
+def _score_stream_chunk(snap: _Snapshot, lines: List[tuple]) -> tuple:
+    """
+    Parse + validação + predição de um bloco de linhas `(nº da linha, bytes)`, tudo fora do
+    event loop. -> (NDJSON do bloco na ordem das linhas, n_ok, n_errors).
+    """
+    pending: List[dict] = []
+    rows: List[dict] = []
+    for n, raw in lines:
+        if raw is _OVERSIZED:
+            row, err = None, f"Linha excede {MAX_STREAM_LINE_BYTES} bytes."
+        else:
+            row, err = _parse_stream_line(raw)
+        if err is not None:
+            pending.append({"line": n, "error": err})
+        else:
+            rows.append(row)
+            pending.append({"line": n})
+    if rows:
+        it = iter(_predict_proba_rows(snap.model, rows, snap.adapter))
+        for out in pending:
+            if "error" not in out:
+                p = float(next(it))
+                out.update(y_prob=p, y_pred=int(p >= snap.threshold))
+    data = b"".join(_ndjson(out) for out in pending)
+    return data, len(rows), len(pending) - len(rows)
+
+
+async def _score_stream(request: Request, snap: _Snapshot) -> AsyncIterator[bytes]:
+    # o event loop só recorta linhas; JSON/pydantic/modelo rodam no threadpool, um bloco por vez
+    chunk: List[tuple] = []
+    n_lines = n_ok = n_errors = 0
+
+    async def flush():
+        nonlocal n_ok, n_errors
+        data, ok, errors = await run_in_threadpool(_score_stream_chunk, snap, list(chunk))
+        chunk.clear()
+        n_ok += ok
+        n_errors += errors
+        return data
+
+    async for raw in _iter_ndjson_lines(request):
+        n_lines += 1
+        if raw is not _OVERSIZED and not raw.strip():
+            continue
+        chunk.append((n_lines, raw))
+        if len(chunk) >= STREAM_CHUNK_SIZE:
+            yield await flush()
+    if chunk:
+        yield await flush()
+    yield _ndjson({
+        "done": True,
+        "n_lines": n_lines,
+        "n_ok": n_ok,
+        "n_errors": n_errors,
+        "threshold": snap.threshold,
+        "model_version": snap.version,
+    })
+
+
+@app.post("/predict_stream")
+async def predict_stream(request: Request):
+    """
+    Corpo NDJSON (um PredictRequest por linha) -> NDJSON com `{"line", "y_prob", "y_pred"}` ou
+    `{"line", "error"}` por linha, na mesma ordem, e uma linha final `{"done": true, ...}`.
+    """
+    snap = await run_in_threadpool(_snapshot)
+    return _DuplexStreamingResponse(_score_stream(request, snap), media_type="application/x-ndjson")
+
+
+# --------------------------------------------------------------------------------------
+# Recuperação top-K sobre todos os candidatos (índice invertido + repontuação)
+# --------------------------------------------------------------------------------------
+_index: Optional[CandidateIndex] = None
+_index_sig: Optional[tuple] = None  # (mtime_ns, tamanho) do arquivo carregado em _index
+_index_lock = threading.Lock()
+
+
+def _reset_index() -> None:
+    global _index, _index_sig
+    with _index_lock:
+        _index, _index_sig = None, None
+
+
+def _model_source(snap: _Snapshot) -> str:
+    """Digest do pipeline por trás do modelo servido (compilado: `source_digest`; pipeline: a versão)."""
+    return (getattr(snap.model, "source_digest", None) or snap.version or "")[:12]
+
+
+def _index_matches(index: CandidateIndex, snap: _Snapshot) -> bool:
+    return str(index.meta.get("source_digest") or "")[:12] == _model_source(snap) != ""
+
+
+def _get_index(snap: _Snapshot) -> CandidateIndex:
+    """
+    Índice carregado sob demanda. Tem de ter sido gerado com o mesmo pipeline do modelo servido:
+    se não bater, relê o arquivo (se mudou no disco) e, persistindo a diferença, responde 409.
+    """
+    global _index, _index_sig
+    index = _index
+    if index is None or not _index_matches(index, snap):
+        with _index_lock:
+            if not CANDIDATE_INDEX_PATH.exists():
+                raise HTTPException(
+                    status_code=503,
+                    detail=f"Índice não encontrado: {CANDIDATE_INDEX_PATH}. Gere com: python src/candidate_index.py",
+                )
+            st = CANDIDATE_INDEX_PATH.stat()
+            sig = (st.st_mtime_ns, st.st_size)
+            if _index is None or (_index_sig != sig and not _index_matches(_index, snap)):
+                _index, _index_sig = joblib.load(CANDIDATE_INDEX_PATH), sig
+            index = _index
+        if not _index_matches(index, snap):
+            raise HTTPException(
+                status_code=409,
+                detail=(
+                    f"Índice de candidatos gerado com outro modelo (índice={index.meta.get('source_digest')!s:.12}, "
+                    f"modelo={_model_source(snap)}). Regenere com: python src/candidate_index.py"
+                ),
+            )
+    return index
+
+
+@app.post("/retrieve", response_model=RetrieveResponse)
+def retrieve(req: RetrieveRequest, request: Request):
+    """
+    Melhores candidatos de todo o pool para uma vaga: o índice invertido poda quem não
+    compartilha termos com a vaga e ordena por cosseno; a shortlist é repontuada com o
+    modelo completo em blocos, até esgotar o orçamento `budget_ms`.
+    """
+    _mark_validated(request)
+    t0 = time.perf_counter()
+    snap = _snapshot()
+    index, store = _get_index(snap), _get_store()
+    if req.vaga_code is not None:
+        job, job_text, job_tokens, _ = _job_by_code(req.vaga_code, store)
+    else:
+        job, job_text, job_tokens = None, req.job_text, None
+    budget_s = (req.budget_ms or RETRIEVAL_BUDGET_MS) / 1000.0
+    n_shortlist = max(req.shortlist or RETRIEVAL_SHORTLIST, req.top_k)
+
+    with _stage("retrieval"):
+        positions, sims, n_matched = index.query(job_text, n_shortlist)
+    t_retrieval = time.perf_counter()
+
+    model = snap.model
+    use_vectors = _vectorizes_jobs(model) and store.vocab_digest == model.vocab_digest()
+    job_counts = None
+    if _vectorizes_jobs(model):
+        job_counts = job.counts_for(model, snap.version) if job is not None else model.job_counts(job_text)
+
+    scored: List[tuple] = []  # (y_prob, posição na shortlist, código, similaridade, score)
+    truncated = False
+    for start in range(0, len(positions), RETRIEVAL_CHUNK):
+        if scored and time.perf_counter() - t0 > budget_s:
+            truncated = True
+            break
+        feats, sim_chunk = [], []
+        for pos, sim in zip(positions[start:start + RETRIEVAL_CHUNK], sims[start:start + RETRIEVAL_CHUNK]):
+            f = store.candidate(index.codes[pos], cache_miss=False)
+            if f is not None:
+                feats.append(f)
+                sim_chunk.append(float(sim))
+        rows = [
+            {
+                "cand_text": f.text,
+                "situacao_norm": req.situacao_norm,
+                "score_tecnico": _resolve_score(job_text, f.text, None, SCORE_MODE_SERVER, job_tokens, f.tokens)[0],
+            }
+            for f in feats
+        ]
+        if not rows:
+            continue
+        if job_counts is not None:
+            with _stage("classifier"):
+                cand_counts = [f.vec for f in feats] if use_vectors and all(f.vec is not None for f in feats) else None
+                probas = model.proba_from_job_counts(job_counts, rows, cand_counts=cand_counts)
+        else:
+            probas = _rank_proba(snap, job_text, rows, job)
+        for i, (f, r) in enumerate(zip(feats, rows)):
+            scored.append((float(probas[i]), start + i, f.code, sim_chunk[i], r["score_tecnico"]))
+    t_rescore = time.perf_counter()
+
+    # maior probabilidade primeiro; empates pela ordem de similaridade
+    scored.sort(key=lambda t: (-t[0], t[1]))
+    results = [
+        RetrieveItem(
+            rank=rank,
+            candidato_code=code,
+            similarity=sim,
+            score_tecnico=score,
+            y_prob=p,
+            y_pred=int(p >= snap.threshold),
+        )
+        for rank, (p, _, code, sim, score) in enumerate(scored[: req.top_k], start=1)
+    ]
+    _mark_handler_done(request)
+    return RetrieveResponse(
+        n_pool=len(index),
+        n_matched=n_matched,
+        n_shortlist=len(positions),
+        n_rescored=len(scored),
+        truncated=truncated,
+        threshold=snap.threshold,
+        model_version=snap.version,
+        timings_ms={
+            "retrieval": (t_retrieval - t0) * 1000,
+            "rescoring": (t_rescore - t_retrieval) * 1000,
         },
+        results=results,
     )
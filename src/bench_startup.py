@@ -0,0 +1,150 @@
+# src/bench_startup.py
+# -*- coding: utf-8 -*-
+"""
+Benchmark de startup da API (cold start de container / autoscaling).
+
+Mede, cada um num processo Python novo (sem cache de import do processo atual):
+- tempo de import dos módulos pesados (numpy, pandas, sklearn, fastapi) e do app (src.api)
+- tempo de `joblib.load` de cada artefato em models/ (o shared também com mmap_mode="r")
+- com --serve: sobe o uvicorn e mede o tempo até o primeiro byte (GET /health) e até /ready = 200
+
+Uso:
+    python src/bench_startup.py
+    python src/bench_startup.py --repeat 5 --serve --out models/startup_benchmark.json
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import socket
+import statistics
+import subprocess
+import sys
+import time
+import urllib.error
+import urllib.request
+from pathlib import Path
+from typing import Dict, List, Optional
+
+ROOT = Path(__file__).resolve().parents[1]
+MODELS_DIR = ROOT / "models"
+
+IMPORT_TARGETS = ["numpy", "pandas", "sklearn", "fastapi", "src.api"]
+
+_IMPORT_SNIPPET = "import time; t = time.perf_counter(); import {mod}; print(time.perf_counter() - t)"
+_LOAD_SNIPPET = (
+    "import time, joblib; t = time.perf_counter(); joblib.load({path!r}, mmap_mode={mmap!r}); "
+    "print(time.perf_counter() - t)"
+)
+
+
+def _run_python(code: str) -> float:
+    out = subprocess.run([sys.executable, "-c", code], cwd=ROOT, capture_output=True, text=True, check=True)
+    return float(out.stdout.strip().splitlines()[-1])
+
+
+def _summary(values: List[float]) -> Dict[str, float]:
+    return {"median_s": statistics.median(values), "min_s": min(values), "max_s": max(values)}
+
+
+def bench_imports(repeat: int) -> Dict[str, Dict[str, float]]:
+    return {mod: _summary([_run_python(_IMPORT_SNIPPET.format(mod=mod)) for _ in range(repeat)])
+            for mod in IMPORT_TARGETS}
+
+
+def bench_artifacts(repeat: int) -> Dict[str, Dict[str, float]]:
+    results = {}
+    for path in sorted(MODELS_DIR.glob("*.joblib")):
+        modes = [None, "r"] if path.name == "model_shared.joblib" else [None]
+        for mmap in modes:
+            name = path.name + (" (mmap)" if mmap else "")
+            try:
+                times = [_run_python(_LOAD_SNIPPET.format(path=str(path), mmap=mmap)) for _ in range(repeat)]
+            except subprocess.CalledProcessError as e:
+                results[name] = {"error": (e.stderr or "").strip().splitlines()[-1:] or ["falhou"]}
+                continue
+            results[name] = {**_summary(times), "size_mb": path.stat().st_size / 1e6}
+    return results
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def _get(url: str) -> Optional[int]:
+    try:
+        with urllib.request.urlopen(url, timeout=1) as resp:
+            return resp.status
+    except urllib.error.HTTPError as e:
+        return e.code
+    except OSError:
+        return None
+
+
+def bench_serve(timeout_s: float) -> Dict[str, Optional[float]]:
+    """Tempo desde o spawn do uvicorn até o primeiro 200 em /health (TTFB) e em /ready."""
+    port = _free_port()
+    base = f"http://127.0.0.1:{port}"
+    start = time.perf_counter()
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "src.api:app", "--port", str(port), "--log-level", "warning"],
+        cwd=ROOT,
+    )
+    first_byte = ready = None
+    try:
+        while time.perf_counter() - start < timeout_s and ready is None:
+            if first_byte is None and _get(base + "/health") == 200:
+                first_byte = time.perf_counter() - start
+            if first_byte is not None and _get(base + "/ready") == 200:
+                ready = time.perf_counter() - start
+            time.sleep(0.02)
+        with urllib.request.urlopen(base + "/ready", timeout=1) as resp:
+            startup = json.loads(resp.read())["startup"] if ready is not None else None
+    except OSError:
+        startup = None
+    finally:
+        proc.terminate()
+        proc.wait(timeout=10)
+    return {"time_to_first_byte_s": first_byte, "time_to_ready_s": ready, "server_startup": startup}
+
+
+def parse_args():
+    p = argparse.ArgumentParser(description="Benchmark de startup: imports, carga de artefatos e TTFB da API.")
+    p.add_argument("--repeat", type=int, default=3, help="Repetições por medida (default=3; reporta mediana)")
+    p.add_argument("--serve", action="store_true", help="Sobe o uvicorn e mede TTFB e tempo até /ready")
+    p.add_argument("--timeout", type=float, default=120.0, help="Timeout do --serve em segundos")
+    p.add_argument("--out", type=Path, default=None, help="Grava o resultado em JSON")
+    return p.parse_args()
+
+
+def main():
+    args = parse_args()
+    result = {"python": sys.version.split()[0], "repeat": args.repeat}
+
+    result["imports"] = bench_imports(args.repeat)
+    for mod, r in result["imports"].items():
+        print(f"[INFO] import {mod:<10} {r['median_s'] * 1000:8.1f} ms (mediana)")
+
+    result["artifacts"] = bench_artifacts(args.repeat)
+    for name, r in result["artifacts"].items():
+        if "error" in r:
+            print(f"[WARN] load {name}: {r['error']}")
+        else:
+            print(f"[INFO] load {name:<28} {r['median_s'] * 1000:8.1f} ms ({r['size_mb']:.1f} MB)")
+
+    if args.serve:
+        result["serve"] = bench_serve(args.timeout)
+        s = result["serve"]
+        print(f"[INFO] TTFB={s['time_to_first_byte_s']} s | ready={s['time_to_ready_s']} s")
+
+    if args.out:
+        args.out.parent.mkdir(parents=True, exist_ok=True)
+        args.out.write_text(json.dumps(result, ensure_ascii=False, indent=2), encoding="utf-8")
+        print(f"[OK] benchmark salvo em: {args.out}")
+
+
+if __name__ == "__main__":
+    main()
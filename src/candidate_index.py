@@ -0,0 +1,131 @@
+# src/candidate_index.py
+# -*- coding: utf-8 -*-
+"""
+Índice invertido dos candidatos (todo o Applicants.json) para recuperação top-K por vaga.
+
+Offline: cada candidato do feature store (src/feature_store.py) é vetorizado com o
+TfidfVectorizer do pipeline treinado; a matriz candidatos x termos fica em CSC, ou seja,
+uma lista de postings por termo. Na consulta, só as colunas dos termos da vaga são
+percorridas (similaridade de cosseno), o que poda quem não compartilha termos com ela;
+a shortlist é então repontuada com o modelo completo na API (POST /retrieve).
+
+Uso:
+    python src/candidate_index.py                  # models/candidate_index.joblib
+    python src/candidate_index.py --model models/model.joblib --store data/processed/feature_store.sqlite
+"""
+
+from __future__ import annotations
+
+import argparse
+import sys
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+import joblib
+import numpy as np
+from scipy import sparse
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from src.compiled_scorer import SOURCE_MODEL_FILES, file_sha256  # noqa: E402
+from src.feature_store import FEATURE_STORE_FILE, FeatureStore  # noqa: E402
+
+CANDIDATE_INDEX_FILE = ROOT / "models" / "candidate_index.joblib"
+
+
+def extract_vectorizer(pipe):
+    """TfidfVectorizer treinado do pipeline de `make_pipeline()` (ValueError se não houver)."""
+    try:
+        return pipe.named_steps["prep"].named_transformers_["text"].named_steps["tfidf"]
+    except (AttributeError, KeyError) as e:
+        raise ValueError(f"Pipeline sem TfidfVectorizer no formato de make_pipeline(): {e}") from e
+
+
+class CandidateIndex:
+    """Matriz TF-IDF (l2) candidatos x termos em CSC + códigos dos candidatos + vetorizador."""
+
+    def __init__(self, vectorizer, matrix: sparse.csc_matrix, codes: np.ndarray, meta: Optional[Dict[str, Any]] = None):
+        self.vectorizer = vectorizer
+        self.matrix = matrix
+        self.codes = codes
+        self.meta = dict(meta or {})
+
+    def __len__(self) -> int:
+        return len(self.codes)
+
+    @property
+    def size_bytes(self) -> int:
+        m = self.matrix
+        return int(m.data.nbytes + m.indices.nbytes + m.indptr.nbytes + self.codes.nbytes)
+
+    def query(self, text: str, n: int) -> Tuple[np.ndarray, np.ndarray, int]:
+        """
+        -> (posições dos até `n` candidatos mais similares, similaridades, nº com algum termo em comum).
+        Percorre só os postings dos termos presentes em `text`.
+        """
+        q = self.vectorizer.transform([text])
+        if q.nnz == 0:
+            return np.empty(0, dtype=np.int64), np.empty(0), 0
+        sims = self.matrix[:, q.indices] @ q.data
+        matched = np.flatnonzero(sims > 0)
+        if len(matched) > n:
+            matched = matched[np.argpartition(-sims[matched], n - 1)[:n]]
+        order = matched[np.argsort(-sims[matched], kind="stable")]
+        return order, sims[order], int(np.count_nonzero(sims > 0))
+
+    def stats(self) -> dict:
+        return {
+            "n_candidates": len(self),
+            "n_terms": int(self.matrix.shape[1]),
+            "nnz": int(self.matrix.nnz),
+            "size_mb": self.size_bytes / 1e6,
+            **self.meta,
+        }
+
+
+def build_index(store: FeatureStore, vectorizer, chunk_size: int = 2000, **meta) -> CandidateIndex:
+    """Vetoriza os candidatos do store em blocos e monta o índice (CSC)."""
+    start = time.perf_counter()
+    blocks: List[sparse.csr_matrix] = []
+    codes: List[str] = []
+    for chunk in store.iter_texts("candidates", chunk_size):
+        codes.extend(code for code, _ in chunk)
+        blocks.append(vectorizer.transform([text for _, text in chunk]))
+    n_terms = len(vectorizer.vocabulary_)
+    matrix = sparse.vstack(blocks).tocsc() if blocks else sparse.csc_matrix((0, n_terms))
+    index = CandidateIndex(vectorizer, matrix, np.array(codes, dtype=object))
+    index.meta.update(meta, build_seconds=time.perf_counter() - start, built_at=time.strftime("%Y-%m-%dT%H:%M:%S"))
+    return index
+
+
+def parse_args():
+    p = argparse.ArgumentParser(description="Gera o índice invertido de candidatos para recuperação top-K.")
+    p.add_argument("--model", type=Path, default=None, help="Pipeline .joblib (default: model_cv.joblib ou model.joblib)")
+    p.add_argument("--store", type=Path, default=FEATURE_STORE_FILE, help=f"Feature store (default={FEATURE_STORE_FILE})")
+    p.add_argument("--out", type=Path, default=CANDIDATE_INDEX_FILE, help=f"Saída (default={CANDIDATE_INDEX_FILE})")
+    return p.parse_args()
+
+
+def main():
+    args = parse_args()
+    model_path = args.model or next((p for p in SOURCE_MODEL_FILES if p.exists()), None)
+    if model_path is None:
+        raise FileNotFoundError("Nenhum modelo encontrado. Treine com: python src/train_baseline.py")
+    vectorizer = extract_vectorizer(joblib.load(model_path))
+    # source_digest: a API só usa o índice com o modelo gerado a partir deste mesmo pipeline
+    index = build_index(FeatureStore(args.store, cache_size=0), vectorizer, source_model=model_path.name,
+                        source_digest=file_sha256(model_path))
+    joblib.dump(index, args.out)
+    st = index.stats()
+    print(
+        f"[OK] índice: {args.out} | candidatos={st['n_candidates']} termos={st['n_terms']} nnz={st['nnz']} "
+        f"| {st['size_mb']:.1f} MB em memória, {args.out.stat().st_size / 1e6:.1f} MB em disco "
+        f"| build {st['build_seconds']:.1f}s"
+    )
+
+
+if __name__ == "__main__":
+    main()
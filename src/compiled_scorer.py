@@ -0,0 +1,399 @@
+# src/compiled_scorer.py
+# -*- coding: utf-8 -*-
+"""
+Compila o pipeline de `make_pipeline()` (TF-IDF + StandardScaler + LogisticRegression)
+num scorer compacto, só com numpy: vocabulário, idf, coeficientes, escala do
+score_tecnico e intercepto.
+
+Na inferência isso é um produto esparso + sigmoide; o scorer evita a montagem de
+DataFrame, o `concat_cols_df` via pandas e o despacho do ColumnTransformer.
+
+Uso:
+    python src/compiled_scorer.py                 # compila models/model_cv.joblib (ou model.joblib)
+    python src/compiled_scorer.py --model models/model.joblib
+    python src/compiled_scorer.py --shared        # layout para mmap (vários workers, ver src/serve.py)
+
+Saída:
+- models/model_compiled.joblib (carregado pela API quando existir e o `source_digest` bater com o pipeline)
+- models/model_shared.joblib (com --shared): só arrays numpy, aberto com `mmap_mode="r"`
+"""
+
+from __future__ import annotations
+
+import argparse
+import hashlib
+import re
+import unicodedata
+from collections import Counter
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Mapping, Optional
+
+import joblib
+import numpy as np
+
+ROOT = Path(__file__).resolve().parents[1]
+MODELS_DIR = ROOT / "models"
+COMPILED_MODEL_FILE = MODELS_DIR / "model_compiled.joblib"
+SHARED_MODEL_FILE = MODELS_DIR / "model_shared.joblib"
+SOURCE_MODEL_FILES = [MODELS_DIR / "model_cv.joblib", MODELS_DIR / "model.joblib"]
+
+FEATURE_COLS = ["job_text", "cand_text", "situacao_norm", "score_tecnico"]
+
+
+def concat_row(row: Mapping[str, Any]) -> str:
+    """Equivalente linha-a-linha de `train_baseline.concat_cols_df`."""
+    return f"[JOB]{row['job_text']} " + concat_cand_part(row)
+
+
+def concat_cand_part(row: Mapping[str, Any]) -> str:
+    """Parte do texto concatenado que depende só do candidato (tudo depois de `[JOB]...`)."""
+    return f"[CAND]{row['cand_text']} " + concat_pair_part(row)
+
+
+def concat_pair_part(row: Mapping[str, Any]) -> str:
+    """Parte que depende do par (situação + score), depois de `[CAND]...`."""
+    return f"[SIT]{row['situacao_norm']} [SCORE]{float(row['score_tecnico'])}"
+
+
+def _strip_accents(s: str, mode: Optional[str]) -> str:
+    if mode is None:
+        return s
+    nfkd = unicodedata.normalize("NFKD", s)
+    if mode == "ascii":
+        return nfkd.encode("ASCII", "ignore").decode("ASCII")
+    if s == nfkd:  # mesmo atalho do sklearn (strip_accents_unicode)
+        return s
+    return "".join(c for c in nfkd if not unicodedata.combining(c))
+
+
+class SortedVocabulary:
+    """
+    Vocabulário como array ordenado de termos (bytes UTF-8, largura fixa) + coluna de cada termo.
+
+    Diferente do dict do TfidfVectorizer, são só arrays numpy: salvos sem compressão pelo joblib,
+    abrem com `mmap_mode="r"` e as páginas ficam compartilhadas entre os processos (workers).
+    A busca é por `np.searchsorted`.
+    """
+
+    def __init__(self, terms: np.ndarray, index: np.ndarray):
+        self.terms = terms
+        self.index = index
+
+    @classmethod
+    def from_dict(cls, vocabulary: Mapping[str, int]) -> "SortedVocabulary":
+        items = sorted((t.encode("utf-8"), int(i)) for t, i in vocabulary.items())
+        width = max((len(t) for t, _ in items), default=1) or 1
+        terms = np.array([t for t, _ in items], dtype=f"S{width}")
+        index = np.array([i for _, i in items], dtype=np.int64)
+        return cls(terms, index)
+
+    def __len__(self) -> int:
+        return len(self.terms)
+
+    def lookup(self, tokens: List[str]) -> np.ndarray:
+        """Colunas dos tokens presentes no vocabulário (com repetição, na ordem dos tokens)."""
+        width = self.terms.dtype.itemsize
+        enc = [b for b in (t.encode("utf-8") for t in tokens) if len(b) <= width]  # maiores não existem
+        if not enc or not len(self.terms):
+            return np.empty(0, dtype=np.int64)
+        arr = np.array(enc, dtype=self.terms.dtype)
+        pos = np.minimum(np.searchsorted(self.terms, arr), len(self.terms) - 1)
+        return self.index[pos[self.terms[pos] == arr]]
+
+
+class CompiledScorer:
+    """
+    Scorer binário equivalente ao pipeline treinado (paridade com `predict_proba`).
+
+    Reproduz o analisador 'word' do TfidfVectorizer (lowercase, strip_accents,
+    token_pattern, stop words, n-gramas), tf (bruto/binário/sublinear) * idf,
+    normalização l1/l2 e a escala do score_tecnico, somando tudo ao intercepto.
+    """
+
+    def __init__(
+        self,
+        vocabulary: Dict[str, int],
+        idf: np.ndarray,
+        coef_text: np.ndarray,
+        coef_score: float,
+        score_mean: float,
+        score_scale: float,
+        intercept: float,
+        token_pattern: str,
+        lowercase: bool = True,
+        strip_accents: Optional[str] = None,
+        ngram_range: tuple = (1, 1),
+        stop_words: Optional[Iterable[str]] = None,
+        norm: Optional[str] = "l2",
+        sublinear_tf: bool = False,
+        binary: bool = False,
+        source_digest: Optional[str] = None,
+    ):
+        self.vocabulary = vocabulary if isinstance(vocabulary, SortedVocabulary) else dict(vocabulary)
+        self.idf = np.asarray(idf, dtype=np.float64)
+        self.coef_text = np.asarray(coef_text, dtype=np.float64)
+        self.coef_score = float(coef_score)
+        self.score_mean = float(score_mean)
+        self.score_scale = float(score_scale)
+        self.intercept = float(intercept)
+        self.token_pattern = token_pattern
+        self.lowercase = bool(lowercase)
+        self.strip_accents = strip_accents
+        self.ngram_range = tuple(ngram_range)
+        self.stop_words = frozenset(stop_words) if stop_words else None
+        self.norm = norm
+        self.sublinear_tf = bool(sublinear_tf)
+        self.binary = bool(binary)
+        self.source_digest = source_digest  # sha256 do pipeline de origem (ver `export`)
+        self._token_re = re.compile(token_pattern)
+
+    # -------------------------- análise de texto --------------------------
+    def analyze(self, doc: str) -> List[str]:
+        if self.lowercase:
+            doc = doc.lower()
+        doc = _strip_accents(doc, self.strip_accents)
+        tokens = self._token_re.findall(doc)
+        if self.stop_words is not None:
+            tokens = [w for w in tokens if w not in self.stop_words]
+        min_n, max_n = self.ngram_range
+        if max_n == 1:
+            return tokens
+        original = tokens
+        if min_n == 1:
+            tokens = list(original)
+            min_n += 1
+        else:
+            tokens = []
+        n_original = len(original)
+        for n in range(min_n, min(max_n + 1, n_original + 1)):
+            for i in range(n_original - n + 1):
+                tokens.append(" ".join(original[i : i + n]))
+        return tokens
+
+    @property
+    def additive(self) -> bool:
+        """Com unigramas, as contagens do texto concatenado são a soma das contagens das partes."""
+        return self.ngram_range[1] == 1
+
+    def counts(self, doc: str) -> Counter:
+        if isinstance(self.vocabulary, SortedVocabulary):
+            return Counter(self.vocabulary.lookup(self.analyze(doc)).tolist())
+        return Counter(self.vocabulary[t] for t in self.analyze(doc) if t in self.vocabulary)
+
+    def vocab_digest(self) -> str:
+        """Identifica vocabulário + analisador; vetores pré-calculados só valem com o mesmo digest."""
+        digest = getattr(self, "_vocab_digest", None)
+        if digest is None:
+            h = hashlib.sha1()
+            if isinstance(self.vocabulary, SortedVocabulary):
+                pairs = ((t.decode("utf-8"), int(i)) for t, i in zip(self.vocabulary.terms, self.vocabulary.index))
+            else:
+                pairs = sorted(self.vocabulary.items())
+            for term, idx in pairs:
+                h.update(f"{term}\t{idx}\n".encode("utf-8"))
+            h.update(repr((self.token_pattern, self.lowercase, self.strip_accents, self.ngram_range,
+                           sorted(self.stop_words or ()))).encode("utf-8"))
+            digest = self._vocab_digest = h.hexdigest()[:12]
+        return digest
+
+    def shared(self) -> "CompiledScorer":
+        """Cópia com o vocabulário em `SortedVocabulary` (layout para mmap)."""
+        if isinstance(self.vocabulary, SortedVocabulary):
+            return self
+        return CompiledScorer(
+            vocabulary=SortedVocabulary.from_dict(self.vocabulary),
+            idf=self.idf,
+            coef_text=self.coef_text,
+            coef_score=self.coef_score,
+            score_mean=self.score_mean,
+            score_scale=self.score_scale,
+            intercept=self.intercept,
+            token_pattern=self.token_pattern,
+            lowercase=self.lowercase,
+            strip_accents=self.strip_accents,
+            ngram_range=self.ngram_range,
+            stop_words=self.stop_words,
+            norm=self.norm,
+            sublinear_tf=self.sublinear_tf,
+            binary=self.binary,
+            source_digest=self.source_digest,
+        )
+
+    def _text_decision(self, doc: str) -> float:
+        return self._counts_decision(self.counts(doc))
+
+    def _counts_decision(self, counts: Counter) -> float:
+        if not counts:
+            return 0.0
+        idx = np.fromiter(counts.keys(), dtype=np.int64, count=len(counts))
+        tf = np.fromiter(counts.values(), dtype=np.float64, count=len(counts))
+        if self.binary:
+            tf = np.ones_like(tf)
+        elif self.sublinear_tf:
+            tf = np.log(tf) + 1.0
+        w = tf * self.idf[idx]
+        if self.norm == "l2":
+            n = np.sqrt(np.dot(w, w))
+        elif self.norm == "l1":
+            n = np.abs(w).sum()
+        else:
+            n = 1.0
+        if n == 0.0:
+            return 0.0
+        return float(np.dot(w, self.coef_text[idx]) / n)
+
+    # ------------------------------ inferência -----------------------------
+    def decision_rows(self, rows: Iterable[Mapping[str, Any]]) -> np.ndarray:
+        out = []
+        for r in rows:
+            z = self._text_decision(concat_row(r))
+            z += (float(r["score_tecnico"]) - self.score_mean) / self.score_scale * self.coef_score
+            out.append(z + self.intercept)
+        return np.asarray(out, dtype=np.float64)
+
+    def rank_proba(self, job_text: str, cand_rows: List[Mapping[str, Any]]) -> np.ndarray:
+        """
+        Probabilidades de vários candidatos para a mesma vaga, tokenizando a vaga uma vez só.
+        Sem aditividade (n-gramas > 1), cai no caminho linha-a-linha.
+        """
+        if not self.additive:
+            return self.predict_proba([{"job_text": job_text, **r} for r in cand_rows])[:, 1]
+        return self.proba_from_job_counts(self.job_counts(job_text), cand_rows)
+
+    def job_counts(self, job_text: str) -> Counter:
+        """Contagens da parte `[JOB]...` do texto; reaproveitáveis entre candidatos se `additive`."""
+        return self.counts(f"[JOB]{job_text}")
+
+    def cand_counts(self, cand_text: str) -> Counter:
+        """Contagens da parte `[CAND]...` (sem situação/score), pré-calculáveis por candidato."""
+        return self.counts(f"[CAND]{cand_text}")
+
+    def proba_from_job_counts(
+        self,
+        job_counts: Counter,
+        cand_rows: List[Mapping[str, Any]],
+        cand_counts: Optional[List[Counter]] = None,
+    ) -> np.ndarray:
+        """
+        Probabilidades com a vaga já vetorizada (`job_counts`) e, opcionalmente, os candidatos
+        também (`cand_counts`, de `cand_counts()`); só vale com `additive`.
+        """
+        z = np.empty(len(cand_rows), dtype=np.float64)
+        for i, r in enumerate(cand_rows):
+            if cand_counts is None:
+                counts = job_counts + self.counts(concat_cand_part(r))
+            else:
+                counts = job_counts + cand_counts[i] + self.counts(concat_pair_part(r))
+            z[i] = self._counts_decision(counts)
+            z[i] += (float(r["score_tecnico"]) - self.score_mean) / self.score_scale * self.coef_score
+        return 1.0 / (1.0 + np.exp(-(z + self.intercept)))
+
+    def predict_proba(self, X) -> np.ndarray:
+        """Aceita lista de dicts (caminho rápido) ou DataFrame com as colunas de treino."""
+        if hasattr(X, "to_dict"):
+            X = X[FEATURE_COLS].to_dict("records")
+        p = 1.0 / (1.0 + np.exp(-self.decision_rows(X)))
+        return np.column_stack([1.0 - p, p])
+
+
+# --------------------------------------------------------------------------------------
+# Compilação a partir do pipeline treinado
+# --------------------------------------------------------------------------------------
+def compile_pipeline(pipe) -> CompiledScorer:
+    """
+    Extrai os arrays do pipeline de `make_pipeline()` já treinado.
+    Levanta ValueError se a estrutura/configuração não for suportada.
+    """
+    try:
+        col = pipe.named_steps["prep"]
+        clf = pipe.named_steps["clf"]
+        text_pipe = col.named_transformers_["text"]
+        score_pipe = col.named_transformers_["score"]
+        tfidf = text_pipe.named_steps["tfidf"]
+        scaler = score_pipe.named_steps["scaler"]
+        slices = col.output_indices_
+    except (AttributeError, KeyError) as e:
+        raise ValueError(f"Pipeline não segue o formato de make_pipeline(): {e}") from e
+
+    if tfidf.analyzer != "word" or tfidf.tokenizer is not None or tfidf.preprocessor is not None:
+        raise ValueError("Só o analisador 'word' padrão (sem tokenizer/preprocessor custom) é suportado.")
+    if clf.coef_.shape[0] != 1:
+        raise ValueError("Só classificação binária é suportada.")
+
+    coef = np.asarray(clf.coef_[0], dtype=np.float64)
+    text_sl, score_sl = slices["text"], slices["score"]
+    if score_sl.stop - score_sl.start != 1:
+        raise ValueError("O ramo 'score' deveria produzir uma única coluna.")
+
+    n_vocab = len(tfidf.vocabulary_)
+    idf = np.asarray(tfidf.idf_, dtype=np.float64) if tfidf.use_idf else np.ones(n_vocab)
+    mean = getattr(scaler, "mean_", None)
+    scale = getattr(scaler, "scale_", None)
+
+    return CompiledScorer(
+        vocabulary={str(k): int(v) for k, v in tfidf.vocabulary_.items()},
+        idf=idf,
+        coef_text=coef[text_sl],
+        coef_score=float(coef[score_sl][0]),
+        score_mean=float(mean[0]) if (scaler.with_mean and mean is not None) else 0.0,
+        score_scale=float(scale[0]) if (scaler.with_std and scale is not None) else 1.0,
+        intercept=float(clf.intercept_[0]),
+        token_pattern=tfidf.token_pattern,
+        lowercase=tfidf.lowercase,
+        strip_accents=tfidf.strip_accents,
+        ngram_range=tfidf.ngram_range,
+        stop_words=tfidf.get_stop_words(),
+        norm=tfidf.norm,
+        sublinear_tf=tfidf.sublinear_tf,
+        binary=tfidf.binary,
+    )
+
+
+def file_sha256(path: Path) -> str:
+    h = hashlib.sha256()
+    with Path(path).open("rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def source_digest_of(path: Path) -> Optional[str]:
+    """`source_digest` gravado num scorer exportado (None se ilegível ou exportado sem digest)."""
+    try:
+        return getattr(joblib.load(path, mmap_mode="r"), "source_digest", None)
+    except Exception:
+        return None
+
+
+def export(model_path: Path, out_path: Path = COMPILED_MODEL_FILE, shared: bool = False) -> CompiledScorer:
+    """Compila `model_path` e grava em `out_path` com o sha256 da origem (`source_digest`)."""
+    scorer = compile_pipeline(joblib.load(model_path))
+    scorer.source_digest = file_sha256(model_path)
+    if shared:
+        scorer = scorer.shared()
+    joblib.dump(scorer, out_path)  # sem compressão: os arrays ficam alinhados para mmap
+    return scorer
+
+
+def parse_args():
+    p = argparse.ArgumentParser(description="Compila o pipeline treinado num scorer numpy para a API.")
+    p.add_argument("--model", type=Path, default=None, help="Pipeline .joblib (default: model_cv.joblib ou model.joblib)")
+    p.add_argument("--out", type=Path, default=None,
+                   help=f"Saída (default={COMPILED_MODEL_FILE} ou {SHARED_MODEL_FILE} com --shared)")
+    p.add_argument("--shared", action="store_true",
+                   help="Vocabulário em arrays ordenados, para abrir com mmap e compartilhar entre workers")
+    return p.parse_args()
+
+
+def main():
+    args = parse_args()
+    model_path = args.model or next((p for p in SOURCE_MODEL_FILES if p.exists()), None)
+    if model_path is None:
+        raise FileNotFoundError("Nenhum modelo encontrado. Treine com: python src/train_baseline.py")
+    out = args.out or (SHARED_MODEL_FILE if args.shared else COMPILED_MODEL_FILE)
+    scorer = export(model_path, out, shared=args.shared)
+    print(f"[OK] scorer compilado: {out} (origem={model_path.name}, vocab={len(scorer.vocabulary)})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,380 @@
+# src/dataset_builder.py
+# -*- coding: utf-8 -*-
+"""
+Tabela de pares (vaga, candidato) construída uma vez a partir dos JSONs e reaproveitada
+por train_baseline.py, train_cv.py e make_drift_report.py.
+
+A tabela vai para um cache colunar (Parquet; pickle se não houver pyarrow) em
+data/processed/cache/, com chave = sha256 do conteúdo de Jobs/Prospects/Applicants.json +
+configuração do builder (chaves de campos, BUILDER_VERSION). Mudou um JSON ou a config,
+a chave muda e a tabela é reconstruída; senão, é lida direto do cache.
+
+No rebuild, Applicants/Jobs.json são lidos em stream e só o texto achatado de cada
+candidato/vaga fica em memória; Prospects.json também é lido em stream e os pares vão para
+o Parquet em row groups de ROW_GROUP_ROWS linhas (ParquetWriter), sem montar a tabela inteira.
+
+Colunas: vaga_code, candidato_code, job_text, cand_text, situacao_norm, score_tecnico,
+y_status (rótulo só pelo status) e y (status, com fallback pelo comentário). Rótulos
+ausentes ficam como <NA>; o pós-processamento (weak labels, dropna, dedupe) é de cada script.
+
+Uso:
+    python src/dataset_builder.py             # usa o cache se válido
+    python src/dataset_builder.py --refresh   # força a reconstrução
+"""
+
+from __future__ import annotations
+
+import argparse
+import hashlib
+import json
+import os
+import sys
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+import pandas as pd
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from src.json_stream import iter_json_items  # noqa: E402
+from src.train_baseline import (  # noqa: E402
+    APPLICANT_CV_KEYS,
+    APPLICANT_SUBDICT_KEYS,
+    CANDIDATE_KEY,
+    COMMENT_KEYS,
+    JOB_SUBDICT_KEYS,
+    NEG_KEYS,
+    POS_KEYS,
+    STATUS_KEYS,
+    find_file,
+    first_key,
+    flatten_text_from_subdicts,
+    label_from_text,
+    score_tecnico,
+)
+
+DATASET_CACHE_DIR = ROOT / "data" / "processed" / "cache"
+RAW_FILES = ("Jobs.json", "Prospects.json", "Applicants.json")
+PAIR_COLUMNS = ["vaga_code", "candidato_code", "job_text", "cand_text", "situacao_norm", "score_tecnico", "y_status", "y"]
+
+# Incrementar sempre que a lógica de build_pairs mudar (invalida os caches antigos)
+BUILDER_VERSION = 2
+
+ROW_GROUP_ROWS = 20_000
+
+_HASH_MEMO = "hashes.json"
+
+
+def builder_config() -> Dict[str, Any]:
+    """
+    Tudo que, além dos JSONs, define o conteúdo da tabela (entra na chave do cache). As
+    regras de rótulo (POS_KEYS/NEG_KEYS de `label_from_text`) entram aqui; mudanças de
+    código (ex.: `norm`) pedem BUILDER_VERSION.
+    """
+    return {
+        "version": BUILDER_VERSION,
+        "candidate_key": CANDIDATE_KEY,
+        "status_keys": STATUS_KEYS,
+        "comment_keys": COMMENT_KEYS,
+        "job_subdict_keys": JOB_SUBDICT_KEYS,
+        "applicant_subdict_keys": APPLICANT_SUBDICT_KEYS,
+        "applicant_cv_keys": APPLICANT_CV_KEYS,
+        "pos_keys": sorted(POS_KEYS),
+        "neg_keys": sorted(NEG_KEYS),
+    }
+
+
+# --------------------------------------------------------------------------------------
+# Construção da tabela (o laço que antes era copiado nos três scripts)
+# --------------------------------------------------------------------------------------
+def applicant_texts(items: Iterable[Tuple[str, Any]]) -> Dict[str, str]:
+    """candidato_code -> texto achatado. Com `iter_json_items`, só os textos ficam em memória."""
+    return {
+        str(code): flatten_text_from_subdicts(obj, APPLICANT_SUBDICT_KEYS, APPLICANT_CV_KEYS)
+        for code, obj in items
+        if isinstance(obj, dict)
+    }
+
+
+def job_texts(items: Iterable[Tuple[str, Any]]) -> Dict[str, str]:
+    """vaga_code -> texto achatado (mesma ideia de `applicant_texts`)."""
+    return {
+        str(code): flatten_text_from_subdicts(obj, JOB_SUBDICT_KEYS)
+        for code, obj in items
+        if isinstance(obj, dict)
+    }
+
+
+def iter_pairs(job_texts: Dict[str, str], prospects: Iterable[Tuple[str, Any]],
+               cand_texts: Dict[str, str]) -> Iterator[Dict[str, Any]]:
+    """Um dict por par (colunas de PAIR_COLUMNS); `prospects` pode vir de `iter_json_items`."""
+    # Varre cada vaga e sua lista de prospects
+    for vaga_code, blob in prospects:
+        if not isinstance(blob, dict):
+            continue
+        plist = blob.get("prospects") or blob.get("prospeccoes") or []
+        if not isinstance(plist, list):
+            continue
+
+        job_text = job_texts.get(str(vaga_code), "")
+
+        for it in plist:
+            if not isinstance(it, dict):
+                continue
+
+            cand_key = first_key(it, CANDIDATE_KEY)
+            cand_code = str(it.get(cand_key)) if cand_key else ""
+
+            # Rótulo pelo status; o comentário só completa `y` (o drift report usa só `y_status`)
+            status_key = first_key(it, STATUS_KEYS)
+            raw_status = str(it.get(status_key) or "")
+            y_status = label_from_text(raw_status)
+            y = y_status
+            if y is None:
+                comment_key = first_key(it, COMMENT_KEYS)
+                if comment_key:
+                    y = label_from_text(str(it.get(comment_key) or ""))
+
+            cand_text = cand_texts.get(cand_code, "")
+
+            yield {
+                "vaga_code": str(vaga_code),
+                "candidato_code": cand_code,
+                "job_text": job_text,
+                "cand_text": cand_text,
+                "situacao_norm": raw_status,  # pode estar vazio
+                "score_tecnico": score_tecnico(job_text, cand_text),
+                "y_status": y_status,
+                "y": y,
+            }
+
+
+def pairs_frame(rows: Iterable[Dict[str, Any]]) -> pd.DataFrame:
+    df = pd.DataFrame(list(rows), columns=PAIR_COLUMNS)
+    for col in ("y_status", "y"):
+        df[col] = df[col].astype("Int8")  # inteiro anulável: sobrevive ao Parquet sem virar float
+    df["score_tecnico"] = df["score_tecnico"].astype(float)
+    return df
+
+
+def build_pairs(jobs: Any, prospects: Any, cand_texts: Dict[str, str]) -> pd.DataFrame:
+    """Tabela inteira em memória (JSONs já carregados); o cache usa `iter_pairs` em stream."""
+    texts = job_texts(jobs.items()) if isinstance(jobs, dict) else {}
+    return pairs_frame(iter_pairs(texts, prospects.items(), cand_texts))
+
+
+# --------------------------------------------------------------------------------------
+# Chave do cache
+# --------------------------------------------------------------------------------------
+def file_digest(path: Path, memo: Optional[Dict[str, Any]] = None) -> str:
+    """
+    sha256 do conteúdo. Com `memo`, reaproveita o hash se (tamanho, mtime_ns) não mudaram,
+    como o índice do git: o arquivo só é relido quando foi tocado.
+    """
+    st = path.stat()
+    key = str(path.resolve())
+    hit = (memo or {}).get(key)
+    if hit and hit["size"] == st.st_size and hit["mtime_ns"] == st.st_mtime_ns:
+        return hit["sha256"]
+    h = hashlib.sha256()
+    with path.open("rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            h.update(block)
+    digest = h.hexdigest()
+    if memo is not None:
+        memo[key] = {"size": st.st_size, "mtime_ns": st.st_mtime_ns, "sha256": digest}
+    return digest
+
+
+def cache_key(digests: Dict[str, str], config: Dict[str, Any]) -> str:
+    material = json.dumps({"files": digests, "config": config}, sort_keys=True)
+    return hashlib.sha256(material.encode("utf-8")).hexdigest()[:16]
+
+
+def _read_json(path: Path) -> Dict[str, Any]:
+    try:
+        return json.loads(path.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return {}
+
+
+def _write_json(path: Path, obj: Dict[str, Any]) -> None:
+    tmp = path.with_suffix(path.suffix + ".tmp")
+    tmp.write_text(json.dumps(obj, ensure_ascii=False, indent=2), encoding="utf-8")
+    os.replace(tmp, path)
+
+
+# --------------------------------------------------------------------------------------
+# Leitura/escrita do cache
+# --------------------------------------------------------------------------------------
+def _write_table(df: pd.DataFrame, base: Path) -> Path:
+    """Parquet se houver engine (pyarrow/fastparquet); senão pickle. Troca atômica via os.replace."""
+    # row groups pequenos: leitura em blocos (iter_pair_chunks) decodifica um grupo por vez
+    for suffix, writer in ((".parquet", lambda p: df.to_parquet(p, index=False, row_group_size=ROW_GROUP_ROWS)),
+                           (".pkl", lambda p: df.to_pickle(p))):
+        out = base.with_suffix(suffix)
+        tmp = out.with_suffix(suffix + ".tmp")
+        try:
+            writer(tmp)
+        except ImportError:
+            continue
+        os.replace(tmp, out)
+        return out
+    raise RuntimeError("Nenhum formato de cache disponível.")
+
+
+def _write_pairs(rows: Iterable[Dict[str, Any]], base: Path) -> Tuple[Path, int]:
+    """
+    Grava os pares em Parquet um row group por vez (só ROW_GROUP_ROWS linhas em memória)
+    -> (arquivo, nº de linhas). Sem pyarrow, monta o DataFrame inteiro e cai em `_write_table`.
+    """
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError:
+        df = pairs_frame(rows)
+        return _write_table(df, base), len(df)
+
+    out = base.with_suffix(".parquet")
+    tmp = out.with_suffix(".parquet.tmp")
+    # schema fixo (com os metadados do pandas, p/ Int8 voltar como Int8): não depende do 1º bloco
+    types = [pa.string()] * 5 + [pa.float64(), pa.int8(), pa.int8()]
+    schema = pa.Table.from_pandas(pairs_frame([]), schema=pa.schema(list(zip(PAIR_COLUMNS, types))),
+                                  preserve_index=False).schema
+    n = 0
+    batch: List[Dict[str, Any]] = []
+    with pq.ParquetWriter(tmp, schema) as writer:
+        for row in rows:
+            batch.append(row)
+            if len(batch) == ROW_GROUP_ROWS:
+                writer.write_table(pa.Table.from_pandas(pairs_frame(batch), schema=schema, preserve_index=False))
+                n += len(batch)
+                batch = []
+        if batch or n == 0:
+            writer.write_table(pa.Table.from_pandas(pairs_frame(batch), schema=schema, preserve_index=False))
+            n += len(batch)
+    os.replace(tmp, out)
+    return out, n
+
+
+def _read_table(path: Path) -> pd.DataFrame:
+    return pd.read_parquet(path) if path.suffix == ".parquet" else pd.read_pickle(path)
+
+
+def _prune(cache_dir: Path, keep: str) -> None:
+    """Remove tabelas de chaves antigas (o cache guarda só a versão atual dos dados)."""
+    for p in cache_dir.glob("pairs-*"):
+        if not p.name.startswith(f"pairs-{keep}."):
+            p.unlink(missing_ok=True)
+
+
+def pairs_table(paths: Optional[Dict[str, Path]] = None, cache_dir: Path = DATASET_CACHE_DIR,
+                refresh: bool = False, verbose: bool = True) -> Tuple[Path, Dict[str, Any]]:
+    """
+    Garante a tabela no cache sem carregá-la quando ela já é válida -> (arquivo, info).
+    Em miss, os pares são gerados em stream (`iter_pairs`) e gravados em row groups; ficam em
+    memória os textos achatados de candidatos e vagas + um row group, não a tabela inteira.
+    """
+    t0 = time.perf_counter()
+    paths = {name: Path(paths[name]) if paths else find_file(name) for name in RAW_FILES}
+    cache_dir.mkdir(parents=True, exist_ok=True)
+
+    memo_path = cache_dir / _HASH_MEMO
+    memo = _read_json(memo_path)
+    digests = {name: file_digest(p, memo) for name, p in paths.items()}
+    _write_json(memo_path, memo)
+    key = cache_key(digests, builder_config())
+    hash_seconds = time.perf_counter() - t0
+
+    manifest_path = cache_dir / f"pairs-{key}.json"
+    manifest = _read_json(manifest_path)
+    table = cache_dir / manifest.get("table", "")
+    info: Dict[str, Any] = {"key": key, "hash_seconds": hash_seconds, "dir": str(cache_dir)}
+
+    if not refresh and manifest.get("key") == key and table.is_file():
+        info.update(hit=True, rows=manifest.get("rows"),
+                    build_seconds=manifest.get("build_seconds"), built_at=manifest.get("built_at"))
+        return table, info
+
+    if verbose:
+        print(f"[INFO] cache do dataset: {'refresh' if refresh else 'miss'} (chave={key}); reconstruindo...")
+    t1 = time.perf_counter()
+    # os três JSONs em stream: candidatos/vagas viram só texto; os pares vão direto para o disco
+    rows = iter_pairs(job_texts(iter_json_items(paths["Jobs.json"])), iter_json_items(paths["Prospects.json"]),
+                      applicant_texts(iter_json_items(paths["Applicants.json"])))
+    table, n_rows = _write_pairs(rows, cache_dir / f"pairs-{key}")
+    build_seconds = time.perf_counter() - t1
+    _write_json(manifest_path, {
+        "key": key,
+        "table": table.name,
+        "files": {name: {"path": str(p), "sha256": digests[name]} for name, p in paths.items()},
+        "config": builder_config(),
+        "rows": n_rows,
+        "build_seconds": build_seconds,
+        "built_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+    })
+    _prune(cache_dir, key)
+    info.update(hit=False, rows=n_rows, build_seconds=build_seconds, built_at=time.strftime("%Y-%m-%dT%H:%M:%S"))
+    if verbose:
+        print(f"[OK] cache do dataset: {table.name} | {n_rows} pares reconstruídos em {build_seconds:.1f}s")
+    return table, info
+
+
+def load_pairs(paths: Optional[Dict[str, Path]] = None, cache_dir: Path = DATASET_CACHE_DIR,
+               refresh: bool = False, verbose: bool = True) -> Tuple[pd.DataFrame, Dict[str, Any]]:
+    """
+    -> (tabela de pares, info do cache). `paths` mapeia nome -> caminho de cada RAW_FILES
+    (default: `find_file`). `info` traz hit/miss, chave e tempos (hash, leitura ou rebuild).
+    """
+    table, info = pairs_table(paths, cache_dir, refresh, verbose)
+    t1 = time.perf_counter()
+    df = _read_table(table)
+    info["load_seconds"] = time.perf_counter() - t1
+    if verbose and info["hit"]:
+        print(
+            f"[OK] cache do dataset: hit {table.name} | {len(df)} pares em {info['load_seconds']:.2f}s "
+            f"(hash {info['hash_seconds']:.2f}s; rebuild custou {info['build_seconds'] or 0:.1f}s)"
+        )
+    return df, info
+
+
+def iter_pair_chunks(table: Path, chunk_rows: int = 50_000,
+                     columns: Optional[List[str]] = None) -> Iterator[pd.DataFrame]:
+    """
+    Lê a tabela do cache em blocos de até `chunk_rows` linhas, na ordem do arquivo (índice
+    = posição global da linha). Com Parquet, só o bloco corrente e as `columns` pedidas
+    ficam em memória; o fallback em pickle precisa carregar a tabela inteira.
+    """
+    offset = 0
+    if table.suffix == ".parquet":
+        import pyarrow.parquet as pq
+
+        batches = (b.to_pandas() for b in pq.ParquetFile(table).iter_batches(batch_size=chunk_rows, columns=columns))
+    else:
+        df = _read_table(table)
+        df = df[columns] if columns is not None else df
+        batches = (df.iloc[i:i + chunk_rows] for i in range(0, len(df), chunk_rows))
+    for chunk in batches:
+        chunk.index = pd.RangeIndex(offset, offset + len(chunk))
+        offset += len(chunk)
+        yield chunk
+
+
+def parse_args():
+    p = argparse.ArgumentParser(description="Gera/valida o cache da tabela de pares (vaga, candidato).")
+    p.add_argument("--refresh", action="store_true", help="Ignora o cache e reconstrói a tabela")
+    p.add_argument("--cache-dir", type=Path, default=DATASET_CACHE_DIR, help=f"Diretório (default={DATASET_CACHE_DIR})")
+    return p.parse_args()
+
+
+def main():
+    args = parse_args()
+    df, _ = load_pairs(cache_dir=args.cache_dir, refresh=args.refresh)
+    print(f"[INFO] rotulados: y={int(df['y'].notna().sum())} | y_status={int(df['y_status'].notna().sum())}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,252 @@
+# src/feature_store.py
+# -*- coding: utf-8 -*-
+"""
+Feature store local (SQLite) de candidatos e vagas, gerado offline a partir dos JSONs.
+
+Por candidato_code: texto achatado (mesma lógica de `text_utils.flatten_text_from_subdicts`),
+tokens do score_tecnico e, opcionalmente, o vetor esparso (contagens no vocabulário do scorer
+compilado). Vagas ficam na tabela `jobs` com os mesmos campos.
+
+Na API (`/predict_by_ids`) a busca é pela chave primária do SQLite; só as chaves quentes
+ficam em memória (LRU na frente do banco).
+
+Uso:
+    python src/feature_store.py                       # data/processed/feature_store.sqlite
+    python src/feature_store.py --with-vectors        # + contagens do scorer compilado (model_compiled.joblib)
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import sqlite3
+import sys
+import threading
+import time
+from collections import Counter, OrderedDict
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, NamedTuple, Optional, Tuple
+
+import numpy as np
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from src.json_stream import iter_json_items  # noqa: E402
+from src.text_utils import flatten_text_from_subdicts, tokenize  # noqa: E402
+
+FEATURE_STORE_FILE = ROOT / "data" / "processed" / "feature_store.sqlite"
+
+_SCHEMA = """
+CREATE TABLE meta (key TEXT PRIMARY KEY, value TEXT);
+CREATE TABLE candidates (code TEXT PRIMARY KEY, text TEXT NOT NULL, tokens TEXT NOT NULL, vec BLOB);
+CREATE TABLE jobs (code TEXT PRIMARY KEY, text TEXT NOT NULL, tokens TEXT NOT NULL, vec BLOB);
+"""
+TABLES = ("candidates", "jobs")
+
+
+class Features(NamedTuple):
+    code: str
+    text: str
+    tokens: frozenset
+    vec: Optional[Counter]  # contagens no vocabulário do scorer (se o store foi gerado com vetores)
+
+
+# --------------------------------------------------------------------------------------
+# Serialização (tokens: texto separado por \n; vetor: pares int32 coluna/contagem)
+# --------------------------------------------------------------------------------------
+def encode_tokens(tokens: Iterable[str]) -> str:
+    return "\n".join(sorted(tokens))  # tokenize() quebra em espaços: \n nunca faz parte de um token
+
+
+def decode_tokens(raw: str) -> frozenset:
+    return frozenset(raw.split("\n")) if raw else frozenset()
+
+
+def encode_vec(counts: Counter) -> bytes:
+    return np.array(sorted(counts.items()), dtype="<i4").reshape(-1, 2).tobytes()
+
+
+def decode_vec(raw: Optional[bytes]) -> Optional[Counter]:
+    if raw is None:
+        return None
+    pairs = np.frombuffer(raw, dtype="<i4").reshape(-1, 2)
+    return Counter(dict(zip(pairs[:, 0].tolist(), pairs[:, 1].tolist())))
+
+
+# --------------------------------------------------------------------------------------
+# Build offline
+# --------------------------------------------------------------------------------------
+def iter_features(objs: Any, subkeys: List[str], extra_keys: Optional[List[str]] = None,
+                  scorer=None, prefix: str = "[CAND]") -> Iterator[Tuple]:
+    # dict ou iterável de (código, objeto), ex.: iter_json_items (sem carregar o JSON inteiro)
+    for code, obj in (objs.items() if isinstance(objs, dict) else objs):
+        if not isinstance(obj, dict):
+            continue
+        text = flatten_text_from_subdicts(obj, subkeys, extra_keys)
+        vec = encode_vec(scorer.counts(f"{prefix}{text}")) if scorer is not None else None
+        yield str(code), text, encode_tokens(tokenize(text)), vec
+
+
+def build(out_path: Path, applicants: Any, jobs: Any, scorer=None,
+          chunk_size: int = 2000) -> Dict[str, Any]:
+    """
+    Gera o store num arquivo temporário e troca atomicamente (leitores nunca veem um banco parcial).
+    Com `scorer` (CompiledScorer com `additive`), grava também as contagens de `[CAND]texto` / `[JOB]texto`.
+    """
+    # import local: a API usa só o FeatureStore (leitura) e não deve puxar o módulo de treino
+    from src.train_baseline import APPLICANT_CV_KEYS, APPLICANT_SUBDICT_KEYS, JOB_SUBDICT_KEYS
+
+    if scorer is not None and not scorer.additive:
+        raise ValueError("Vetores pré-calculados exigem scorer aditivo (ngram_range máximo = 1).")
+    out_path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = out_path.with_suffix(out_path.suffix + ".tmp")
+    if tmp.exists():
+        tmp.unlink()
+    start = time.perf_counter()
+    conn = sqlite3.connect(tmp)
+    try:
+        conn.executescript(_SCHEMA)
+        sources = [
+            ("candidates", iter_features(applicants, APPLICANT_SUBDICT_KEYS, APPLICANT_CV_KEYS, scorer, "[CAND]")),
+            ("jobs", iter_features(jobs, JOB_SUBDICT_KEYS, None, scorer, "[JOB]")),
+        ]
+        counts = {}
+        for table, rows in sources:
+            n = 0
+            chunk: List[Tuple] = []
+            for row in rows:
+                chunk.append(row)
+                if len(chunk) >= chunk_size:
+                    conn.executemany(f"INSERT OR REPLACE INTO {table} VALUES (?, ?, ?, ?)", chunk)
+                    n += len(chunk)
+                    chunk = []
+            conn.executemany(f"INSERT OR REPLACE INTO {table} VALUES (?, ?, ?, ?)", chunk)
+            counts[table] = n + len(chunk)
+        meta = {
+            "vocab_digest": scorer.vocab_digest() if scorer is not None else "",
+            "built_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "n_candidates": str(counts["candidates"]),
+            "n_jobs": str(counts["jobs"]),
+        }
+        conn.executemany("INSERT INTO meta VALUES (?, ?)", meta.items())
+        conn.commit()
+    finally:
+        conn.close()
+    os.replace(tmp, out_path)
+    return {**counts, "seconds": time.perf_counter() - start, "size_mb": out_path.stat().st_size / 1e6,
+            "with_vectors": scorer is not None}
+
+
+# --------------------------------------------------------------------------------------
+# Leitura (API)
+# --------------------------------------------------------------------------------------
+class FeatureStore:
+    """
+    Leitura do store: busca pela chave primária (uma conexão somente-leitura por thread),
+    com um LRU de `cache_size` entradas por tabela para as chaves quentes.
+    """
+
+    def __init__(self, path: Path, cache_size: int = 4096):
+        self.path = Path(path)
+        if not self.path.exists():
+            raise FileNotFoundError(f"Feature store não encontrado: {self.path}")
+        self.cache_size = max(0, int(cache_size))
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._cache: Dict[str, "OrderedDict[str, Optional[Features]]"] = {t: OrderedDict() for t in TABLES}
+        self.hits = 0
+        self.misses = 0
+        self.meta = dict(self._conn().execute("SELECT key, value FROM meta").fetchall())
+
+    @property
+    def vocab_digest(self) -> str:
+        return self.meta.get("vocab_digest", "")
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(f"file:{self.path}?mode=ro", uri=True, check_same_thread=False)
+            self._local.conn = conn
+        return conn
+
+    def _get(self, table: str, code: str, cache_miss: bool = True) -> Optional[Features]:
+        cache = self._cache[table]
+        with self._lock:
+            if code in cache:
+                cache.move_to_end(code)
+                self.hits += 1
+                return cache[code]
+            self.misses += 1
+        row = self._conn().execute(f"SELECT code, text, tokens, vec FROM {table} WHERE code = ?", (code,)).fetchone()
+        feats = Features(row[0], row[1], decode_tokens(row[2]), decode_vec(row[3])) if row else None
+        if self.cache_size and cache_miss:
+            with self._lock:
+                cache[code] = feats
+                while len(cache) > self.cache_size:
+                    cache.popitem(last=False)
+        return feats
+
+    def candidate(self, candidato_code: str, cache_miss: bool = True) -> Optional[Features]:
+        """`cache_miss=False` (varreduras, ex.: /retrieve) lê sem ocupar o LRU das chaves quentes."""
+        return self._get("candidates", str(candidato_code), cache_miss)
+
+    def job(self, vaga_code: str) -> Optional[Features]:
+        return self._get("jobs", str(vaga_code))
+
+    def iter_texts(self, table: str = "candidates", chunk_size: int = 2000) -> Iterator[List[Tuple[str, str]]]:
+        """Percorre a tabela em blocos de (code, text), sem carregar tudo (build de índices)."""
+        cur = self._conn().execute(f"SELECT code, text FROM {table} ORDER BY rowid")
+        while True:
+            chunk = cur.fetchmany(chunk_size)
+            if not chunk:
+                return
+            yield chunk
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "path": str(self.path),
+                "cache_size": self.cache_size,
+                "cached": {t: len(c) for t, c in self._cache.items()},
+                "hits": self.hits,
+                "misses": self.misses,
+                **{k: self.meta.get(k) for k in ("n_candidates", "n_jobs", "built_at", "vocab_digest")},
+            }
+
+
+def parse_args():
+    p = argparse.ArgumentParser(description="Gera o feature store (SQLite) de candidatos e vagas.")
+    p.add_argument("--out", type=Path, default=FEATURE_STORE_FILE, help=f"Saída (default={FEATURE_STORE_FILE})")
+    p.add_argument("--with-vectors", action="store_true",
+                   help="Grava as contagens no vocabulário do scorer compilado (models/model_compiled.joblib)")
+    p.add_argument("--scorer", type=Path, default=None, help="Scorer compilado a usar com --with-vectors")
+    return p.parse_args()
+
+
+def main():
+    from src.train_baseline import find_file, load_json
+
+    args = parse_args()
+    scorer = None
+    if args.with_vectors:
+        import joblib
+        from src.compiled_scorer import COMPILED_MODEL_FILE
+
+        scorer_path = args.scorer or COMPILED_MODEL_FILE
+        if not scorer_path.exists():
+            raise FileNotFoundError(f"{scorer_path} não existe. Gere com: python src/compiled_scorer.py")
+        scorer = joblib.load(scorer_path)
+
+    applicants = iter_json_items(find_file("Applicants.json"))  # stream: um candidato por vez
+    jobs = load_json(find_file("Jobs.json"))
+    info = build(args.out, applicants, jobs, scorer)
+    print(
+        f"[OK] feature store: {args.out} | candidatos={info['candidates']} vagas={info['jobs']} "
+        f"| vetores={'sim' if info['with_vectors'] else 'não'} | {info['size_mb']:.1f} MB em {info['seconds']:.1f}s"
+    )
+
+
+if __name__ == "__main__":
+    main()
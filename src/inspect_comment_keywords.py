@@ -1,4 +1,5 @@
 # src/inspect_comment_keywords.py
+import sys
 from pathlib import Path
 import pandas as pd
 import re
@@ -6,7 +7,12 @@ import unicodedata
 from collections import Counter
 
 ROOT = Path(__file__).resolve().parents[1]
-df = pd.read_csv(ROOT / "data" / "interim" / "prospects.csv")
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from src.interim_store import read_interim  # noqa: E402
+
+df = read_interim("prospects", columns=["comentario"])
 
 def normalize(s: str) -> str:
     if pd.isna(s):
@@ -1,12 +1,17 @@
 # src/inspect_prospects_status.py
+import sys
 from pathlib import Path
-import pandas as pd
 
 ROOT = Path(__file__).resolve().parents[1]
-df = pd.read_csv(ROOT / "data" / "interim" / "prospects.csv")
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from src.interim_store import interim_columns, read_interim  # noqa: E402
+
+df = read_interim("prospects", columns=["situacao"])
 
 print("\n=== Amostra de colunas ===")
-print(df.columns.tolist())
+print(interim_columns("prospects") or df.columns.tolist())  # lê só o footer do Parquet
 
 print("\n=== Top 30 valores em 'situacao' (normalizados) ===")
 s = df["situacao"].fillna("").str.strip().str.lower()
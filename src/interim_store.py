@@ -0,0 +1,210 @@
+# src/interim_store.py
+# -*- coding: utf-8 -*-
+"""
+Armazenamento intermediário (data/interim/) em Parquet com schema tipado.
+
+Gravado por load_jsons.py e lido por make_tfidf_scores.py, make_labels.py,
+weak_labels_from_scores.py e pelos scripts inspect_*:
+- ids (vaga_code, candidato_code) como texto: zeros à esquerda preservados
+- situacao_norm / modalidade / recrutador como `category`
+- data_candidatura / ultima_atualizacao como datetime (dia primeiro, ex.: 25-03-2021)
+- demais colunas: numéricas quando todos os valores são números (o que o read_csv inferia), senão texto
+
+Quem lê pede só as colunas que usa (`read_interim(name, columns=[...])`): o Parquet lê
+apenas essas colunas do disco. Sem pyarrow/fastparquet, cai para o CSV antigo.
+"""
+
+from __future__ import annotations
+
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Set
+
+import numpy as np
+import pandas as pd
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+INTERIM_DIR = PROJECT_ROOT / "data" / "interim"
+
+ID_COLS = ("vaga_code", "candidato_code")
+CATEGORY_COLS = ("situacao_norm", "modalidade", "recrutador")
+DATE_COLS = ("data_candidatura", "ultima_atualizacao")
+
+
+# -----------------------
+# Schema
+# -----------------------
+def _as_text(s: pd.Series) -> pd.Series:
+    """Texto com ausentes preservados (sem virar 'None'/'nan')."""
+    return s.map(lambda v: v if v is None or isinstance(v, str) or pd.isna(v) else str(v))
+
+
+def apply_schema(df: pd.DataFrame, dtypes: Optional[Dict[str, Any]] = None) -> pd.DataFrame:
+    """
+    Sem `dtypes`, o tipo das demais colunas é inferido do próprio `df`. Com `dtypes` (de
+    `SchemaMerger`, ao gravar em lotes), as colunas listadas vão para o tipo dado
+    (`object` = texto), como se a inferência tivesse visto o arquivo inteiro.
+    """
+    dtypes = dtypes or {}
+    out = df.copy()
+    for c in out.columns:
+        if c in ID_COLS:
+            out[c] = _as_text(out[c])
+        elif c in CATEGORY_COLS:
+            out[c] = _as_text(out[c]).astype("category")
+        elif c in DATE_COLS:
+            out[c] = pd.to_datetime(out[c], errors="coerce", dayfirst=True, format="mixed")
+            if c in dtypes:
+                out[c] = out[c].astype(dtypes[c])
+        elif c in dtypes:
+            out[c] = _as_text(out[c]) if dtypes[c] == object else pd.to_numeric(out[c]).astype(dtypes[c])
+        elif out[c].dtype == object:
+            # colunas achatadas podem misturar int/str; Parquet exige um tipo por coluna
+            try:
+                out[c] = pd.to_numeric(out[c])
+            except (TypeError, ValueError):
+                out[c] = _as_text(out[c])
+    return out
+
+
+# Tipo que o DataFrame inteiro (pd.DataFrame(linhas)) daria a uma coluna, pelo conteúdo:
+# só números -> numérica (apply_schema não mexe; bool fica de fora: com ausentes vira object); só strings -> texto no pandas 3 (dtype
+# str), mas object nos anteriores; o resto (misturas) fica object e passa pelo to_numeric.
+_NUMBER_KINDS = {"integer", "floating", "mixed-integer-float", "decimal"}
+_STRINGS_ARE_TEXT = pd.DataFrame({"c": ["x"]})["c"].dtype != object
+
+
+class SchemaMerger:
+    """
+    Une, lote a lote, o que `apply_schema` decidiria vendo o arquivo inteiro: numérica se
+    todos os valores forem números (ou, em colunas mistas, convertíveis por to_numeric;
+    inteiro vira float se faltar valor em algum lote), senão texto; datas na resolução
+    mais fina. Os lotes chegam com dtype `object` (valores como vieram do JSON).
+    """
+
+    def __init__(self) -> None:
+        self.seen: Dict[str, List[Any]] = {}  # coluna -> por lote, na ordem de primeira aparição
+        self.has_null: Set[str] = set()
+        self.rows = 0
+
+    def update(self, df: pd.DataFrame) -> None:
+        self.has_null.update(c for c in self.seen if c not in df.columns)
+        for c in df.columns:
+            col = df[c]
+            if c not in self.seen:
+                self.seen[c] = []
+                if self.rows:
+                    self.has_null.add(c)
+            if col.isna().any():
+                self.has_null.add(c)
+            if c in ID_COLS or c in CATEGORY_COLS:
+                continue
+            if c in DATE_COLS:
+                self.seen[c].append(pd.to_datetime(col, errors="coerce", dayfirst=True, format="mixed").dtype)
+                continue
+            kind = pd.api.types.infer_dtype(col, skipna=True)
+            if kind == "empty":
+                continue
+            kind = "number" if kind in _NUMBER_KINDS else "text" if kind == "string" and _STRINGS_ARE_TEXT else "mixed"
+            try:
+                dtype = pd.to_numeric(col).dtype
+            except (TypeError, ValueError):
+                dtype = None
+            self.seen[c].append((kind, dtype))
+        self.rows += len(df)
+
+    @property
+    def columns(self) -> List[str]:
+        return list(self.seen)
+
+    def dtypes(self) -> Dict[str, Any]:
+        """Tipos para `apply_schema(lote, dtypes=...)` (ids e categorias não precisam)."""
+        out: Dict[str, Any] = {}
+        for c, seen in self.seen.items():
+            if c in ID_COLS or c in CATEGORY_COLS:
+                continue
+            if c in DATE_COLS:
+                out[c] = np.result_type(*seen)
+                continue
+            kinds = {k for k, _ in seen}
+            if not kinds:  # só ausentes: object de None -> to_numeric -> float
+                out[c] = np.dtype(float)
+            elif kinds == {"text"} or any(d is None for _, d in seen):
+                out[c] = object
+            else:
+                dt = np.result_type(*(d for _, d in seen))
+                out[c] = np.dtype(float) if c in self.has_null and dt.kind in "biu" else dt
+        return out
+
+    def csv_numeric(self) -> List[str]:
+        """Colunas que o DataFrame inteiro guardaria como número (e o CSV legado grava como tal)."""
+        return [c for c, seen in self.seen.items()
+                if c not in DATE_COLS and seen and {k for k, _ in seen} == {"number"}]
+
+
+# -----------------------
+# Escrita / leitura
+# -----------------------
+def parquet_path(name: str, base: Path = INTERIM_DIR) -> Path:
+    return base / f"{name}.parquet"
+
+
+def csv_path(name: str, base: Path = INTERIM_DIR) -> Path:
+    return base / f"{name}.csv"
+
+
+def write_interim(df: pd.DataFrame, name: str, base: Path = INTERIM_DIR, csv: bool = False) -> List[Path]:
+    """
+    Grava data/interim/<name>.parquet (formato principal). `csv=True` grava também o CSV
+    legado; sem engine de Parquet, grava só o CSV.
+    """
+    base.mkdir(parents=True, exist_ok=True)
+    typed = apply_schema(df)
+    written: List[Path] = []
+    try:
+        typed.to_parquet(parquet_path(name, base), index=False)
+        written.append(parquet_path(name, base))
+    except ImportError as e:
+        print(f"[INFO] Parquet indisponível ({e}); gravando {name} só em CSV.")
+        csv = True
+    if csv:
+        df.to_csv(csv_path(name, base), index=False, encoding="utf-8")
+        written.append(csv_path(name, base))
+    return written
+
+
+def interim_columns(name: str, base: Path = INTERIM_DIR) -> Optional[List[str]]:
+    """Colunas disponíveis no Parquet (só o footer é lido); None se não houver Parquet."""
+    path = parquet_path(name, base)
+    if not path.exists():
+        return None
+    import pyarrow.parquet as pq
+
+    return list(pq.read_schema(path).names)
+
+
+def read_interim(name: str, columns: Optional[Sequence[str]] = None, base: Path = INTERIM_DIR) -> pd.DataFrame:
+    """
+    Lê data/interim/<name> (Parquet; CSV se não houver). Com `columns`, lê só as colunas
+    pedidas que existirem no arquivo; as ausentes ficam a cargo de quem chama.
+    """
+    path = parquet_path(name, base)
+    if path.exists():
+        try:
+            wanted = None
+            if columns is not None:
+                available = set(interim_columns(name, base) or [])
+                wanted = [c for c in columns if c in available]
+            return pd.read_parquet(path, columns=wanted)
+        except ImportError:
+            pass
+    legacy = csv_path(name, base)
+    if not legacy.exists():
+        raise FileNotFoundError(f"Arquivo não encontrado: {path} (nem {legacy.name}). Rode: python src/load_jsons.py")
+    usecols = (lambda c: c in set(columns)) if columns is not None else None
+    df = pd.read_csv(legacy, dtype={c: str for c in ID_COLS}, usecols=usecols, encoding="utf-8", low_memory=False)
+    return apply_schema(df)
+
+
+def interim_exists(name: str, base: Path = INTERIM_DIR) -> bool:
+    return parquet_path(name, base).exists() or csv_path(name, base).exists()
+
@@ -0,0 +1,96 @@
+# src/json_stream.py
+# -*- coding: utf-8 -*-
+"""
+Leitura incremental de um JSON cujo topo é um objeto `{chave: registro, ...}`
+(Applicants.json, Jobs.json, Prospects.json).
+
+`json.loads(p.read_text())` mantém em memória a string do arquivo inteiro e toda a árvore
+de dicts ao mesmo tempo. Aqui o arquivo é lido em blocos e cada par (chave, registro) é
+decodificado com `JSONDecoder.raw_decode` e entregue na hora: a memória fica limitada pelo
+bloco + maior registro, não pelo tamanho do arquivo. Só stdlib.
+"""
+
+from __future__ import annotations
+
+import json
+import re
+from pathlib import Path
+from typing import Any, Iterator, Tuple
+
+DEFAULT_CHUNK_CHARS = 1 << 20
+
+_WS = re.compile(r"[ \t\n\r]*")
+
+
+class _Reader:
+    """Buffer de texto sobre o arquivo; descarta o que já foi consumido a cada recarga."""
+
+    def __init__(self, f, chunk_chars: int):
+        self.f = f
+        self.chunk_chars = chunk_chars
+        self.buf = ""
+        self.pos = 0
+        self.eof = False
+        self.raw = None
+        self.fill()
+
+    def fill(self) -> bool:
+        more = self.f.read(self.chunk_chars)
+        self.buf = self.buf[self.pos:] + more
+        self.pos = 0
+        self.eof = not more
+        return bool(more)
+
+    def peek(self) -> str:
+        """Próximo caractere não-branco ('' no fim do arquivo)."""
+        while True:
+            self.pos = _WS.match(self.buf, self.pos).end()
+            if self.pos < len(self.buf) or not self.fill():
+                return self.buf[self.pos:self.pos + 1]
+
+    def expect(self, ch: str) -> None:
+        got = self.peek()
+        if got != ch:
+            raise ValueError(f"JSON inválido: esperado {ch!r}, encontrado {got or 'EOF'!r}")
+        self.pos += 1
+
+    def value(self, decoder: json.JSONDecoder, keep_raw: bool = False) -> Any:
+        self.peek()
+        while True:
+            try:
+                obj, end = decoder.raw_decode(self.buf, self.pos)
+            except json.JSONDecodeError:
+                if self.fill():
+                    continue
+                raise
+            # número colado no fim do buffer pode estar truncado ("12" | "3"): relê com mais texto
+            if end == len(self.buf) and self.fill():
+                continue
+            self.raw = self.buf[self.pos:end] if keep_raw else None
+            self.pos = end
+            return obj
+
+
+def iter_json_items(path: Path, chunk_chars: int = DEFAULT_CHUNK_CHARS, with_raw: bool = False) -> Iterator[Tuple]:
+    """
+    Gera (chave, registro) do objeto de topo, um por vez, na ordem do arquivo.
+    `with_raw=True` gera (chave, registro, texto bruto do registro), ex.: para hash de conteúdo
+    sem reserializar o registro.
+    """
+    decoder = json.JSONDecoder()
+    with Path(path).open("r", encoding="utf-8-sig") as f:
+        r = _Reader(f, chunk_chars)
+        r.expect("{")
+        first = True
+        while True:
+            if r.peek() == "}":
+                return
+            if not first:
+                r.expect(",")
+            key = r.value(decoder)
+            if not isinstance(key, str):
+                raise ValueError(f"JSON inválido: chave não-string {key!r}")
+            r.expect(":")
+            value = r.value(decoder, keep_raw=with_raw)
+            yield (key, value, r.raw) if with_raw else (key, value)
+            first = False
@@ -2,19 +2,39 @@
 # -*- coding: utf-8 -*-
 """
 Lê Jobs.json / Prospects.json / Applicants.json de data/raw,
-normaliza e salva em data/interim (CSV + opcional PARQUET).
+normaliza e salva em data/interim em Parquet com schema tipado (src/interim_store.py);
+--csv grava também os CSVs legados.
+
+Com --stream, Applicants.json é lido registro a registro (src/json_stream.py) e gravado
+em lotes: o pico de memória depende de --batch-size, não do tamanho do arquivo.
+
+Com --incremental, cada registro (vaga em Jobs/Prospects, candidato em Applicants) tem um
+hash de conteúdo guardado em data/interim/_state/; só os registros novos ou alterados são
+achatados de novo, os demais vêm do Parquet da execução anterior e os removidos saem.
 """
 
 from __future__ import annotations
+import argparse
+import hashlib
 import json
+import sys
+import tempfile
+import time
 from pathlib import Path
-from typing import Any, Dict, List
+from typing import Any, Callable, Dict, Iterator, List
+import numpy as np
 import pandas as pd
 
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from src.interim_store import CATEGORY_COLS, SchemaMerger, apply_schema, interim_exists, read_interim, write_interim  # noqa: E402
+from src.json_stream import iter_json_items  # noqa: E402
+
 # -----------------------
 # Configuração de caminhos
 # -----------------------
-PROJECT_ROOT = Path(__file__).resolve().parents[1]
 DATA_DIR = PROJECT_ROOT / "data"
 RAW_DIR = DATA_DIR / "raw"
 INTERIM_DIR = DATA_DIR / "interim"
@@ -23,6 +43,8 @@ JOBS_PATH = RAW_DIR / "Jobs.json"
 PROSPECTS_PATH = RAW_DIR / "Prospects.json"
 APPLICANTS_PATH = RAW_DIR / "Applicants.json"
 
+STATE_DIR = INTERIM_DIR / "_state"
+
 INTERIM_DIR.mkdir(parents=True, exist_ok=True)
 
 # -----------------------
@@ -51,15 +73,11 @@ def flatten_dict(d: Dict[str, Any], parent_key: str = "", sep: str = "__") -> Di
             items.append((new_key, v))
     return dict(items)
 
-def _try_to_parquet(df: pd.DataFrame, path: Path) -> None:
-    """
-    Salva PARQUET se pyarrow/fastparquet estiver disponível; caso contrário, ignora.
-    """
-    try:
-        df.to_parquet(path, index=False)
-        print(f"[OK] Parquet salvo: {path}")
-    except Exception as e:
-        print(f"[INFO] Não foi possível salvar PARQUET ({e}). Pulando...")
+def record_row(code_col: str, code: Any, payload: Any) -> Dict[str, Any]:
+    """Linha achatada de um registro de Jobs.json/Applicants.json."""
+    row = {code_col: str(code)}
+    row.update(flatten_dict(payload if isinstance(payload, dict) else {"raw": payload}))
+    return row
 
 # -----------------------
 # Loaders
@@ -72,82 +90,54 @@ def load_jobs(path: Path) -> pd.DataFrame:
     data = json.loads(path.read_text(encoding="utf-8"))
     rows: List[Dict[str, Any]] = []
     for vaga_code, payload in data.items():
-        row = {"vaga_code": str(vaga_code)}
-        row.update(flatten_dict(payload if isinstance(payload, dict) else {"raw": payload}))
-        rows.append(row)
+        rows.append(record_row("vaga_code", vaga_code, payload))
     df = pd.DataFrame(rows)
     return df
 
-def load_prospects(path: Path) -> pd.DataFrame:
-    """
-    Prospects.json (real): dict {vaga_code: {titulo, modalidade, prospects: [ {...}, ... ]}}
-    Também lida com variações (lista no topo; itens string; JSON serializado).
-    Saída: uma linha por par (vaga_code, candidato) — sem linhas vazias para vagas sem prospects.
-    """
-    raw = json.loads(path.read_text(encoding="utf-8"))
-
-    # Se o topo vier como lista, normaliza para um pseudo vaga_code
-    if isinstance(raw, list):
-        raw = {"(sem_vaga_code)": {"titulo": "", "modalidade": "", "prospects": raw}}
-
+def prospect_rows(vaga_code: Any, payload: Any, stats: Dict[str, int] | None = None) -> List[Dict[str, Any]]:
+    """Linhas (vaga_code, candidato) de uma vaga de Prospects.json (usado também na ingestão incremental)."""
+    if stats is None:
+        stats = {"str_items": 0, "parsed_str_items": 0}
     rows: List[Dict[str, Any]] = []
-    str_items = 0
-    parsed_str_items = 0
 
-    for vaga_code, payload in (raw or {}).items():
-        titulo = ""
-        modalidade = ""
-        lista = []
-
-        if isinstance(payload, dict):
-            titulo = payload.get("titulo", "")
-            modalidade = payload.get("modalidade", "")
-            pr = payload.get("prospects", [])
-            if isinstance(pr, list):
-                lista = pr
-            elif isinstance(pr, str):
-                try:
-                    lista = json.loads(pr) or []
-                except Exception:
-                    lista = [pr]
-            else:
-                # fallback: tenta achar alguma lista dentro do payload
-                for k, v in payload.items():
-                    if isinstance(v, list):
-                        lista = v
-                        break
-        elif isinstance(payload, list):
-            lista = payload
+    titulo = ""
+    modalidade = ""
+    lista = []
+
+    if isinstance(payload, dict):
+        titulo = payload.get("titulo", "")
+        modalidade = payload.get("modalidade", "")
+        pr = payload.get("prospects", [])
+        if isinstance(pr, list):
+            lista = pr
+        elif isinstance(pr, str):
+            try:
+                lista = json.loads(pr) or []
+            except Exception:
+                lista = [pr]
         else:
-            lista = [payload]
-
-        for it in (lista or []):
-            item = it
-
-            # String
-            if isinstance(item, str):
-                str_items += 1
-                try:
-                    parsed = json.loads(item)
-                    if isinstance(parsed, dict):
-                        item = parsed
-                        parsed_str_items += 1
-                    else:
-                        rows.append({
-                            "vaga_code": str(vaga_code),
-                            "titulo_vaga": titulo,
-                            "modalidade": modalidade,
-                            "candidato_code": None,
-                            "nome": None,
-                            "comentario": item,
-                            "situacao": "",
-                            "situacao_norm": "",
-                            "recrutador": "",
-                            "data_candidatura": None,
-                            "ultima_atualizacao": None,
-                        })
-                        continue
-                except Exception:
+            # fallback: tenta achar alguma lista dentro do payload
+            for k, v in payload.items():
+                if isinstance(v, list):
+                    lista = v
+                    break
+    elif isinstance(payload, list):
+        lista = payload
+    else:
+        lista = [payload]
+
+    for it in (lista or []):
+        item = it
+
+        # String
+        if isinstance(item, str):
+            stats["str_items"] += 1
+            try:
+                parsed = json.loads(item)
+                if isinstance(parsed, dict):
+                    item = parsed
+                    stats["parsed_str_items"] += 1
+                else:
                     rows.append({
                         "vaga_code": str(vaga_code),
                         "titulo_vaga": titulo,
@@ -162,57 +152,91 @@ def load_prospects(path: Path) -> pd.DataFrame:
                         "ultima_atualizacao": None,
                     })
                     continue
-
-            # Dict (formato esperado)
-            if isinstance(item, dict):
-                candidato_code = (
-                    item.get("codigo")
-                    or item.get("id_candidato")
-                    or item.get("id")
-                    or item.get("codigo_candidato")
-                )
-                nome = item.get("nome") or item.get("name")
-                comentario = item.get("comentario") or item.get("comment") or item.get("observacao") or ""
-                # Trata o typo "situacao_candidado"
-                situacao_raw = (
-                    item.get("situacao")
-                    or item.get("situacao_candidato")
-                    or item.get("situacao_candidado")
-                    or item.get("status")
-                    or ""
-                )
-                situacao_norm = str(situacao_raw).strip().lower()
-                recrutador = item.get("recrutador", "")
-                data_candidatura = item.get("data_candidatura")
-                ultima_atualizacao = item.get("ultima_atualizacao")
-
-                rows.append({
-                    "vaga_code": str(vaga_code),
-                    "titulo_vaga": titulo,
-                    "modalidade": modalidade,
-                    "candidato_code": str(candidato_code) if candidato_code is not None else None,
-                    "nome": nome,
-                    "comentario": comentario,
-                    "situacao": situacao_raw,
-                    "situacao_norm": situacao_norm,
-                    "recrutador": recrutador,
-                    "data_candidatura": data_candidatura,
-                    "ultima_atualizacao": ultima_atualizacao,
-                })
-            else:
+            except Exception:
                 rows.append({
                     "vaga_code": str(vaga_code),
                     "titulo_vaga": titulo,
                     "modalidade": modalidade,
                     "candidato_code": None,
                     "nome": None,
-                    "comentario": json.dumps(item, ensure_ascii=False),
+                    "comentario": item,
                     "situacao": "",
                     "situacao_norm": "",
                     "recrutador": "",
                     "data_candidatura": None,
                     "ultima_atualizacao": None,
                 })
+                continue
+
+        # Dict (formato esperado)
+        if isinstance(item, dict):
+            candidato_code = (
+                item.get("codigo")
+                or item.get("id_candidato")
+                or item.get("id")
+                or item.get("codigo_candidato")
+            )
+            nome = item.get("nome") or item.get("name")
+            comentario = item.get("comentario") or item.get("comment") or item.get("observacao") or ""
+            # Trata o typo "situacao_candidado"
+            situacao_raw = (
+                item.get("situacao")
+                or item.get("situacao_candidato")
+                or item.get("situacao_candidado")
+                or item.get("status")
+                or ""
+            )
+            situacao_norm = str(situacao_raw).strip().lower()
+            recrutador = item.get("recrutador", "")
+            data_candidatura = item.get("data_candidatura")
+            ultima_atualizacao = item.get("ultima_atualizacao")
+
+            rows.append({
+                "vaga_code": str(vaga_code),
+                "titulo_vaga": titulo,
+                "modalidade": modalidade,
+                "candidato_code": str(candidato_code) if candidato_code is not None else None,
+                "nome": nome,
+                "comentario": comentario,
+                "situacao": situacao_raw,
+                "situacao_norm": situacao_norm,
+                "recrutador": recrutador,
+                "data_candidatura": data_candidatura,
+                "ultima_atualizacao": ultima_atualizacao,
+            })
+        else:
+            rows.append({
+                "vaga_code": str(vaga_code),
+                "titulo_vaga": titulo,
+                "modalidade": modalidade,
+                "candidato_code": None,
+                "nome": None,
+                "comentario": json.dumps(item, ensure_ascii=False),
+                "situacao": "",
+                "situacao_norm": "",
+                "recrutador": "",
+                "data_candidatura": None,
+                "ultima_atualizacao": None,
+            })
+    return rows
+
+def load_prospects(path: Path) -> pd.DataFrame:
+    """
+    Prospects.json (real): dict {vaga_code: {titulo, modalidade, prospects: [ {...}, ... ]}}
+    Também lida com variações (lista no topo; itens string; JSON serializado).
+    Saída: uma linha por par (vaga_code, candidato) — sem linhas vazias para vagas sem prospects.
+    """
+    raw = json.loads(path.read_text(encoding="utf-8"))
+
+    # Se o topo vier como lista, normaliza para um pseudo vaga_code
+    if isinstance(raw, list):
+        raw = {"(sem_vaga_code)": {"titulo": "", "modalidade": "", "prospects": raw}}
+
+    rows: List[Dict[str, Any]] = []
+    stats = {"str_items": 0, "parsed_str_items": 0}
+
+    for vaga_code, payload in (raw or {}).items():
+        rows.extend(prospect_rows(vaga_code, payload, stats))
 
     df = pd.DataFrame(rows)
     if not df.empty:
@@ -221,7 +245,7 @@ def load_prospects(path: Path) -> pd.DataFrame:
         if "candidato_code" in df.columns:
             df["candidato_code"] = df["candidato_code"].astype(object)
 
-    print(f"[INFO] Prospects: itens string encontrados={str_items}, strings parseadas como JSON={parsed_str_items}")
+    print(f"[INFO] Prospects: itens string encontrados={stats['str_items']}, strings parseadas como JSON={stats['parsed_str_items']}")
     return df
 
 def load_applicants(path: Path) -> pd.DataFrame:
@@ -232,16 +256,218 @@ def load_applicants(path: Path) -> pd.DataFrame:
     data = json.loads(path.read_text(encoding="utf-8"))
     rows: List[Dict[str, Any]] = []
     for cand_code, payload in data.items():
-        row = {"candidato_code": str(cand_code)}
-        row.update(flatten_dict(payload if isinstance(payload, dict) else {"raw": payload}))
-        rows.append(row)
+        rows.append(record_row("candidato_code", cand_code, payload))
     df = pd.DataFrame(rows)
     return df
 
+def iter_applicant_rows(path: Path) -> Iterator[Dict[str, Any]]:
+    """
+    Mesmas linhas de `load_applicants`, uma por vez: cada registro é achatado assim que
+    sai do parser incremental (nem o texto do arquivo nem a árvore inteira ficam em memória).
+    """
+    for cand_code, payload in iter_json_items(path):
+        yield record_row("candidato_code", cand_code, payload)
+
+def write_applicants_streaming(path: Path, out_dir: Path, batch_size: int = 2000, csv: bool = False) -> Dict[str, Any]:
+    """
+    Grava applicants.parquet (e applicants.csv com `csv=True` ou sem pyarrow) em lotes de `batch_size` linhas,
+    com os mesmos tipos de `write_interim`. O JSON é lido uma vez: cada lote bruto vai para um
+    spool em disco (pickle) enquanto `SchemaMerger` acumula a união das colunas e os tipos;
+    depois os lotes são relidos do spool, tipados com o schema final e gravados.
+    """
+    start = time.perf_counter()
+    merger = SchemaMerger()
+    csv_path = out_dir / "applicants.csv"
+    parquet_path = out_dir / "applicants.parquet"
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError:
+        pa = pq = None
+        csv = True
+
+    out_dir.mkdir(parents=True, exist_ok=True)
+    with tempfile.TemporaryDirectory(prefix="applicants-spool-", dir=out_dir) as spool_dir:
+        spool: List[Path] = []
+
+        def spill(batch: List[Dict[str, Any]]) -> None:
+            # dtype object: os tipos são decididos pelo arquivo inteiro, não por lote
+            df = pd.DataFrame(batch, dtype=object)
+            merger.update(df)
+            spool.append(Path(spool_dir) / f"{len(spool):06d}.pkl")
+            df.to_pickle(spool[-1])
+
+        batch: List[Dict[str, Any]] = []
+        for row in iter_applicant_rows(path):
+            batch.append(row)
+            if len(batch) >= batch_size:
+                spill(batch)
+                batch = []
+        if batch or not spool:
+            spill(batch)
+
+        cols, dtypes = merger.columns, merger.dtypes()
+        csv_numeric = merger.csv_numeric()
+        text_cols = {c for c in cols if dtypes.get(c, object) == object and c not in CATEGORY_COLS}
+        pq_writer = None
+        try:
+            for i, part in enumerate(spool):
+                raw = pd.read_pickle(part).reindex(columns=cols).astype(object)
+                typed = apply_schema(raw, dtypes)
+                if csv:
+                    # CSV legado: valores brutos, com os números como no DataFrame inteiro (ex.: int + ausente = float)
+                    raw[csv_numeric] = typed[csv_numeric]
+                    raw.to_csv(csv_path, mode="w" if i == 0 else "a", header=i == 0, index=False, encoding="utf-8")
+                if pq is not None:
+                    table = pa.Table.from_pandas(typed, preserve_index=False)
+                    if pq_writer is None:
+                        pq_writer = pq.ParquetWriter(parquet_path, _stable_schema(table.schema, text_cols))
+                    pq_writer.write_table(table.cast(pq_writer.schema))
+        finally:
+            if pq_writer is not None:
+                pq_writer.close()
+
+    return {
+        "rows": merger.rows,
+        "columns": len(cols),
+        "seconds": time.perf_counter() - start,
+        "csv": csv_path if csv else None,
+        "parquet": parquet_path if pq is not None else None,
+    }
+
+def _stable_schema(schema, text_cols):
+    """
+    Schema do 1º lote sem o que varia entre lotes: texto sempre string (mesmo com a coluna
+    toda nula no lote) e categorias com índice int32.
+    """
+    import pyarrow as pa
+
+    fields = []
+    for f in schema:
+        if f.name in text_cols:
+            f = f.with_type(pa.string())
+        elif pa.types.is_dictionary(f.type):
+            f = f.with_type(pa.dictionary(pa.int32(), f.type.value_type))
+        fields.append(f)
+    return pa.schema(fields, metadata=schema.metadata)
+
+# -----------------------
+# Ingestão incremental
+# -----------------------
+def record_hash(raw: str) -> str:
+    """
+    Hash do texto bruto do registro, como está no arquivo (sem reserializar: é o passo caro).
+    Mudança só de formatação conta como alteração, o que é seguro (o registro é reachatado).
+    """
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+def _read_state(path: Path) -> Dict[str, Any]:
+    try:
+        return json.loads(path.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return {}
+
+def ingest_incremental(name: str, raw_path: Path, key_col: str,
+                       to_rows: Callable[[str, Any], List[Dict[str, Any]]],
+                       out_dir: Path = INTERIM_DIR, csv: bool = False) -> Dict[str, Any]:
+    """
+    Atualiza data/interim/<name>.parquet reachatando só os registros cujo hash mudou.
+    Sem estado anterior (ou sem o Parquet), equivale a uma carga completa.
+    Linhas saem na ordem do arquivo atual, como na carga completa.
+    """
+    start = time.perf_counter()
+    state_path = out_dir / "_state" / f"{name}.json"
+    state = _read_state(state_path)
+    prev_hashes: Dict[str, str] = state.get("hashes", {})
+    if prev_hashes and not interim_exists(name, out_dir):
+        prev_hashes = {}  # estado sem snapshot: recomeça do zero
+
+    order: List[str] = []
+    hashes: Dict[str, str] = {}
+    new_rows: List[Dict[str, Any]] = []
+    n_new = n_changed = 0
+    flatten_s = 0.0
+    for key, payload, raw in iter_json_items(raw_path, with_raw=True):
+        key = str(key)
+        h = record_hash(raw)
+        order.append(key)
+        hashes[key] = h
+        old = prev_hashes.get(key)
+        if old == h:
+            continue
+        n_new += old is None
+        n_changed += old is not None
+        t = time.perf_counter()
+        new_rows.extend(to_rows(key, payload))
+        flatten_s += time.perf_counter() - t
+
+    unchanged = {k for k in order if prev_hashes.get(k) == hashes[k]}
+    deleted = sorted(k for k in prev_hashes if k not in hashes)
+
+    parts = []
+    if unchanged:
+        prev = read_interim(name, base=out_dir)
+        parts.append(prev[prev[key_col].astype(str).isin(unchanged)])
+    if new_rows:
+        parts.append(pd.DataFrame(new_rows))
+    merged = pd.concat(parts, ignore_index=True) if parts else pd.DataFrame(columns=[key_col])
+    pos = {k: i for i, k in enumerate(order)}
+    merged = merged.iloc[np.argsort(merged[key_col].astype(str).map(pos).to_numpy(), kind="stable")]
+    merged = merged.reset_index(drop=True)
+    written = write_interim(merged, name, out_dir, csv=csv)
+
+    # custo de achatar um registro: medido agora ou herdado da execução anterior
+    reflattened = n_new + n_changed
+    per_record = flatten_s / reflattened if reflattened else state.get("flatten_seconds_per_record", 0.0)
+    info = {
+        "name": name,
+        "rows": len(merged),
+        "new": n_new,
+        "changed": n_changed,
+        "unchanged": len(unchanged),
+        "deleted": len(deleted),
+        "seconds": time.perf_counter() - start,
+        "saved_seconds": len(unchanged) * per_record,
+        "written": written,
+    }
+    state_path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = state_path.with_suffix(".json.tmp")
+    tmp.write_text(json.dumps({
+        "hashes": hashes,
+        "flatten_seconds_per_record": per_record,
+        "updated_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "last_run": {k: info[k] for k in ("new", "changed", "unchanged", "deleted")},
+        "deleted_keys": deleted,
+    }, ensure_ascii=False), encoding="utf-8")
+    tmp.replace(state_path)
+    return info
+
+def peak_rss_mb() -> float | None:
+    """Pico de memória residente do processo, em MB (None sem o módulo `resource`, ex.: Windows)."""
+    try:
+        import resource
+    except ImportError:
+        return None
+    scale = 1 / 1024 if sys.platform != "darwin" else 1 / (1024 * 1024)  # ru_maxrss: KB no Linux, bytes no macOS
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * scale
+
 # -----------------------
 # Execução
 # -----------------------
+def parse_args():
+    p = argparse.ArgumentParser(description="Normaliza os JSONs de data/raw em data/interim.")
+    mode = p.add_mutually_exclusive_group()
+    mode.add_argument("--stream", action="store_true",
+                      help="Lê Applicants.json registro a registro e grava em lotes (memória limitada)")
+    mode.add_argument("--incremental", action="store_true",
+                      help="Reachata só registros novos/alterados (hash por registro em data/interim/_state/)")
+    p.add_argument("--batch-size", type=int, default=2000, help="Linhas por lote no modo --stream (default=2000)")
+    p.add_argument("--csv", action="store_true", help="Grava também os CSVs legados em data/interim/")
+    return p.parse_args()
+
 def main() -> None:
+    args = parse_args()
+
     # Sanidade: checar arquivos
     missing = [p for p in [JOBS_PATH, PROSPECTS_PATH, APPLICANTS_PATH] if not p.exists()]
     if missing:
@@ -249,6 +475,22 @@ def main() -> None:
             "Arquivo(s) ausente(s) em data/raw: " + ", ".join(str(m) for m in missing)
         )
 
+    if args.incremental:
+        sources = [
+            ("jobs", JOBS_PATH, "vaga_code", lambda k, v: [record_row("vaga_code", k, v)]),
+            ("prospects", PROSPECTS_PATH, "vaga_code", prospect_rows),
+            ("applicants", APPLICANTS_PATH, "candidato_code", lambda k, v: [record_row("candidato_code", k, v)]),
+        ]
+        for name, path, key_col, to_rows in sources:
+            info = ingest_incremental(name, path, key_col, to_rows, INTERIM_DIR, csv=args.csv)
+            print(
+                f"[OK] {name}: {info['rows']} linhas | novos={info['new']} alterados={info['changed']} "
+                f"inalterados={info['unchanged']} removidos={info['deleted']} | {info['seconds']:.1f}s "
+                f"(~{info['saved_seconds']:.1f}s de achatamento evitados)"
+            )
+        print("\n[OK] Ingestão incremental concluída em data/interim/")
+        return
+
     print(f"[INFO] Lendo: {JOBS_PATH.name}")
     jobs_df = load_jobs(JOBS_PATH)
     print(f"[OK] Jobs carregado: {jobs_df.shape}")
@@ -257,27 +499,28 @@ def main() -> None:
     prospects_df = load_prospects(PROSPECTS_PATH)
     print(f"[OK] Prospects carregado: {prospects_df.shape}")
 
-    print(f"[INFO] Lendo: {APPLICANTS_PATH.name}")
-    applicants_df = load_applicants(APPLICANTS_PATH)
-    print(f"[OK] Applicants carregado: {applicants_df.shape}")
-
-    # Salvar CSV
-    jobs_csv = INTERIM_DIR / "jobs.csv"
-    prospects_csv = INTERIM_DIR / "prospects.csv"
-    applicants_csv = INTERIM_DIR / "applicants.csv"
-
-    jobs_df.to_csv(jobs_csv, index=False, encoding="utf-8")
-    prospects_df.to_csv(prospects_csv, index=False, encoding="utf-8")
-    applicants_df.to_csv(applicants_csv, index=False, encoding="utf-8")
+    # Salvar (Parquet tipado; CSV só com --csv)
+    for name, df in (("jobs", jobs_df), ("prospects", prospects_df)):
+        for out in write_interim(df, name, INTERIM_DIR, csv=args.csv):
+            print(f"[OK] salvo: {out}")
+    del jobs_df, prospects_df
 
-    print(f"[OK] CSV salvo: {jobs_csv}")
-    print(f"[OK] CSV salvo: {prospects_csv}")
-    print(f"[OK] CSV salvo: {applicants_csv}")
+    print(f"[INFO] Lendo: {APPLICANTS_PATH.name}" + (f" (stream, lotes de {args.batch_size})" if args.stream else ""))
+    if args.stream:
+        info = write_applicants_streaming(APPLICANTS_PATH, INTERIM_DIR, args.batch_size, csv=args.csv)
+        print(f"[OK] Applicants: {info['rows']} linhas x {info['columns']} colunas em {info['seconds']:.1f}s")
+        for out in (info["parquet"], info["csv"]):
+            if out is not None:
+                print(f"[OK] salvo: {out}")
+    else:
+        applicants_df = load_applicants(APPLICANTS_PATH)
+        print(f"[OK] Applicants carregado: {applicants_df.shape}")
+        for out in write_interim(applicants_df, "applicants", INTERIM_DIR, csv=args.csv):
+            print(f"[OK] salvo: {out}")
 
-    # Salvar PARQUET (opcional)
-    _try_to_parquet(jobs_df, INTERIM_DIR / "jobs.parquet")
-    _try_to_parquet(prospects_df, INTERIM_DIR / "prospects.parquet")
-    _try_to_parquet(applicants_df, INTERIM_DIR / "applicants.parquet")
+    rss = peak_rss_mb()
+    if rss is not None:
+        print(f"[INFO] pico de RSS: {rss:.0f} MB")
 
     print("\n[OK] Normalização concluída. Arquivos gerados em data/interim/")
 
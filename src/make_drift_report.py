@@ -14,12 +14,8 @@ from datetime import datetime, timezone
 import numpy as np
 import pandas as pd
 
-# Utilitários do projeto
-from src.train_baseline import (
-    find_file, load_json, first_key, flatten_text_from_subdicts,
-    label_from_text, score_tecnico,
-    JOB_SUBDICT_KEYS, APPLICANT_SUBDICT_KEYS, APPLICANT_CV_KEYS,
-)
+# Tabela de pares compartilhada com o treino
+from src.dataset_builder import load_pairs
 
 DOCS_DIR = ROOT / "docs"
 DOCS_DIR.mkdir(parents=True, exist_ok=True)
@@ -28,48 +24,10 @@ OUT_JSON = DOCS_DIR / "drift_summary.json"
 
 
 def build_df() -> pd.DataFrame:
-    jobs = load_json(find_file("Jobs.json"))
-    prospects = load_json(find_file("Prospects.json"))
-    applicants = load_json(find_file("Applicants.json"))
-
-    rows = []
-    for vaga_code, blob in prospects.items():
-        if not isinstance(blob, dict):
-            continue
-        plist = blob.get("prospects") or blob.get("prospeccoes") or []
-        if not isinstance(plist, list):
-            continue
-
-        job_obj = jobs.get(str(vaga_code), {}) if isinstance(jobs, dict) else {}
-        job_text = flatten_text_from_subdicts(job_obj, JOB_SUBDICT_KEYS)
-
-        for it in plist:
-            if not isinstance(it, dict):
-                continue
-
-            cand_key = first_key(it, ["codigo"])
-            cand_code = str(it.get(cand_key)) if cand_key else ""
-
-            status_key = first_key(it, ["situacao_candidado", "situacao", "status"])
-            raw_status = str(it.get(status_key) or "")
-            y = label_from_text(raw_status)
-
-            cand_obj = applicants.get(cand_code, {}) if isinstance(applicants, dict) else {}
-            cand_text = flatten_text_from_subdicts(cand_obj, APPLICANT_SUBDICT_KEYS, APPLICANT_CV_KEYS)
-
-            st = score_tecnico(job_text, cand_text)
-
-            rows.append(
-                {
-                    "job_text": job_text,
-                    "cand_text": cand_text,
-                    "situacao_norm": raw_status,
-                    "score_tecnico": st,
-                    "y": y,
-                }
-            )
-
-    df = pd.DataFrame(rows).dropna(subset=["y"]).copy()
+    # Tabela de pares (cache por hash dos JSONs); aqui o rótulo vem só do status
+    df, _ = load_pairs()
+    df = df[["job_text", "cand_text", "situacao_norm", "score_tecnico", "y_status"]].rename(columns={"y_status": "y"})
+    df = df.dropna(subset=["y"]).copy()
     df["y"] = df["y"].astype(int)
     return df
 
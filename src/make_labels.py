@@ -1,7 +1,7 @@
 # src/make_labels.py
 # -*- coding: utf-8 -*-
 """
-Lê data/interim/prospects.csv e gera data/processed/labels_by_candidato_vaga.csv
+Lê data/interim/prospects (Parquet; só as colunas usadas) e gera data/processed/labels_by_candidato_vaga.csv
 com a coluna y (0/1) a partir do status/situacao do candidato na vaga.
 - Normaliza acentos e caixa
 - Usa lista ampliada de positivos
@@ -9,17 +9,24 @@ com a coluna y (0/1) a partir do status/situacao do candidato na vaga.
 """
 
 from __future__ import annotations
+# --- garante o pacote top-level 'src' no sys.path quando rodar como script ---
+import sys
 from pathlib import Path
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+# -----------------------------------------------------------------------------
+
 import pandas as pd
 import re
 import unicodedata
 
+from src.interim_store import INTERIM_DIR, interim_exists, read_interim
+
 PROJECT_ROOT = Path(__file__).resolve().parents[1]
-INTERIM_DIR = PROJECT_ROOT / "data" / "interim"
 PROCESSED_DIR = PROJECT_ROOT / "data" / "processed"
 PROCESSED_DIR.mkdir(parents=True, exist_ok=True)
 
-PROSPECTS_CSV = INTERIM_DIR / "prospects.csv"
 OUT_CSV = PROCESSED_DIR / "labels_by_candidato_vaga.csv"
 
 # Valores de 'situacao' claramente positivos
@@ -73,13 +80,14 @@ def is_positive(situacao_norm: str, comentario_norm: str) -> int:
     return 0
 
 def main():
-    if not PROSPECTS_CSV.exists():
-        raise FileNotFoundError(f"Arquivo não encontrado: {PROSPECTS_CSV}")
+    if not interim_exists("prospects"):
+        raise FileNotFoundError(f"Arquivo não encontrado: {INTERIM_DIR / 'prospects.parquet'}")
 
-    df = pd.read_csv(PROSPECTS_CSV)
+    cols = ["vaga_code", "candidato_code", "nome", "comentario", "situacao"]
+    df = read_interim("prospects", columns=cols)
 
     # garante colunas
-    for c in ["vaga_code", "candidato_code", "nome", "comentario", "situacao"]:
+    for c in cols:
         if c not in df.columns:
             df[c] = None
 
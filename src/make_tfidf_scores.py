@@ -12,25 +12,32 @@ Versão ROBUSTA:
   (2) char_wb 3-5 (melhor para textos curtos/ruidosos)
 - Similaridade final = MÁXIMO(word_sim, char_sim).
 
+Entradas: data/interim/{jobs,prospects,applicants}.parquet (src/interim_store.py; CSV legado se não houver).
+
 Saída:
 - data/processed/scores.csv -> ["vaga_code", "candidato_code", "score_tecnico"]
 """
 
 from __future__ import annotations
+# --- garante o pacote top-level 'src' no sys.path quando rodar como script ---
+import sys
 from pathlib import Path
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+# -----------------------------------------------------------------------------
+
 import re
 import pandas as pd
 from sklearn.feature_extraction.text import TfidfVectorizer
 from sklearn.metrics.pairwise import cosine_similarity
 
+from src.interim_store import INTERIM_DIR, read_interim
+
 PROJECT_ROOT = Path(__file__).resolve().parents[1]
 DATA_DIR = PROJECT_ROOT / "data"
-INTERIM_DIR = DATA_DIR / "interim"
 PROCESSED_DIR = DATA_DIR / "processed"
 
-JOBS_CSV = INTERIM_DIR / "jobs.csv"
-PROSPECTS_CSV = INTERIM_DIR / "prospects.csv"
-APPLICANTS_CSV = INTERIM_DIR / "applicants.csv"
 OUT_SCORES = PROCESSED_DIR / "scores.csv"
 
 
@@ -159,11 +166,12 @@ def compute_similarity(job_text: str, cand_texts: list[str]) -> list[float]:
 # Main
 # -----------------------
 def main():
-    print(f"[INFO] Lendo {JOBS_CSV.name}, {PROSPECTS_CSV.name}, {APPLICANTS_CSV.name}")
+    print(f"[INFO] Lendo jobs, prospects, applicants de {INTERIM_DIR}")
 
-    jobs = pd.read_csv(JOBS_CSV, dtype={"vaga_code": str}, encoding="utf-8", low_memory=False)
-    prospects = pd.read_csv(PROSPECTS_CSV, dtype={"vaga_code": str, "candidato_code": str}, encoding="utf-8", low_memory=False)
-    applicants = pd.read_csv(APPLICANTS_CSV, dtype={"candidato_code": str}, encoding="utf-8", low_memory=False)
+    # jobs/applicants: todas as colunas textuais entram no fallback; de prospects só os ids
+    jobs = read_interim("jobs")
+    prospects = read_interim("prospects", columns=["vaga_code", "candidato_code"])
+    applicants = read_interim("applicants")
 
     # Filtra pares válidos
     prospects = prospects[
@@ -0,0 +1,243 @@
+# src/score_batch.py
+# -*- coding: utf-8 -*-
+"""
+Pontuação offline de um arquivo grande de pares (vaga, candidato), sem passar pela API.
+
+Entrada (CSV ou Parquet), lida em blocos:
+- com textos: job_text, cand_text, situacao_norm e (opcional) score_tecnico
+- ou só com ids: vaga_code, candidato_code, situacao_norm -> textos do feature store
+  (src/feature_store.py, mesmo achatamento de train_baseline)
+
+score_tecnico ausente é calculado com `train_baseline.score_tecnico` (o mesmo Jaccard do
+treino e do modo "server" da API). Os blocos são pontuados num pool de processos, com o
+modelo carregado uma vez por worker, e gravados incrementalmente na ordem da entrada.
+
+Uso:
+    python src/score_batch.py pares.csv --out scores.csv
+    python src/score_batch.py pares.parquet --out scores.parquet --workers 8 --chunk-size 20000
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Iterator, Optional
+
+import joblib
+import numpy as np
+import pandas as pd
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from src.compiled_scorer import SOURCE_MODEL_FILES  # noqa: E402
+from src.feature_store import FEATURE_STORE_FILE, FeatureStore  # noqa: E402
+from src.train_baseline import DEFAULT_THRESHOLD, THRESHOLD_FILE, score_tecnico  # noqa: E402
+
+FEATURE_COLS = ["job_text", "cand_text", "situacao_norm", "score_tecnico"]
+ID_COLS = ["vaga_code", "candidato_code"]
+
+# estado por processo (initializer do pool)
+_worker: dict = {}
+
+
+# --------------------------------------------------------------------------------------
+# Features (mesma construção do treino)
+# --------------------------------------------------------------------------------------
+def build_features(chunk: pd.DataFrame, store: Optional[FeatureStore], situacao_default: str = "") -> pd.DataFrame:
+    """
+    -> DataFrame com FEATURE_COLS + `error`; textos vêm do próprio arquivo ou do feature store (ids).
+    Linhas com erro (id ausente no store) ficam com textos vazios e não são pontuadas.
+    """
+    out = pd.DataFrame(index=chunk.index)
+    out["error"] = None
+    if "job_text" in chunk.columns and "cand_text" in chunk.columns:
+        out["job_text"] = chunk["job_text"].fillna("").astype(str)
+        out["cand_text"] = chunk["cand_text"].fillna("").astype(str)
+    else:
+        if store is None:
+            raise ValueError("Entrada só com ids exige o feature store (python src/feature_store.py).")
+        jobs, cands = [], []
+        for i, vaga, cand in zip(chunk.index, chunk["vaga_code"].astype(str), chunk["candidato_code"].astype(str)):
+            job_f, cand_f = store.job(vaga), store.candidate(cand, cache_miss=False)
+            if job_f is None or cand_f is None:
+                out.at[i, "error"] = f"{'vaga_code' if job_f is None else 'candidato_code'} não está no feature store"
+            jobs.append(job_f.text if job_f is not None else "")
+            cands.append(cand_f.text if cand_f is not None else "")
+        out["job_text"], out["cand_text"] = jobs, cands
+
+    if "situacao_norm" in chunk.columns:
+        out["situacao_norm"] = chunk["situacao_norm"].fillna(situacao_default).astype(str)
+    else:
+        out["situacao_norm"] = situacao_default
+
+    given = chunk["score_tecnico"] if "score_tecnico" in chunk.columns else pd.Series(np.nan, index=chunk.index)
+    out["score_tecnico"] = [
+        float(s) if pd.notna(s) else score_tecnico(j, c)
+        for s, j, c in zip(given, out["job_text"], out["cand_text"])
+    ]
+    return out
+
+
+def _init_worker(model_path: str, store_path: Optional[str], situacao_default: str) -> None:
+    _worker["model"] = joblib.load(model_path)
+    _worker["store"] = FeatureStore(Path(store_path), cache_size=1024) if store_path else None
+    _worker["situacao_default"] = situacao_default
+
+
+def score_chunk(chunk: pd.DataFrame) -> pd.DataFrame:
+    """Roda no worker: features + predict_proba do bloco inteiro numa chamada."""
+    feats = build_features(chunk, _worker["store"], _worker["situacao_default"])
+    ok = feats["error"].isna().to_numpy()
+    proba = np.full(len(feats), np.nan)
+    if ok.any():
+        proba[ok] = np.asarray(_worker["model"].predict_proba(feats.loc[ok, FEATURE_COLS]))[:, 1]
+    keep = [c for c in ID_COLS if c in chunk.columns]
+    out = chunk[keep].copy()
+    out["score_tecnico"] = feats["score_tecnico"].to_numpy()
+    out["y_prob"] = proba
+    out["error"] = feats["error"].astype("string")  # tipo estável entre blocos (Parquet)
+    return out
+
+
+# --------------------------------------------------------------------------------------
+# IO em blocos
+# --------------------------------------------------------------------------------------
+def iter_chunks(path: Path, chunk_size: int) -> Iterator[pd.DataFrame]:
+    if path.suffix.lower() == ".parquet":
+        import pyarrow.parquet as pq
+
+        for batch in pq.ParquetFile(path).iter_batches(batch_size=chunk_size):
+            yield batch.to_pandas()
+    else:
+        yield from pd.read_csv(path, chunksize=chunk_size, dtype={c: str for c in ID_COLS})
+
+
+class ChunkWriter:
+    """Grava blocos conforme chegam: CSV em append (cabeçalho uma vez) ou Parquet via ParquetWriter."""
+
+    def __init__(self, path: Path):
+        self.path = path
+        self.parquet = path.suffix.lower() == ".parquet"
+        self._writer = None
+        self.rows = 0
+        path.parent.mkdir(parents=True, exist_ok=True)
+
+    def write(self, df: pd.DataFrame) -> None:
+        if self.parquet:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+
+            table = pa.Table.from_pandas(df, preserve_index=False)
+            if self._writer is None:
+                self._writer = pq.ParquetWriter(self.path, table.schema)
+            self._writer.write_table(table.cast(self._writer.schema))
+        else:
+            df.to_csv(self.path, mode="w" if self.rows == 0 else "a", header=self.rows == 0, index=False)
+        self.rows += len(df)
+
+    def close(self) -> None:
+        if self._writer is not None:
+            self._writer.close()
+
+
+def _load_threshold() -> float:
+    try:
+        return float(json.loads(THRESHOLD_FILE.read_text(encoding="utf-8")).get("threshold", DEFAULT_THRESHOLD))
+    except Exception:
+        return DEFAULT_THRESHOLD
+
+
+def _peak_memory_mb() -> dict:
+    """Pico de RSS do processo principal e dos workers (resource só existe em Unix)."""
+    try:
+        import resource
+    except ImportError:
+        return {"main": None, "workers": None}
+    scale = 1 / 1024 if sys.platform != "darwin" else 1 / (1024 * 1024)  # ru_maxrss: KB no Linux, bytes no macOS
+    return {
+        "main": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * scale,
+        "workers": resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss * scale,
+    }
+
+
+def run(in_path: Path, out_path: Path, model_path: Path, store_path: Optional[Path] = None,
+        workers: int = 1, chunk_size: int = 5000, threshold: Optional[float] = None,
+        situacao_default: str = "") -> dict:
+    threshold = _load_threshold() if threshold is None else threshold
+    initargs = (str(model_path), str(store_path) if store_path else None, situacao_default)
+    writer = ChunkWriter(out_path)
+    start = time.perf_counter()
+
+    def emit(scored: pd.DataFrame) -> None:
+        scored["y_pred"] = (scored["y_prob"] >= threshold).astype("Int64").mask(scored["y_prob"].isna())
+        writer.write(scored)
+
+    try:
+        if workers <= 1:
+            _init_worker(*initargs)
+            for chunk in iter_chunks(in_path, chunk_size):
+                emit(score_chunk(chunk))
+        else:
+            with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=initargs) as pool:
+                # janela limitada de blocos em voo: memória constante e saída na ordem da entrada
+                pending = deque()
+                for chunk in iter_chunks(in_path, chunk_size):
+                    pending.append(pool.submit(score_chunk, chunk))
+                    if len(pending) >= 2 * workers:
+                        emit(pending.popleft().result())
+                while pending:
+                    emit(pending.popleft().result())
+    finally:
+        writer.close()
+
+    seconds = time.perf_counter() - start
+    return {
+        "rows": writer.rows,
+        "seconds": seconds,
+        "rows_per_s": writer.rows / seconds if seconds > 0 else None,
+        "workers": workers,
+        "chunk_size": chunk_size,
+        "threshold": threshold,
+        "peak_rss_mb": _peak_memory_mb(),
+    }
+
+
+def parse_args():
+    p = argparse.ArgumentParser(description="Pontua offline um CSV/Parquet de pares (vaga, candidato).")
+    p.add_argument("input", type=Path, help="CSV ou Parquet com textos ou ids dos pares")
+    p.add_argument("--out", type=Path, required=True, help="Saída .csv ou .parquet")
+    p.add_argument("--model", type=Path, default=None, help="Modelo .joblib (default: model_cv.joblib ou model.joblib)")
+    p.add_argument("--store", type=Path, default=FEATURE_STORE_FILE, help="Feature store para entradas só com ids")
+    p.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="Processos (1 = sem pool)")
+    p.add_argument("--chunk-size", type=int, default=5000, help="Linhas por bloco (default=5000)")
+    p.add_argument("--threshold", type=float, default=None, help="Default: models/decision_threshold.json")
+    p.add_argument("--situacao-default", default="", help="situacao_norm quando a coluna faltar/vier vazia")
+    return p.parse_args()
+
+
+def main():
+    args = parse_args()
+    model_path = args.model or next((p for p in SOURCE_MODEL_FILES if p.exists()), None)
+    if model_path is None:
+        raise FileNotFoundError("Nenhum modelo encontrado. Treine com: python src/train_baseline.py")
+    store_path = args.store if args.store and args.store.exists() else None
+    info = run(args.input, args.out, model_path, store_path, args.workers, args.chunk_size, args.threshold,
+               args.situacao_default)
+    mem = info["peak_rss_mb"]
+    print(
+        f"[OK] {info['rows']} pares em {info['seconds']:.1f}s ({info['rows_per_s'] or 0:.0f} pares/s) -> {args.out}"
+    )
+    if mem["main"] is not None:
+        print(f"[INFO] pico de RSS: principal={mem['main']:.0f} MB | maior worker={mem['workers']:.0f} MB")
+
+
+if __name__ == "__main__":
+    main()
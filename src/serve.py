@@ -0,0 +1,82 @@
+# src/serve.py
+# -*- coding: utf-8 -*-
+"""
+Sobe a API com N workers uvicorn compartilhando o modelo via mmap.
+
+Cada worker que faz `joblib.load` do pipeline guarda sua própria cópia do vocabulário
+do TF-IDF e dos coeficientes, então a RSS cresce com o número de workers. Aqui o scorer
+é exportado em layout só-arrays (models/model_shared.joblib, ver `compiled_scorer --shared`)
+e cada worker o abre com `mmap_mode="r"`: as páginas vêm do page cache e são
+compartilhadas entre os processos.
+
+Uso:
+    python src/serve.py --workers 4
+    python src/serve.py --workers 4 --port 8001 --model models/model.joblib
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import sys
+from pathlib import Path
+from typing import Optional
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from src.compiled_scorer import (  # noqa: E402
+    SHARED_MODEL_FILE,
+    SOURCE_MODEL_FILES,
+    export,
+    file_sha256,
+    source_digest_of,
+)
+
+
+def ensure_shared_model(model_path: Optional[Path] = None, out_path: Path = SHARED_MODEL_FILE) -> bool:
+    """
+    (Re)exporta o scorer compartilhado se ele não existir ou não tiver sido gerado a partir deste
+    pipeline (sha256 gravado no export; mtime não basta: cópias/restores preservam datas).
+    Devolve False se o pipeline não puder ser compilado (os workers carregam o pipeline normal).
+    """
+    source = model_path or next((p for p in SOURCE_MODEL_FILES if p.exists()), None)
+    if source is None:
+        return out_path.exists()
+    if out_path.exists() and source_digest_of(out_path) == file_sha256(source):
+        return True
+    try:
+        export(source, out_path, shared=True)
+    except ValueError as e:
+        print(f"[WARN] pipeline não compilável ({e}); cada worker carrega sua própria cópia")
+        return False
+    print(f"[OK] scorer compartilhado: {out_path} (origem={source.name})")
+    return True
+
+
+def parse_args():
+    p = argparse.ArgumentParser(description="Sobe a API com vários workers e modelo compartilhado (mmap).")
+    p.add_argument("--workers", type=int, default=int(os.environ.get("WEB_CONCURRENCY", os.cpu_count() or 1)),
+                   help="Número de processos uvicorn (default=WEB_CONCURRENCY ou nº de CPUs)")
+    p.add_argument("--host", default="0.0.0.0")
+    p.add_argument("--port", type=int, default=8000)
+    p.add_argument("--model", type=Path, default=None, help="Pipeline .joblib (default: model_cv.joblib ou model.joblib)")
+    p.add_argument("--no-export", action="store_true", help="Não (re)gera models/model_shared.joblib")
+    return p.parse_args()
+
+
+def main():
+    args = parse_args()
+    shared = SHARED_MODEL_FILE.exists() if args.no_export else ensure_shared_model(args.model)
+    # herdado pelos workers: a API prefere o scorer compartilhado e o abre com mmap
+    os.environ["MODEL_MMAP_ENABLED"] = "1" if shared else "0"
+    print(f"[INFO] workers={args.workers} mmap={'sim' if shared else 'não'} em http://{args.host}:{args.port}")
+
+    import uvicorn
+
+    uvicorn.run("src.api:app", host=args.host, port=args.port, workers=args.workers)
+
+
+if __name__ == "__main__":
+    main()
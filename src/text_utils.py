@@ -0,0 +1,52 @@
+# src/text_utils.py
+# -*- coding: utf-8 -*-
+"""
+Helpers de texto compartilhados entre treino (`train_baseline`, `feature_store`) e serving (`api`).
+
+Só stdlib: a API importa daqui sem puxar o módulo de treino (pandas/sklearn de treino,
+criação de models/ no import). Qualquer mudança aqui muda o score_tecnico dos dois lados.
+"""
+
+from __future__ import annotations
+
+from typing import List
+
+
+def flatten_text_from_subdicts(
+    obj: dict, subkeys: List[str], extra_text_keys: List[str] | None = None
+) -> str:
+    parts: List[str] = []
+    if extra_text_keys:
+        for k in extra_text_keys:
+            v = obj.get(k)
+            if isinstance(v, list):
+                v = " ".join(map(str, v))
+            if v:
+                parts.append(str(v))
+    for sk in subkeys:
+        sub = obj.get(sk)
+        if isinstance(sub, dict):
+            for v in sub.values():
+                if isinstance(v, list):
+                    parts.append(" ".join(map(str, v)))
+                elif isinstance(v, (str, int, float)):
+                    parts.append(str(v))
+                elif isinstance(v, dict):
+                    for vv in v.values():
+                        if isinstance(vv, list):
+                            parts.append(" ".join(map(str, vv)))
+                        elif isinstance(vv, (str, int, float)):
+                            parts.append(str(vv))
+        elif isinstance(sub, list):
+            parts.append(" ".join(map(str, sub)))
+    return " ".join(parts).strip()
+
+def tokenize(t: str) -> set[str]:
+    return {w for w in str(t).lower().replace("/", " ").replace(",", " ").split() if w}
+
+def score_tecnico(job_text: str, cand_text: str) -> float:
+    a, b = tokenize(job_text), tokenize(cand_text)
+    if not a or not b:
+        return 0.0
+    inter, uni = len(a & b), len(a | b)
+    return float(inter / uni)
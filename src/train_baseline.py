@@ -1,9 +1,19 @@
 # src/train_baseline.py
 from __future__ import annotations
 
+# --- garante o pacote top-level 'src' no sys.path quando rodar como script ---
+import sys
 from pathlib import Path
+ROOT = Path(__file__).resolve().parent.parent
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+# -----------------------------------------------------------------------------
+
+import argparse
 import json
-from typing import Any, Dict, List, Iterable
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, List, Iterable, Optional, Tuple
 from datetime import datetime
 
 import numpy as np
@@ -23,15 +33,18 @@ from sklearn.metrics import (
 )
 from sklearn.model_selection import train_test_split
 
+from src.text_utils import flatten_text_from_subdicts, score_tecnico, tokenize  # noqa: F401 (reexportados)
+from src.thresholds import OBJECTIVES, add_threshold_args, best_threshold, threshold_options
+
 # --------------------------------------------------------------------------------------
 # Caminhos e constantes
 # --------------------------------------------------------------------------------------
-ROOT = Path(__file__).resolve().parent.parent
 DATA_DIRS = [ROOT / "data", ROOT / "data" / "raw"]
 MODELS_DIR = ROOT / "models"
 MODELS_DIR.mkdir(parents=True, exist_ok=True)
 THRESHOLD_FILE = MODELS_DIR / "decision_threshold.json"
 METRICS_FILE = MODELS_DIR / "metrics.json"
+METRICS_HOLDOUT_FILE = MODELS_DIR / "metrics_holdout.json"
 DEFAULT_THRESHOLD = 0.59
 
 
@@ -127,45 +140,6 @@ def label_from_text(s: str) -> int | None:
         return 0
     return None
 
-def flatten_text_from_subdicts(
-    obj: dict, subkeys: List[str], extra_text_keys: List[str] | None = None
-) -> str:
-    parts: List[str] = []
-    if extra_text_keys:
-        for k in extra_text_keys:
-            v = obj.get(k)
-            if isinstance(v, list):
-                v = " ".join(map(str, v))
-            if v:
-                parts.append(str(v))
-    for sk in subkeys:
-        sub = obj.get(sk)
-        if isinstance(sub, dict):
-            for v in sub.values():
-                if isinstance(v, list):
-                    parts.append(" ".join(map(str, v)))
-                elif isinstance(v, (str, int, float)):
-                    parts.append(str(v))
-                elif isinstance(v, dict):
-                    for vv in v.values():
-                        if isinstance(vv, list):
-                            parts.append(" ".join(map(str, vv)))
-                        elif isinstance(vv, (str, int, float)):
-                            parts.append(str(vv))
-        elif isinstance(sub, list):
-            parts.append(" ".join(map(str, sub)))
-    return " ".join(parts).strip()
-
-def tokenize(t: str) -> set[str]:
-    return {w for w in str(t).lower().replace("/", " ").replace(",", " ").split() if w}
-
-def score_tecnico(job_text: str, cand_text: str) -> float:
-    a, b = tokenize(job_text), tokenize(cand_text)
-    if not a or not b:
-        return 0.0
-    inter, uni = len(a & b), len(a | b)
-    return float(inter / uni)
-
 
 # --------------------------------------------------------------------------------------
 # --- helpers pickláveis (nível de módulo) ---
@@ -225,84 +199,13 @@ def make_pipeline() -> Pipeline:
 
 
 # --------------------------------------------------------------------------------------
-# Threshold (Youden simples) + fallback
+# Rótulos (weak labels + dedupe; compartilhado com tune.py)
 # --------------------------------------------------------------------------------------
-def choose_threshold(proba: np.ndarray, y: np.ndarray) -> float:
-    try:
-        cand = np.linspace(0.2, 0.8, 61)
-        auc = roc_auc_score(y, proba)
-        best_t, best_val = None, None
-        for t in cand:
-            yhat = (proba >= t).astype(int)
-            acc = (yhat == y).mean()
-            youden = acc + auc - 1.0
-            if (best_val is None) or (youden > best_val):
-                best_t, best_val = t, youden
-        return float(best_t) if best_t is not None else DEFAULT_THRESHOLD
-    except Exception:
-        return DEFAULT_THRESHOLD
-
-
-# --------------------------------------------------------------------------------------
-# Main (com HOLDOUT + metrics.json)
-# --------------------------------------------------------------------------------------
-def main():
-    jobs = load_json(find_file("Jobs.json"))            # dict[str -> job_obj]
-    prospects = load_json(find_file("Prospects.json"))  # dict[str -> {titulo, modalidade, prospects:[...] }]
-    applicants = load_json(find_file("Applicants.json"))# dict[str -> applicant_obj]
-
-    rows: List[Dict[str, Any]] = []
-
-    # Varre cada vaga e sua lista de prospects
-    for vaga_code, blob in prospects.items():
-        if not isinstance(blob, dict):
-            continue
-        plist = blob.get("prospects") or blob.get("prospeccoes") or []
-        if not isinstance(plist, list):
-            continue
-
-        job_obj = jobs.get(str(vaga_code), {}) if isinstance(jobs, dict) else {}
-        job_text = flatten_text_from_subdicts(job_obj, JOB_SUBDICT_KEYS)
-
-        for it in plist:
-            if not isinstance(it, dict):
-                continue
-
-            # Código do candidato
-            cand_key = first_key(it, CANDIDATE_KEY)
-            cand_code = str(it.get(cand_key)) if cand_key else ""
-
-            # Status e/ou comentário para rótulo explícito
-            status_key = first_key(it, STATUS_KEYS)
-            raw_status = str(it.get(status_key) or "")
-            y = label_from_text(raw_status)
-            if y is None:
-                comment_key = first_key(it, COMMENT_KEYS)
-                if comment_key:
-                    y = label_from_text(str(it.get(comment_key) or ""))
-
-            # Texto do candidato (flatten dos subdicts + CVs)
-            cand_obj = applicants.get(cand_code, {}) if isinstance(applicants, dict) else {}
-            cand_text = flatten_text_from_subdicts(cand_obj, APPLICANT_SUBDICT_KEYS, APPLICANT_CV_KEYS)
-
-            st = score_tecnico(job_text, cand_text)
-
-            rows.append(
-                {
-                    "vaga_code": str(vaga_code),
-                    "candidato_code": cand_code,
-                    "job_text": job_text,
-                    "cand_text": cand_text,
-                    "situacao_norm": raw_status,  # pode estar vazio
-                    "score_tecnico": st,
-                    "y": y,  # pode ser None
-                }
-            )
-
-    df = pd.DataFrame(rows)
-    if df.empty:
-        raise RuntimeError("Sem pares gerados. Verifique a estrutura dos JSONs.")
-
+def apply_labels(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Pós-processamento dos rótulos da tabela de pares: weak labels pelos extremos do
+    score_tecnico, dropna e dedupe vaga-candidato (fica a última). `y` sai como int.
+    """
     # Weak labels pelos extremos do score_tecnico
     unlabeled = df["y"].isna()
     if unlabeled.any():
@@ -312,7 +215,7 @@ def main():
             t_neg = float(np.nanpercentile(scores, PCTL_NEG * 100))
             df.loc[unlabeled & (df["score_tecnico"] >= t_pos), "y"] = 1
             df.loc[unlabeled & (df["score_tecnico"] <= t_neg), "y"] = 0
-            
+
             df = df.dropna(subset=["y"])
         else:
             df = df.dropna(subset=["y"])
@@ -326,6 +229,139 @@ def main():
         raise RuntimeError(
             "Após rotulagem, só há uma classe. Ajuste POS_KEYS/NEG_KEYS ou os percentis PCTL_POS/PCTL_NEG."
         )
+    return df
+
+
+# --------------------------------------------------------------------------------------
+# Threshold (ver src/thresholds.py: Youden por padrão) + fallback
+# --------------------------------------------------------------------------------------
+def choose_threshold(proba: np.ndarray, y: np.ndarray, objective: str = "youden", **kwargs: float) -> float:
+    if objective not in OBJECTIVES:
+        raise ValueError(f"Objetivo desconhecido: {objective!r} (opções: {', '.join(OBJECTIVES)})")
+    try:
+        return best_threshold(proba, y, objective, **kwargs)[0]
+    except ValueError:
+        # uma classe só (ou nenhum ponto viável para precision_at_recall)
+        return DEFAULT_THRESHOLD
+
+
+# --------------------------------------------------------------------------------------
+# Reaproveitamento entre o fit do holdout e o re-treino em 100%
+# --------------------------------------------------------------------------------------
+class CachedAnalyzer:
+    """
+    Analisador do TF-IDF com memo por documento: cada texto concatenado é tokenizado uma vez
+    e reaproveitado nos fits e predições do holdout e do re-treino. Devolve os mesmos tokens
+    do analisador padrão de make_pipeline(); `release_analyzer` volta para ele antes de salvar.
+    """
+
+    def __init__(self):
+        self.analyzer = make_pipeline().get_params()["prep__text__tfidf"].build_analyzer()
+        self.memo: Dict[str, List[str]] = {}
+        self.hits = 0
+
+    def __call__(self, doc: str) -> List[str]:
+        tokens = self.memo.get(doc)
+        if tokens is None:
+            # intern: cada termo vira um único objeto str, compartilhado por todos os documentos
+            tokens = self.memo[doc] = [sys.intern(t) for t in self.analyzer(doc)]
+        else:
+            self.hits += 1
+        return tokens
+
+    def __deepcopy__(self, memo):
+        # clone() (ColumnTransformer/Pipeline) copia os parâmetros; o memo precisa ser o mesmo
+        return self
+
+
+def _fitted_tfidf(prep) -> TfidfVectorizer:
+    return prep.named_transformers_["text"].named_steps["tfidf"]
+
+
+def release_analyzer(pipe: Pipeline) -> Pipeline:
+    """Volta ao analisador 'word' (mesmo vocabulário e tokens) no template e no TF-IDF ajustado."""
+    token_pattern = make_pipeline().get_params()["prep__text__tfidf__token_pattern"]
+    pipe.set_params(prep__text__tfidf__analyzer="word", prep__text__tfidf__token_pattern=token_pattern)
+    fitted = _fitted_tfidf(pipe.named_steps["prep"])
+    fitted.analyzer, fitted.token_pattern = "word", token_pattern
+    return pipe
+
+
+def fit_steps(X: pd.DataFrame, y: np.ndarray, analyzer: Optional[CachedAnalyzer] = None,
+              warm_from: Optional[Pipeline] = None) -> Tuple[Pipeline, Any]:
+    """
+    Ajusta make_pipeline() passo a passo -> (pipeline, matriz transformada de X), para que as
+    probabilidades de treino saiam da matriz já pronta em vez de transformar X de novo.
+    Com `analyzer`, o pipeline fica com ele até `release_analyzer`; com `warm_from`, a
+    LogisticRegression parte dos coeficientes daquele pipeline.
+    """
+    pipe = make_pipeline()
+    if analyzer is not None:
+        # token_pattern=None: com analisador callable ele não é usado (e o sklearn avisa a cada fit)
+        pipe.set_params(prep__text__tfidf__analyzer=analyzer, prep__text__tfidf__token_pattern=None)
+    prep, clf = pipe.named_steps["prep"], pipe.named_steps["clf"]
+    Xt = prep.fit_transform(X, y)
+    if warm_from is not None:
+        clf.set_params(warm_start=True)
+        clf.coef_, clf.intercept_ = warm_start_coef(warm_from, prep, Xt.shape[1])
+    clf.fit(Xt, y)
+    clf.set_params(warm_start=False)
+    return pipe, Xt
+
+
+def warm_start_coef(source: Pipeline, prep, n_features: int) -> Tuple[np.ndarray, np.ndarray]:
+    """Coeficientes de `source` nas colunas de `prep` (mesmo termo -> mesma coluna; termos novos = 0)."""
+    src_prep, src_clf = source.named_steps["prep"], source.named_steps["clf"]
+    coef = np.zeros((1, n_features))
+    src_text, dst_text = src_prep.output_indices_["text"], prep.output_indices_["text"]
+    dst_vocab = _fitted_tfidf(prep).vocabulary_
+    pairs = [(i, dst_vocab[t]) for t, i in _fitted_tfidf(src_prep).vocabulary_.items() if t in dst_vocab]
+    if pairs:
+        src_idx, dst_idx = np.array(pairs).T
+        coef[0, dst_text.start + dst_idx] = src_clf.coef_[0, src_text.start + src_idx]
+    coef[0, prep.output_indices_["score"]] = src_clf.coef_[0, src_prep.output_indices_["score"]]
+    return coef, src_clf.intercept_.copy()
+
+
+@contextmanager
+def _stage(timings: Dict[str, float], name: str):
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        timings[name] = time.perf_counter() - start
+
+
+# --------------------------------------------------------------------------------------
+# Main (com HOLDOUT + metrics.json)
+# --------------------------------------------------------------------------------------
+def parse_args():
+    p = argparse.ArgumentParser(description="Treino baseline (holdout 80/20 + re-treino em 100%).")
+    p.add_argument("--holdout-only", action="store_true",
+                   help=f"Só treina/avalia no holdout (sem re-treino nem artefatos); métricas em {METRICS_HOLDOUT_FILE.name}")
+    p.add_argument("--no-reuse", action="store_true",
+                   help="Re-treino do zero, sem reaproveitar tokenização nem coeficientes (para comparação)")
+    add_threshold_args(p)
+    return p.parse_args()
+
+
+def main():
+    args = parse_args()
+    thr_opts = threshold_options(args)
+    timings: Dict[str, float] = {}
+    t_total = time.perf_counter()
+
+    # Tabela de pares (cache por hash dos JSONs, ver src/dataset_builder.py)
+    from src.dataset_builder import load_pairs
+
+    with _stage(timings, "load_pairs"):
+        df, cache_info = load_pairs()
+    df = df.drop(columns=["y_status"])
+    if df.empty:
+        raise RuntimeError("Sem pares gerados. Verifique a estrutura dos JSONs.")
+
+    with _stage(timings, "labels"):
+        df = apply_labels(df)
 
     X_all = df[["job_text", "cand_text", "situacao_norm", "score_tecnico"]]
     y_all = df["y"].values
@@ -335,35 +371,51 @@ def main():
         X_all, y_all, test_size=0.20, stratify=y_all, random_state=42
     )
 
+    # Tokeniza o corpus uma vez (os dois fits e as predições usam o memo)
+    analyzer = None
+    if not args.no_reuse:
+        analyzer = CachedAnalyzer()
+        with _stage(timings, "tokenize"):
+            for doc in concat_cols_df(X_all):
+                analyzer(doc)
+
     # Treina no treino, escolhe threshold no treino
-    pipe = make_pipeline().fit(X_tr, y_tr)
-    proba_tr = pipe.predict_proba(X_tr)[:, 1]
-    thr_tr = choose_threshold(proba_tr, y_tr)
-
-    # Avalia na validação
-    proba_val = pipe.predict_proba(X_val)[:, 1]
-    yhat_val = (proba_val >= thr_tr).astype(int)
-
-    auc_val = float(roc_auc_score(y_val, proba_val))
-    acc_val = float(accuracy_score(y_val, yhat_val))
-    prec_val, rec_val, f1_val, _ = precision_recall_fscore_support(
-        y_val, yhat_val, average="binary", zero_division=0
-    )
-    f1_val = float(f1_val)
-    prec_val = float(prec_val)
-    rec_val = float(rec_val)
-
-    # Re-treina em 100% e escolhe threshold final
-    pipe_full = make_pipeline().fit(X_all, y_all)
-    proba_full = pipe_full.predict_proba(X_all)[:, 1]
-    thr_final = choose_threshold(proba_full, y_all)
-
-    # Salva artefatos
-    joblib.dump(pipe_full, MODELS_DIR / "model.joblib")
-    THRESHOLD_FILE.write_text(
-        json.dumps({"threshold": float(thr_final)}, ensure_ascii=False, indent=2),
-        encoding="utf-8",
-    )
+    with _stage(timings, "fit_holdout"):
+        pipe, Xt_tr = fit_steps(X_tr, y_tr, analyzer)
+    with _stage(timings, "evaluate_holdout"):
+        proba_tr = pipe.named_steps["clf"].predict_proba(Xt_tr)[:, 1]
+        thr_tr = choose_threshold(proba_tr, y_tr, **thr_opts)
+
+        # Avalia na validação
+        proba_val = pipe.predict_proba(X_val)[:, 1]
+        yhat_val = (proba_val >= thr_tr).astype(int)
+
+        auc_val = float(roc_auc_score(y_val, proba_val))
+        acc_val = float(accuracy_score(y_val, yhat_val))
+        prec_val, rec_val, f1_val, _ = precision_recall_fscore_support(
+            y_val, yhat_val, average="binary", zero_division=0
+        )
+        f1_val = float(f1_val)
+        prec_val = float(prec_val)
+        rec_val = float(rec_val)
+
+    thr_final = None
+    if not args.holdout_only:
+        # Re-treina em 100% (partindo dos coeficientes do holdout) e escolhe threshold final
+        with _stage(timings, "fit_full"):
+            pipe_full, Xt_all = fit_steps(X_all, y_all, analyzer, warm_from=None if args.no_reuse else pipe)
+        with _stage(timings, "threshold_full"):
+            proba_full = pipe_full.named_steps["clf"].predict_proba(Xt_all)[:, 1]
+            thr_final = choose_threshold(proba_full, y_all, **thr_opts)
+
+        # Salva artefatos
+        with _stage(timings, "save"):
+            joblib.dump(release_analyzer(pipe_full), MODELS_DIR / "model.joblib")
+            THRESHOLD_FILE.write_text(
+                json.dumps({"threshold": float(thr_final)}, ensure_ascii=False, indent=2),
+                encoding="utf-8",
+            )
+    timings["total"] = time.perf_counter() - t_total
 
     # Salva métricas de validação
     metrics = {
@@ -380,19 +432,32 @@ def main():
         "precision_val": prec_val,
         "recall_val": rec_val,
         "threshold_train": float(thr_tr),
-        "threshold_final": float(thr_final),
+        "threshold_final": None if thr_final is None else float(thr_final),
+        "threshold_objective": thr_opts,
+        "holdout_only": args.holdout_only,
+        "reuse": not args.no_reuse,
+        "n_iter": {"holdout": int(pipe.named_steps["clf"].n_iter_[0]),
+                   "full": None if args.holdout_only else int(pipe_full.named_steps["clf"].n_iter_[0])},
+        "timings": timings,
+        "dataset_cache": {k: cache_info.get(k) for k in ("hit", "key", "hash_seconds", "load_seconds", "build_seconds")},
     }
-    METRICS_FILE.write_text(json.dumps(metrics, ensure_ascii=False, indent=2), encoding="utf-8")
+    metrics_file = METRICS_HOLDOUT_FILE if args.holdout_only else METRICS_FILE
+    metrics_file.write_text(json.dumps(metrics, ensure_ascii=False, indent=2), encoding="utf-8")
 
     # Logs
     print(
         f"[VAL] n_total={len(df)} | n_tr={len(X_tr)} | n_val={len(X_val)} | "
         f"AUC_val={auc_val:.3f} | Acc_val={acc_val:.3f} | F1_val={f1_val:.3f} | "
-        f"Prec_val={prec_val:.3f} | Rec_val={rec_val:.3f} | thr_train={thr_tr:.3f} | thr_final={thr_final:.3f}"
+        f"Prec_val={prec_val:.3f} | Rec_val={rec_val:.3f} | thr_train={thr_tr:.3f}"
+        + ("" if thr_final is None else f" | thr_final={thr_final:.3f}")
     )
-    print(f"[OK] modelo salvo: {MODELS_DIR/'model.joblib'}")
-    print(f"[OK] threshold salvo: {THRESHOLD_FILE}")
-    print(f"[OK] métricas salvas: {METRICS_FILE}")
+    print("[INFO] tempos: " + " | ".join(f"{k}={v:.2f}s" for k, v in timings.items()))
+    if args.holdout_only:
+        print("[INFO] --holdout-only: modelo e threshold não foram salvos.")
+    else:
+        print(f"[OK] modelo salvo: {MODELS_DIR/'model.joblib'}")
+        print(f"[OK] threshold salvo: {THRESHOLD_FILE}")
+    print(f"[OK] métricas salvas: {metrics_file}")
 
 
 if __name__ == "__main__":
@@ -9,10 +9,16 @@ if str(ROOT) not in sys.path:
     sys.path.insert(0, str(ROOT))
 # -----------------------------------------------------------------------------
 
-from pathlib import Path
-from typing import Any, Dict, List
+import argparse
 import json
-
+import multiprocessing
+import os
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, List, Optional
+
+import joblib
 import numpy as np
 import pandas as pd
 
@@ -20,87 +26,26 @@ from sklearn.model_selection import StratifiedKFold
 from sklearn.metrics import (
     roc_auc_score,
     accuracy_score,
-    f1_score,
     precision_recall_fscore_support,
 )
 
-# Reaproveita utilitários e pipeline do treino baseline
+# Reaproveita pipeline do treino baseline e a tabela de pares compartilhada
 from src.train_baseline import (
-    find_file,
-    load_json,
-    first_key,
-    flatten_text_from_subdicts,
-    label_from_text,
-    score_tecnico,
     make_pipeline,
     choose_threshold,
-    JOB_SUBDICT_KEYS,
-    APPLICANT_SUBDICT_KEYS,
-    APPLICANT_CV_KEYS,
 )
+from src.dataset_builder import load_pairs
+from src.thresholds import add_threshold_args, threshold_options
 
 MODELS_DIR = ROOT / "models"
 MODELS_DIR.mkdir(parents=True, exist_ok=True)
 METRICS_CV_FILE = MODELS_DIR / "metrics_cv.json"
 
-# Ajuste para o seu formato (mesmo do baseline)
-CANDIDATE_KEY = ["codigo"]
-STATUS_KEYS = ["situacao_candidado", "situacao", "status"]
-COMMENT_KEYS = ["comentario"]
-
 
 def build_dataset() -> pd.DataFrame:
-    jobs = load_json(find_file("Jobs.json"))
-    prospects = load_json(find_file("Prospects.json"))
-    applicants = load_json(find_file("Applicants.json"))
-
-    rows: List[Dict[str, Any]] = []
-
-    for vaga_code, blob in prospects.items():
-        if not isinstance(blob, dict):
-            continue
-        plist = blob.get("prospects") or blob.get("prospeccoes") or []
-        if not isinstance(plist, list):
-            continue
-
-        job_obj = jobs.get(str(vaga_code), {}) if isinstance(jobs, dict) else {}
-        job_text = flatten_text_from_subdicts(job_obj, JOB_SUBDICT_KEYS)
-
-        for it in plist:
-            if not isinstance(it, dict):
-                continue
-
-            cand_key = first_key(it, CANDIDATE_KEY)
-            cand_code = str(it.get(cand_key)) if cand_key else ""
-
-            status_key = first_key(it, STATUS_KEYS)
-            raw_status = str(it.get(status_key) or "")
-            y = label_from_text(raw_status)
-            if y is None:
-                ckey = first_key(it, COMMENT_KEYS)
-                if ckey:
-                    y = label_from_text(str(it.get(ckey) or ""))
-
-            cand_obj = applicants.get(cand_code, {}) if isinstance(applicants, dict) else {}
-            cand_text = flatten_text_from_subdicts(
-                cand_obj, APPLICANT_SUBDICT_KEYS, APPLICANT_CV_KEYS
-            )
-
-            st = score_tecnico(job_text, cand_text)
-
-            rows.append(
-                {
-                    "vaga_code": str(vaga_code),
-                    "candidato_code": cand_code,
-                    "job_text": job_text,
-                    "cand_text": cand_text,
-                    "situacao_norm": raw_status,
-                    "score_tecnico": st,
-                    "y": y,
-                }
-            )
-
-    df = pd.DataFrame(rows)
+    # Tabela de pares (cache por hash dos JSONs, ver src/dataset_builder.py)
+    df, _ = load_pairs()
+    df = df.drop(columns=["y_status"])
     df = df.dropna(subset=["y"]).copy()
     df["y"] = df["y"].astype(int)
     df = df.drop_duplicates(subset=["vaga_code", "candidato_code"], keep="last")
@@ -109,44 +54,121 @@ def build_dataset() -> pd.DataFrame:
     return df
 
 
-def main():
-    df = build_dataset()
-    X = df[["job_text", "cand_text", "situacao_norm", "score_tecnico"]].reset_index(drop=True)
-    y = df["y"].values
+# --------------------------------------------------------------------------------------
+# Folds (serial ou num pool de processos)
+# --------------------------------------------------------------------------------------
+# Dados compartilhados com os workers: cada worker lê uma vez o arquivo temporário. Os
+# workers nascem por forkserver/spawn, nunca por fork do processo pai: fork depois de
+# numpy/BLAS/OpenMP já terem criado threads pode travar o filho.
+_shared: Dict[str, Any] = {}
+_limits: List[Any] = []
 
-    skf = StratifiedKFold(n_splits=5, shuffle=True, random_state=42)
 
-    aucs, accs, f1s, precs, recs = [], [], [], [], []
+def _init_worker(path: Optional[str]) -> None:
+    # um fold por processo: BLAS/OpenMP com 1 thread cada, sem disputar CPU entre workers
+    from threadpoolctl import threadpool_limits
 
-    for fold, (tr, te) in enumerate(skf.split(X, y), start=1):
-        X_tr, X_te = X.iloc[tr], X.iloc[te]
-        y_tr, y_te = y[tr], y[te]
+    _limits.append(threadpool_limits(limits=1))
+    if "X" not in _shared:
+        _shared["X"], _shared["y"] = joblib.load(path)
 
-        pipe = make_pipeline().fit(X_tr, y_tr)
 
-        # threshold escolhido no treino
-        proba_tr = pipe.predict_proba(X_tr)[:, 1]
-        thr = choose_threshold(proba_tr, y_tr)
+def resolve_n_jobs(n_jobs: int, n_splits: int) -> int:
+    """Nº de workers efetivo: -1 = todos os CPUs; sempre entre 1 e o nº de folds."""
+    return min(n_splits, os.cpu_count() or 1) if n_jobs < 0 else min(max(1, n_jobs), n_splits)
 
-        proba_te = pipe.predict_proba(X_te)[:, 1]
-        yhat_te = (proba_te >= thr).astype(int)
 
-        auc = float(roc_auc_score(y_te, proba_te))
-        acc = float(accuracy_score(y_te, yhat_te))
-        prec, rec, f1, _ = precision_recall_fscore_support(
-            y_te, yhat_te, average="binary", zero_division=0
-        )
-        aucs.append(auc)
-        accs.append(acc)
-        f1s.append(float(f1))
-        precs.append(float(prec))
-        recs.append(float(rec))
+def fit_fold(fold: int, tr: np.ndarray, te: np.ndarray,
+             threshold_opts: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """Treina e avalia um fold sobre os dados de `_shared`; só os índices trafegam entre processos."""
+    start = time.perf_counter()
+    X, y = _shared["X"], _shared["y"]
+    X_tr, X_te = X.iloc[tr], X.iloc[te]
+    y_tr, y_te = y[tr], y[te]
+
+    pipe = make_pipeline().fit(X_tr, y_tr)
+
+    # threshold escolhido no treino
+    proba_tr = pipe.predict_proba(X_tr)[:, 1]
+    thr = choose_threshold(proba_tr, y_tr, **(threshold_opts or {}))
 
+    proba_te = pipe.predict_proba(X_te)[:, 1]
+    yhat_te = (proba_te >= thr).astype(int)
+
+    prec, rec, f1, _ = precision_recall_fscore_support(
+        y_te, yhat_te, average="binary", zero_division=0
+    )
+    return {
+        "fold": fold,
+        "auc": float(roc_auc_score(y_te, proba_te)),
+        "accuracy": float(accuracy_score(y_te, yhat_te)),
+        "f1": float(f1),
+        "precision": float(prec),
+        "recall": float(rec),
+        "threshold": float(thr),
+        "seconds": time.perf_counter() - start,
+    }
+
+
+def run_cv(X: pd.DataFrame, y: np.ndarray, n_splits: int = 5, n_jobs: int = 1,
+           threshold_opts: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
+    """
+    -> resultados por fold, sempre na ordem dos folds (independe de qual worker termina antes).
+    `n_jobs`: 1 = serial, -1 = todos os CPUs (limitado ao nº de folds).
+    """
+    skf = StratifiedKFold(n_splits=n_splits, shuffle=True, random_state=42)
+    splits = list(enumerate(skf.split(X, y), start=1))
+    n_jobs = resolve_n_jobs(n_jobs, n_splits)
+
+    _shared["X"], _shared["y"] = X, y
+    try:
+        if n_jobs == 1:
+            return [fit_fold(fold, tr, te, threshold_opts) for fold, (tr, te) in splits]
+
+        methods = multiprocessing.get_all_start_methods()
+        ctx = multiprocessing.get_context("forkserver" if "forkserver" in methods else "spawn")
+        with tempfile.TemporaryDirectory() as tmp:
+            path = str(Path(tmp) / "cv_data.joblib")
+            joblib.dump((X, y), path)
+            with ProcessPoolExecutor(max_workers=n_jobs, mp_context=ctx,
+                                     initializer=_init_worker, initargs=(path,)) as pool:
+                futures = [pool.submit(fit_fold, fold, tr, te, threshold_opts) for fold, (tr, te) in splits]
+                return [f.result() for f in futures]
+    finally:
+        _shared.clear()
+
+
+def parse_args():
+    p = argparse.ArgumentParser(description="Validação cruzada estratificada (5 folds) do pipeline baseline.")
+    p.add_argument("--n-jobs", type=int, default=1,
+                   help="Folds em paralelo (1 = serial, -1 = todos os CPUs; default=1)")
+    add_threshold_args(p)
+    return p.parse_args()
+
+
+def main():
+    args = parse_args()
+    df = build_dataset()
+    X = df[["job_text", "cand_text", "situacao_norm", "score_tecnico"]].reset_index(drop=True)
+    y = df["y"].values
+
+    start = time.perf_counter()
+    thr_opts = threshold_options(args)
+    n_jobs = resolve_n_jobs(args.n_jobs, 5)
+    folds = run_cv(X, y, n_splits=5, n_jobs=n_jobs, threshold_opts=thr_opts)
+    wall = time.perf_counter() - start
+
+    for r in folds:
         print(
-            f"[CV fold {fold}] AUC={auc:.3f} | Acc={acc:.3f} | F1={f1:.3f} | "
-            f"Prec={prec:.3f} | Rec={rec:.3f} | thr={thr:.3f}"
+            f"[CV fold {r['fold']}] AUC={r['auc']:.3f} | Acc={r['accuracy']:.3f} | F1={r['f1']:.3f} | "
+            f"Prec={r['precision']:.3f} | Rec={r['recall']:.3f} | thr={r['threshold']:.3f} | {r['seconds']:.1f}s"
         )
 
+    def col(k: str) -> List[float]:
+        return [r[k] for r in folds]
+
+    aucs, accs, f1s, precs, recs = col("auc"), col("accuracy"), col("f1"), col("precision"), col("recall")
+
     metrics_cv = {
         "n_total": int(len(df)),
         "n_splits": 5,
@@ -161,11 +183,18 @@ def main():
         "precision_std": float(np.std(precs, ddof=1)),
         "recall_mean": float(np.mean(recs)),
         "recall_std": float(np.std(recs, ddof=1)),
+        "threshold_objective": thr_opts,
+        "timings": {
+            "n_jobs": n_jobs,
+            "wall_seconds": wall,
+            "fold_seconds": col("seconds"),
+        },
     }
 
     METRICS_CV_FILE.write_text(
         json.dumps(metrics_cv, ensure_ascii=False, indent=2), encoding="utf-8"
     )
+    print(f"[OK] CV em {wall:.1f}s (n_jobs={n_jobs}; soma dos folds={sum(col('seconds')):.1f}s)")
     print(f"[OK] métricas CV salvas em {METRICS_CV_FILE}")
 
 
@@ -0,0 +1,362 @@
+# src/train_streaming.py
+# -*- coding: utf-8 -*-
+"""
+Treino out-of-core: alternativa ao train_baseline.py para quando a tabela de pares não
+cabe em memória.
+
+Em vez de materializar todos os textos num DataFrame e ajustar um TF-IDF com vocabulário
+ilimitado, lê a tabela de pares do cache (src/dataset_builder.py) em blocos de
+`--chunk-rows` linhas, projeta o texto num espaço de largura fixa (HashingVectorizer, sem
+vocabulário) e treina uma regressão logística por SGD (`partial_fit`) ao longo de
+`--epochs` passadas. A memória fica limitada pelo bloco corrente + alguns bytes por linha
+(rótulo, score e hash da chave vaga-candidato, usados para repetir as regras do baseline).
+Com o cache frio, o rebuild da tabela também é em stream (ver `dataset_builder.pairs_table`),
+mas mantém em memória o texto achatado de cada candidato e vaga.
+
+Mesmas regras do baseline: weak labels pelos percentis do score_tecnico, dedupe
+vaga-candidato (fica a última), holdout estratificado 80/20 com random_state=42 (a mesma
+partição do baseline), threshold escolhido no treino e re-treino em 100% para o artefato.
+
+O artefato é um Pipeline sklearn com as mesmas colunas de entrada de `make_pipeline()`:
+a API pode servi-lo como qualquer model.joblib.
+
+Uso:
+    python src/train_streaming.py
+    python src/train_streaming.py --chunk-rows 20000 --epochs 8 --n-features 262144
+    python src/train_streaming.py --compare-baseline   # treina também o baseline (em memória) para comparar
+
+Saída:
+- models/model_streaming.joblib e models/decision_threshold_streaming.json (não substituem o
+  modelo servido; para servi-lo, copie-os para models/model.joblib e decision_threshold.json)
+- models/metrics_stream.json: métricas de validação, throughput, pico de RSS e, com
+  --compare-baseline, as mesmas medidas do pipeline TF-IDF + LogisticRegression
+"""
+
+from __future__ import annotations
+
+# --- garante o pacote top-level 'src' no sys.path quando rodar como script ---
+import sys
+from pathlib import Path
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+# -----------------------------------------------------------------------------
+
+import argparse
+import json
+import time
+from datetime import datetime
+from typing import Any, Dict, Iterator, Optional, Tuple
+
+import joblib
+import numpy as np
+import pandas as pd
+from sklearn.compose import ColumnTransformer
+from sklearn.feature_extraction.text import HashingVectorizer
+from sklearn.linear_model import SGDClassifier
+from sklearn.metrics import accuracy_score, precision_recall_fscore_support, roc_auc_score
+from sklearn.model_selection import train_test_split
+from sklearn.pipeline import Pipeline
+from sklearn.preprocessing import FunctionTransformer, StandardScaler
+
+from src.dataset_builder import DATASET_CACHE_DIR, iter_pair_chunks, load_pairs, pairs_table  # noqa: E402
+from src.load_jsons import peak_rss_mb  # noqa: E402
+from src.thresholds import add_threshold_args, threshold_options  # noqa: E402
+from src.train_baseline import (  # noqa: E402
+    MODELS_DIR,
+    PCTL_NEG,
+    PCTL_POS,
+    choose_threshold,
+    concat_cols_df,
+    make_pipeline,
+    select_score_df,
+)
+
+FEATURE_COLS = ["job_text", "cand_text", "situacao_norm", "score_tecnico"]
+METRICS_STREAM_FILE = MODELS_DIR / "metrics_stream.json"
+MODEL_STREAM_FILE = MODELS_DIR / "model_streaming.joblib"
+THRESHOLD_STREAM_FILE = MODELS_DIR / "decision_threshold_streaming.json"
+
+DEFAULT_CHUNK_ROWS = 50_000
+DEFAULT_EPOCHS = 5
+DEFAULT_N_FEATURES = 2 ** 20
+DEFAULT_ALPHA = 1e-6
+
+
+# --------------------------------------------------------------------------------------
+# Pipeline (mesma estrutura de make_pipeline, com hashing + SGD)
+# --------------------------------------------------------------------------------------
+def make_streaming_pipeline(n_features: int = DEFAULT_N_FEATURES, alpha: float = DEFAULT_ALPHA,
+                            random_state: int = 42) -> Pipeline:
+    col = ColumnTransformer(
+        [
+            (
+                "text",
+                Pipeline(
+                    [
+                        ("concat", FunctionTransformer(concat_cols_df, validate=False)),
+                        # sem estado: não precisa ver o corpus para transformar
+                        ("hash", HashingVectorizer(n_features=n_features, alternate_sign=False)),
+                    ]
+                ),
+                FEATURE_COLS,
+            ),
+            (
+                "score",
+                Pipeline(
+                    [
+                        ("sel", FunctionTransformer(select_score_df, validate=False)),
+                        ("scaler", StandardScaler(with_mean=False)),
+                    ]
+                ),
+                ["score_tecnico"],
+            ),
+        ],
+        remainder="drop",
+        verbose_feature_names_out=False,
+    )
+    return Pipeline(
+        [
+            ("prep", col),
+            ("clf", SGDClassifier(loss="log_loss", alpha=alpha, average=True, random_state=random_state)),
+        ]
+    )
+
+
+# --------------------------------------------------------------------------------------
+# Rótulos e holdout (as regras de train_baseline.main, sem carregar os textos)
+# --------------------------------------------------------------------------------------
+def plan_labels(table: Path, chunk_rows: int = DEFAULT_CHUNK_ROWS) -> np.ndarray:
+    """
+    -> rótulo final por linha da tabela (0/1; -1 = fora do treino). Uma passada só pelas
+    colunas leves: y, score_tecnico e o hash de (vaga_code, candidato_code).
+    """
+    ys, scores, keys = [], [], []
+    for chunk in iter_pair_chunks(table, chunk_rows, ["vaga_code", "candidato_code", "score_tecnico", "y"]):
+        ys.append(chunk["y"].to_numpy(dtype=float, na_value=np.nan))
+        scores.append(chunk["score_tecnico"].to_numpy(dtype=float))
+        keys.append(pd.util.hash_pandas_object(chunk[["vaga_code", "candidato_code"]], index=False).to_numpy())
+    if not ys:
+        return np.zeros(0, dtype=np.int8)
+    y, score, key = np.concatenate(ys), np.concatenate(scores), np.concatenate(keys)
+
+    # Weak labels pelos extremos do score_tecnico
+    unlabeled = np.isnan(y)
+    if unlabeled.sum() >= 10:
+        t_pos = float(np.nanpercentile(score[unlabeled], PCTL_POS * 100))
+        t_neg = float(np.nanpercentile(score[unlabeled], PCTL_NEG * 100))
+        y[unlabeled & (score >= t_pos)] = 1
+        y[unlabeled & (score <= t_neg)] = 0
+
+    # dropna + dedupe vaga-candidato (fica a última ocorrência)
+    keep = ~np.isnan(y)
+    idx = np.flatnonzero(keep)
+    keep[idx[pd.Series(key[idx]).duplicated(keep="last").to_numpy()]] = False
+
+    labels = np.full(len(y), -1, dtype=np.int8)
+    labels[keep] = y[keep].astype(np.int8)
+    return labels
+
+
+def holdout_mask(labels: np.ndarray, test_size: float = 0.20, random_state: int = 42) -> np.ndarray:
+    """Linhas de validação: a mesma partição de `train_test_split` no baseline (mesma ordem e rótulos)."""
+    rows = np.flatnonzero(labels >= 0)
+    _, val = train_test_split(rows, test_size=test_size, stratify=labels[rows], random_state=random_state)
+    mask = np.zeros(len(labels), dtype=bool)
+    mask[val] = True
+    return mask
+
+
+# --------------------------------------------------------------------------------------
+# Treino / predição em blocos
+# --------------------------------------------------------------------------------------
+def iter_xy(table: Path, labels: np.ndarray, select: np.ndarray, chunk_rows: int,
+            rng: Optional[np.random.Generator] = None) -> Iterator[Tuple[pd.DataFrame, np.ndarray]]:
+    """(X, y) de cada bloco, só com as linhas rotuladas de `select`; embaralha dentro do bloco com `rng`."""
+    for chunk in iter_pair_chunks(table, chunk_rows, FEATURE_COLS):
+        pos = chunk.index.to_numpy()
+        pos = pos[select[pos] & (labels[pos] >= 0)]
+        if rng is not None:
+            rng.shuffle(pos)
+        if len(pos):
+            yield chunk.loc[pos], labels[pos].astype(int)
+
+
+def fit_score_scaler(table: Path, labels: np.ndarray, select: np.ndarray,
+                     chunk_rows: int = DEFAULT_CHUNK_ROWS) -> Optional[StandardScaler]:
+    """Scaler do ramo "score" com `partial_fit` em cada bloco (None se nenhuma linha for selecionada)."""
+    scaler = StandardScaler(with_mean=False)  # o mesmo de make_streaming_pipeline
+    seen = False
+    for chunk in iter_pair_chunks(table, chunk_rows, ["score_tecnico"]):
+        pos = chunk.index.to_numpy()
+        pos = pos[select[pos] & (labels[pos] >= 0)]
+        if len(pos):
+            scaler.partial_fit(select_score_df(chunk.loc[pos]))
+            seen = True
+    return scaler if seen else None
+
+
+def fit_streaming(table: Path, labels: np.ndarray, select: np.ndarray, epochs: int = DEFAULT_EPOCHS,
+                  chunk_rows: int = DEFAULT_CHUNK_ROWS, n_features: int = DEFAULT_N_FEATURES,
+                  alpha: float = DEFAULT_ALPHA, random_state: int = 42) -> Tuple[Pipeline, Dict[str, Any]]:
+    """
+    `partial_fit` bloco a bloco por `epochs` passadas. O ramo de texto não tem estado; o
+    scaler do score_tecnico passa antes por todos os blocos (`partial_fit`, só a coluna do
+    score), para o SGD ver a mesma escala desde o primeiro bloco.
+    """
+    pipe = make_streaming_pipeline(n_features, alpha, random_state)
+    prep, clf = pipe.named_steps["prep"], pipe.named_steps["clf"]
+    start = time.perf_counter()
+    scaler = fit_score_scaler(table, labels, select, chunk_rows)
+    if scaler is None:
+        raise RuntimeError("Nenhuma linha rotulada para treinar.")
+
+    rng = np.random.default_rng(random_state)
+    fitted, rows = False, 0
+    for _ in range(epochs):
+        for X, y in iter_xy(table, labels, select, chunk_rows, rng):
+            if not fitted:
+                # inicializa o ColumnTransformer e troca o scaler pelo ajustado em todos os blocos
+                prep.fit(X)
+                prep.named_transformers_["score"].steps[-1] = ("scaler", scaler)
+                fitted = True
+            clf.partial_fit(prep.transform(X), y, classes=np.array([0, 1]))
+            rows += len(y)
+    seconds = time.perf_counter() - start
+    return pipe, {"rows_seen": rows, "seconds": seconds, "rows_per_second": rows / seconds if seconds else None}
+
+
+def predict_streaming(pipe: Pipeline, table: Path, labels: np.ndarray,
+                      chunk_rows: int = DEFAULT_CHUNK_ROWS) -> np.ndarray:
+    """Probabilidade da classe 1 por linha da tabela (NaN nas linhas fora do treino)."""
+    proba = np.full(len(labels), np.nan)
+    for X, _ in iter_xy(table, labels, np.ones(len(labels), dtype=bool), chunk_rows):
+        proba[X.index.to_numpy()] = pipe.predict_proba(X)[:, 1]
+    return proba
+
+
+def evaluate(proba: np.ndarray, y: np.ndarray, thr: float) -> Dict[str, float]:
+    yhat = (proba >= thr).astype(int)
+    prec, rec, f1, _ = precision_recall_fscore_support(y, yhat, average="binary", zero_division=0)
+    return {
+        "auc_val": float(roc_auc_score(y, proba)),
+        "accuracy_val": float(accuracy_score(y, yhat)),
+        "f1_val": float(f1),
+        "precision_val": float(prec),
+        "recall_val": float(rec),
+    }
+
+
+def compare_baseline(labels: np.ndarray, is_val: np.ndarray) -> Dict[str, Any]:
+    """Treina make_pipeline() em memória na mesma partição, para comparar AUC e throughput."""
+    df, _ = load_pairs(verbose=False)
+    X = df[FEATURE_COLS]
+    tr, val = (labels >= 0) & ~is_val, is_val
+    start = time.perf_counter()
+    pipe = make_pipeline().fit(X[tr], labels[tr])
+    seconds = time.perf_counter() - start
+    proba_val = pipe.predict_proba(X[val])[:, 1]
+    return {
+        "auc_val": float(roc_auc_score(labels[val], proba_val)),
+        "fit_seconds": seconds,
+        "rows_per_second": int(tr.sum()) / seconds if seconds else None,
+        "n_features": int(len(pipe.named_steps["prep"].named_transformers_["text"].named_steps["tfidf"].vocabulary_)) + 1,
+    }
+
+
+# --------------------------------------------------------------------------------------
+# Main
+# --------------------------------------------------------------------------------------
+def parse_args():
+    p = argparse.ArgumentParser(description="Treino out-of-core (hashing + SGD) sobre a tabela de pares em blocos.")
+    p.add_argument("--chunk-rows", type=int, default=DEFAULT_CHUNK_ROWS, help=f"Linhas por bloco (default={DEFAULT_CHUNK_ROWS})")
+    p.add_argument("--epochs", type=int, default=DEFAULT_EPOCHS, help=f"Passadas sobre os dados (default={DEFAULT_EPOCHS})")
+    p.add_argument("--n-features", type=int, default=DEFAULT_N_FEATURES, help=f"Largura do hashing (default={DEFAULT_N_FEATURES})")
+    p.add_argument("--alpha", type=float, default=DEFAULT_ALPHA, help=f"Regularização L2 do SGD (default={DEFAULT_ALPHA})")
+    p.add_argument("--cache-dir", type=Path, default=DATASET_CACHE_DIR, help=f"Cache da tabela de pares (default={DATASET_CACHE_DIR})")
+    p.add_argument("--out", type=Path, default=MODEL_STREAM_FILE, help=f"Artefato do modelo (default={MODEL_STREAM_FILE})")
+    p.add_argument("--threshold-out", type=Path, default=THRESHOLD_STREAM_FILE,
+                   help=f"Threshold final (default={THRESHOLD_STREAM_FILE})")
+    p.add_argument("--compare-baseline", action="store_true", help="Treina também o baseline em memória e compara AUC/throughput")
+    add_threshold_args(p)
+    return p.parse_args()
+
+
+def main():
+    args = parse_args()
+    table, cache_info = pairs_table(cache_dir=args.cache_dir)
+    kw = dict(epochs=args.epochs, chunk_rows=args.chunk_rows, n_features=args.n_features, alpha=args.alpha)
+
+    labels = plan_labels(table, args.chunk_rows)
+    labeled = labels >= 0
+    if labeled.sum() == 0 or len(np.unique(labels[labeled])) < 2:
+        raise RuntimeError(
+            "Após rotulagem, só há uma classe. Ajuste POS_KEYS/NEG_KEYS ou os percentis PCTL_POS/PCTL_NEG."
+        )
+    is_val = holdout_mask(labels)
+    is_tr = labeled & ~is_val
+
+    # Holdout: treina no treino, threshold no treino, avalia na validação
+    pipe, train_stats = fit_streaming(table, labels, is_tr, **kw)
+    proba = predict_streaming(pipe, table, labels, args.chunk_rows)
+    thr_opts = threshold_options(args)
+    thr_tr = choose_threshold(proba[is_tr], labels[is_tr], **thr_opts)
+    metrics_val = evaluate(proba[is_val], labels[is_val], thr_tr)
+
+    # Re-treina em 100% e escolhe o threshold final
+    pipe_full, full_stats = fit_streaming(table, labels, labeled, **kw)
+    proba_full = predict_streaming(pipe_full, table, labels, args.chunk_rows)
+    thr_final = choose_threshold(proba_full[labeled], labels[labeled], **thr_opts)
+    peak_rss = peak_rss_mb()
+
+    args.out.parent.mkdir(parents=True, exist_ok=True)
+    joblib.dump(pipe_full, args.out)
+    args.threshold_out.write_text(json.dumps({"threshold": float(thr_final)}, ensure_ascii=False, indent=2), encoding="utf-8")
+
+    y_all = labels[labeled]
+    metrics = {
+        "timestamp": datetime.utcnow().isoformat() + "Z",
+        "mode": "stream",
+        "n_total": int(labeled.sum()),
+        "n_train": int(is_tr.sum()),
+        "n_val": int(is_val.sum()),
+        "pos_rate_total": float(y_all.mean()),
+        "pos_rate_train": float(labels[is_tr].mean()),
+        "pos_rate_val": float(labels[is_val].mean()),
+        **metrics_val,
+        "threshold_train": float(thr_tr),
+        "threshold_final": float(thr_final),
+        "threshold_objective": thr_opts,
+        "params": kw,
+        "train": train_stats,
+        "train_full": full_stats,
+        "peak_rss_mb": peak_rss,
+        "dataset_cache": {k: cache_info.get(k) for k in ("hit", "key", "hash_seconds", "build_seconds")},
+    }
+    print(
+        f"[VAL] n_total={metrics['n_total']} | n_tr={metrics['n_train']} | n_val={metrics['n_val']} | "
+        f"AUC_val={metrics['auc_val']:.3f} | Acc_val={metrics['accuracy_val']:.3f} | F1_val={metrics['f1_val']:.3f} | "
+        f"thr_train={thr_tr:.3f} | thr_final={thr_final:.3f}"
+    )
+    print(
+        f"[INFO] stream: {train_stats['rows_seen']} linhas×época em {train_stats['seconds']:.1f}s "
+        f"({train_stats['rows_per_second']:.0f} linhas/s) | pico de RSS: {peak_rss or 0:.0f} MB"
+    )
+
+    if args.compare_baseline:
+        base = compare_baseline(labels, is_val)
+        metrics["baseline"] = base
+        print(
+            f"[INFO] baseline (TF-IDF + LogisticRegression, em memória): AUC_val={base['auc_val']:.3f} | "
+            f"fit {base['fit_seconds']:.1f}s ({base['rows_per_second']:.0f} linhas/s) | "
+            f"{base['n_features']} features vs {args.n_features} no hashing"
+        )
+
+    METRICS_STREAM_FILE.write_text(json.dumps(metrics, ensure_ascii=False, indent=2), encoding="utf-8")
+    print(f"[OK] modelo salvo: {args.out}")
+    print(f"[OK] threshold salvo: {args.threshold_out}")
+    print(f"[OK] métricas salvas: {METRICS_STREAM_FILE}")
+
+
+if __name__ == "__main__":
+    main()
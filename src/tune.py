@@ -0,0 +1,282 @@
+# src/tune.py
+# -*- coding: utf-8 -*-
+"""
+Ajuste de hiperparâmetros do pipeline de `make_pipeline()` (TF-IDF + LogisticRegression)
+por successive halving, com cache das saídas do transformador.
+
+Grid search ingênuo re-tokeniza o corpus inteiro a cada configuração, mesmo quando só `C`
+muda. Aqui a saída do passo `prep` (ColumnTransformer: TF-IDF + scaler do score) é
+guardada em disco com joblib.Memory, com chave = hash dos dados + parâmetros do
+transformador: configurações que diferem só no classificador reaproveitam a matriz já
+vetorizada. É o mesmo mecanismo do `Pipeline(memory=...)`, com a chave explícita (o hash
+das linhas vem uma vez por rodada, não a cada fit) e contagem de hits/misses.
+
+Successive halving: todas as configurações começam com poucas linhas de treino; a cada
+rodada, só a fração 1/eta melhor (AUC na validação) segue, com eta vezes mais linhas.
+Dataset e validação são os do baseline: mesmos rótulos (`train_baseline.apply_labels`:
+weak labels pelo score_tecnico + dedupe) e mesmo holdout estratificado 80/20
+(random_state=42).
+
+Uso:
+    python src/tune.py
+    python src/tune.py --min-rows 2000 --eta 3 --grid grid.json   # grid: {"param": [valores], ...}
+    python src/tune.py --no-cache                                  # mesma busca, sem cache (comparação)
+
+Saída:
+- models/tuning_results.json: tempo e AUC por configuração/rodada, hit rate do cache e
+  a melhor configuração (parâmetros no formato de `make_pipeline().set_params(...)`)
+"""
+
+from __future__ import annotations
+
+# --- garante o pacote top-level 'src' no sys.path quando rodar como script ---
+import sys
+from pathlib import Path
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+# -----------------------------------------------------------------------------
+
+import argparse
+import hashlib
+import itertools
+import json
+import math
+import shutil
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+import joblib
+import numpy as np
+import pandas as pd
+from sklearn.metrics import roc_auc_score
+from sklearn.model_selection import train_test_split
+
+from src.dataset_builder import DATASET_CACHE_DIR, load_pairs  # noqa: E402
+from src.train_baseline import MODELS_DIR, apply_labels, make_pipeline  # noqa: E402
+
+FEATURE_COLS = ["job_text", "cand_text", "situacao_norm", "score_tecnico"]
+TUNING_CACHE_DIR = DATASET_CACHE_DIR / "tuning"
+TUNING_RESULTS_FILE = MODELS_DIR / "tuning_results.json"
+
+DEFAULT_GRID: Dict[str, List[Any]] = {
+    "prep__text__tfidf__ngram_range": [(1, 1), (1, 2)],
+    "prep__text__tfidf__min_df": [1, 3],
+    "prep__text__tfidf__sublinear_tf": [False, True],
+    "clf__C": [0.1, 1.0, 10.0],
+}
+
+
+# --------------------------------------------------------------------------------------
+# Dados
+# --------------------------------------------------------------------------------------
+def build_dataset() -> pd.DataFrame:
+    """A tabela de pares com os rótulos de train_baseline.py (o modelo servido)."""
+    df, _ = load_pairs()
+    if df.empty:
+        raise RuntimeError("Sem pares gerados. Verifique a estrutura dos JSONs.")
+    return apply_labels(df.drop(columns=["y_status"]))
+
+
+# --------------------------------------------------------------------------------------
+# Configurações
+# --------------------------------------------------------------------------------------
+def expand_grid(grid: Dict[str, List[Any]]) -> List[Dict[str, Any]]:
+    keys = sorted(grid)
+    return [dict(zip(keys, values)) for values in itertools.product(*(grid[k] for k in keys))]
+
+
+def split_params(params: Dict[str, Any]) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+    """-> (parâmetros do transformador `prep`, parâmetros do classificador `clf`)."""
+    prep = {k: v for k, v in params.items() if not k.startswith("clf__")}
+    clf = {k: v for k, v in params.items() if k.startswith("clf__")}
+    return prep, clf
+
+
+def data_digest(X: pd.DataFrame, y: np.ndarray) -> str:
+    h = hashlib.sha256(pd.util.hash_pandas_object(X, index=False).to_numpy().tobytes())
+    h.update(np.asarray(y).tobytes())
+    return h.hexdigest()[:16]
+
+
+# --------------------------------------------------------------------------------------
+# Cache das saídas do transformador
+# --------------------------------------------------------------------------------------
+def _fit_transform_prep(prep_params: Dict[str, Any], data_key: str, X_tr: pd.DataFrame,
+                        y_tr: np.ndarray, X_val: pd.DataFrame):
+    """Ajusta o passo `prep` de make_pipeline() com `prep_params` -> (Xt_treino, Xt_validação)."""
+    prep = make_pipeline().set_params(**prep_params).named_steps["prep"]
+    return prep.fit_transform(X_tr, y_tr), prep.transform(X_val)
+
+
+class TransformCache:
+    """
+    joblib.Memory sobre `_fit_transform_prep`: os DataFrames ficam fora do hash (ignore) e
+    a chave é (parâmetros do transformador, `data_key`). `location=None` desliga o cache.
+    """
+
+    def __init__(self, location: Optional[Path]):
+        self.memory = joblib.Memory(str(location) if location else None, verbose=0)
+        self.func = self.memory.cache(_fit_transform_prep, ignore=["X_tr", "y_tr", "X_val"])
+        self.hits = 0
+        self.misses = 0
+
+    def transform(self, prep_params: Dict[str, Any], data_key: str, X_tr: pd.DataFrame,
+                  y_tr: np.ndarray, X_val: pd.DataFrame) -> Tuple[Any, Any, bool]:
+        """-> (Xt_treino, Xt_validação, hit)."""
+        hit = self.memory.location is not None and self.func.check_call_in_cache(
+            prep_params, data_key, X_tr, y_tr, X_val
+        )
+        self.hits += int(hit)
+        self.misses += int(not hit)
+        Xt_tr, Xt_val = self.func(prep_params, data_key, X_tr, y_tr, X_val)
+        return Xt_tr, Xt_val, hit
+
+    def stats(self) -> Dict[str, Any]:
+        total = self.hits + self.misses
+        return {"hits": self.hits, "misses": self.misses, "hit_rate": self.hits / total if total else None}
+
+
+# --------------------------------------------------------------------------------------
+# Successive halving
+# --------------------------------------------------------------------------------------
+def evaluate_config(params: Dict[str, Any], cache: TransformCache, data_key: str, X_tr: pd.DataFrame,
+                    y_tr: np.ndarray, X_val: pd.DataFrame, y_val: np.ndarray) -> Dict[str, Any]:
+    prep_params, clf_params = split_params(params)
+    start = time.perf_counter()
+    Xt_tr, Xt_val, hit = cache.transform(prep_params, data_key, X_tr, y_tr, X_val)
+    transform_seconds = time.perf_counter() - start
+
+    clf = make_pipeline().set_params(**clf_params).named_steps["clf"]
+    clf.fit(Xt_tr, y_tr)
+    auc = float(roc_auc_score(y_val, clf.predict_proba(Xt_val)[:, 1]))
+    return {
+        "params": params,
+        "auc_val": auc,
+        "cache_hit": bool(hit),
+        "transform_seconds": transform_seconds,
+        "seconds": time.perf_counter() - start,
+    }
+
+
+def successive_halving(configs: List[Dict[str, Any]], X_tr: pd.DataFrame, y_tr: np.ndarray,
+                       X_val: pd.DataFrame, y_val: np.ndarray, cache: TransformCache,
+                       min_rows: int = 5000, eta: int = 3, verbose: bool = True) -> List[Dict[str, Any]]:
+    """
+    -> resultados de todas as rodadas (um dict por configuração avaliada). As linhas de
+    treino da rodada r são as primeiras min_rows * eta**r de uma permutação estratificada
+    fixa (rodadas maiores contêm as menores); a última usa todas.
+    """
+    order = _stratified_order(y_tr)
+    val_key = data_digest(X_val, y_val)  # a saída em cache inclui a validação transformada
+    results: List[Dict[str, Any]] = []
+    alive = list(configs)
+    for rung in itertools.count():
+        n_rows = min_rows * eta ** rung
+        if n_rows * eta > len(order):  # a próxima rodada passaria do total: esta já usa tudo
+            n_rows = len(order)
+        rows = np.sort(order[:n_rows])
+        X_sub, y_sub = X_tr.iloc[rows], y_tr[rows]
+        data_key = f"{data_digest(X_sub, y_sub)}-{val_key}"
+
+        scored = []
+        for params in alive:
+            r = evaluate_config(params, cache, data_key, X_sub, y_sub, X_val, y_val)
+            r.update(rung=rung, n_rows=int(n_rows))
+            results.append(r)
+            scored.append(r)
+        if verbose:
+            best = max(scored, key=lambda r: r["auc_val"])
+            print(
+                f"[RUNG {rung}] {len(alive)} configs × {n_rows} linhas | melhor AUC={best['auc_val']:.4f} | "
+                f"{sum(r['seconds'] for r in scored):.1f}s | hits {sum(r['cache_hit'] for r in scored)}/{len(scored)}"
+            )
+
+        if len(alive) == 1 or n_rows == len(order):
+            break
+        keep = max(1, math.ceil(len(alive) / eta))
+        # ordenação estável: empate em AUC preserva a ordem do grid
+        alive = [r["params"] for r in sorted(scored, key=lambda r: -r["auc_val"])[:keep]]
+    return results
+
+
+def _stratified_order(y: np.ndarray, random_state: int = 42) -> np.ndarray:
+    """Permutação em que qualquer prefixo mantém a proporção de classes (intercalando as classes)."""
+    rng = np.random.default_rng(random_state)
+    idx = [rng.permutation(np.flatnonzero(y == c)) for c in np.unique(y)]
+    rank = np.concatenate([(np.arange(len(i)) + 0.5) / len(i) for i in idx])
+    return np.concatenate(idx)[np.argsort(rank, kind="stable")]
+
+
+# --------------------------------------------------------------------------------------
+# Main
+# --------------------------------------------------------------------------------------
+def _jsonable(params: Dict[str, Any]) -> Dict[str, Any]:
+    return {k: list(v) if isinstance(v, tuple) else v for k, v in params.items()}
+
+
+def load_grid(path: Optional[Path]) -> Dict[str, List[Any]]:
+    if path is None:
+        return DEFAULT_GRID
+    grid = json.loads(Path(path).read_text(encoding="utf-8"))
+    # JSON não tem tupla: ngram_range etc. chegam como listas
+    return {k: [tuple(v) if isinstance(v, list) else v for v in values] for k, values in grid.items()}
+
+
+def parse_args():
+    p = argparse.ArgumentParser(description="Successive halving sobre make_pipeline() com cache do TF-IDF.")
+    p.add_argument("--grid", type=Path, default=None, help="JSON {param: [valores]} (default: DEFAULT_GRID)")
+    p.add_argument("--min-rows", type=int, default=5000, help="Linhas de treino na 1ª rodada (default=5000)")
+    p.add_argument("--eta", type=int, default=3, help="Fator de corte/crescimento por rodada (default=3)")
+    p.add_argument("--cache-dir", type=Path, default=TUNING_CACHE_DIR, help=f"Cache do transformador (default={TUNING_CACHE_DIR})")
+    p.add_argument("--no-cache", action="store_true", help="Desliga o cache (para comparação)")
+    p.add_argument("--clear-cache", action="store_true", help="Apaga o cache antes de começar")
+    p.add_argument("--out", type=Path, default=TUNING_RESULTS_FILE, help=f"Resultados (default={TUNING_RESULTS_FILE})")
+    return p.parse_args()
+
+
+def main():
+    args = parse_args()
+    if args.clear_cache:
+        shutil.rmtree(args.cache_dir, ignore_errors=True)
+
+    df = build_dataset()
+    X = df[FEATURE_COLS].reset_index(drop=True)
+    y = df["y"].values
+    X_tr, X_val, y_tr, y_val = train_test_split(X, y, test_size=0.20, stratify=y, random_state=42)
+
+    configs = expand_grid(load_grid(args.grid))
+    cache = TransformCache(None if args.no_cache else args.cache_dir)
+    print(f"[INFO] {len(configs)} configurações | treino={len(X_tr)} | validação={len(X_val)} | eta={args.eta}")
+
+    start = time.perf_counter()
+    results = successive_halving(configs, X_tr, y_tr, X_val, y_val, cache, args.min_rows, args.eta)
+    wall = time.perf_counter() - start
+
+    last_rung = max(r["rung"] for r in results)
+    best = max((r for r in results if r["rung"] == last_rung), key=lambda r: r["auc_val"])
+    summary = {
+        "n_configs": len(configs),
+        "eta": args.eta,
+        "min_rows": args.min_rows,
+        "n_train": int(len(X_tr)),
+        "n_val": int(len(X_val)),
+        "wall_seconds": wall,
+        "cache": {"enabled": not args.no_cache, **cache.stats()},
+        "best": {**best, "params": _jsonable(best["params"])},
+        "results": [{**r, "params": _jsonable(r["params"])} for r in results],
+    }
+    args.out.parent.mkdir(parents=True, exist_ok=True)
+    args.out.write_text(json.dumps(summary, ensure_ascii=False, indent=2), encoding="utf-8")
+
+    stats = cache.stats()
+    print(f"[OK] melhor (rodada {best['rung']}, {best['n_rows']} linhas): AUC={best['auc_val']:.4f} | {_jsonable(best['params'])}")
+    print(
+        f"[INFO] {len(results)} avaliações em {wall:.1f}s | cache: {stats['hits']} hits / {stats['misses']} misses"
+        + (f" (hit rate {stats['hit_rate']:.0%})" if stats["hit_rate"] is not None else "")
+    )
+    print(f"[OK] resultados salvos em {args.out}")
+
+
+if __name__ == "__main__":
+    main()
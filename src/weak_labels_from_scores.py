@@ -10,7 +10,7 @@ Gera rótulos fracos (weak labels) de (vaga_code, candidato_code) priorizando SC
 - Salva metadados em data/processed/labels_meta.json para auditoria.
 
 Entradas:
-- data/interim/prospects.csv
+- data/interim/prospects.parquet (src/interim_store.py; CSV legado se não houver)
 - (opcional) data/processed/scores.csv  -> colunas: vaga_code, candidato_code, score_tecnico
 
 Saídas:
@@ -22,21 +22,27 @@ from __future__ import annotations
 import argparse
 import json
 import hashlib
+import sys
 from datetime import datetime, timezone
 from pathlib import Path
 from typing import Any, Dict
 import pandas as pd
 
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from src.interim_store import INTERIM_DIR, interim_exists, parquet_path, read_interim  # noqa: E402
+
 # -----------------------
 # Caminhos
 # -----------------------
 PROJECT_ROOT = Path(__file__).resolve().parents[1]
 DATA_DIR = PROJECT_ROOT / "data"
-INTERIM_DIR = DATA_DIR / "interim"
 PROCESSED_DIR = DATA_DIR / "processed"
 CONFIGS_DIR = PROJECT_ROOT / "configs"
 
-PROSPECTS_CSV = INTERIM_DIR / "prospects.csv"
+PROSPECTS_PATH = parquet_path("prospects")
 SCORES_CSV = PROCESSED_DIR / "scores.csv"   # opcional
 OUT_CSV = PROCESSED_DIR / "labels_by_candidato_vaga.csv"
 META_JSON = PROCESSED_DIR / "labels_meta.json"
@@ -117,15 +123,11 @@ def _md5_file(path: Path) -> str | None:
     return h.hexdigest()
 
 def read_prospects() -> pd.DataFrame:
-    if not PROSPECTS_CSV.exists():
-        raise FileNotFoundError(f"Arquivo não encontrado: {PROSPECTS_CSV}")
-    df = pd.read_csv(
-        PROSPECTS_CSV,
-        dtype={"vaga_code": str, "candidato_code": str},
-        encoding="utf-8",
-        low_memory=False,
-    )
-    for col in ["vaga_code", "candidato_code", "nome", "situacao", "situacao_norm", "score_tecnico"]:
+    if not interim_exists("prospects"):
+        raise FileNotFoundError(f"Arquivo não encontrado: {PROSPECTS_PATH}")
+    cols = ["vaga_code", "candidato_code", "nome", "situacao", "situacao_norm", "score_tecnico"]
+    df = read_interim("prospects", columns=cols)
+    for col in cols:
         if col not in df.columns:
             df[col] = None
     df["vaga_code"] = df["vaga_code"].astype(str)
@@ -236,7 +238,7 @@ def label_group(g: pd.DataFrame, top_k: int, min_score: float, quantile: float)
 # Execução
 # -----------------------
 def run(top_k: int, min_score: float, quantile: float, cfg_used: Dict[str, Any]) -> None:
-    print(f"[INFO] Carregando prospects: {PROSPECTS_CSV}")
+    print(f"[INFO] Carregando prospects: {INTERIM_DIR}")
     prospects = read_prospects()
 
     # Filtra pares válidos
@@ -4,7 +4,7 @@ def test_health_ok(api_client):
     resp = api_client.get("/health")
     assert resp.status_code == 200
     data = resp.json()
-    assert set(data.keys()) == {"status", "model_loaded", "threshold"}
+    assert set(data.keys()) == {"status", "model_loaded", "threshold", "adapter"}
     assert data["status"] == "ok"
     assert isinstance(data["model_loaded"], bool)
     # threshold deve ser número (float)
@@ -0,0 +1,90 @@
+import numpy as np
+import pandas as pd
+import pytest
+from fastapi.testclient import TestClient
+
+import src.api as api
+
+client = TestClient(api.app)
+
+
+class FakeColumnsModel:
+    """Prob da classe 1 = score_tecnico; conta chamadas para checar vetorização."""
+
+    def __init__(self):
+        self.calls = 0
+
+    def predict_proba(self, X):
+        self.calls += 1
+        assert isinstance(X, pd.DataFrame) and "score_tecnico" in X.columns
+        p = X["score_tecnico"].astype(float).to_numpy()
+        return np.column_stack([1.0 - p, p])
+
+
+def _item(score, job="QA Selenium Java"):
+    return {
+        "job_text": job,
+        "cand_text": "Selenium WebDriver, Java",
+        "situacao_norm": "prospect",
+        "score_tecnico": score,
+    }
+
+
+@pytest.fixture()
+def fake_model(monkeypatch):
+    model = FakeColumnsModel()
+    monkeypatch.setattr(api, "_model", model)
+    monkeypatch.setattr(api, "_model_loaded", True)
+    monkeypatch.setattr(api, "_threshold", 0.5)
+    monkeypatch.setattr(api, "_adapter", None)
+    monkeypatch.setattr(api, "_adapter_model", None)
+    # resolve o adaptador antes (a sonda também chama predict_proba)
+    assert api._adapter_for(model) == "columns"
+    model.calls = 0
+    return model
+
+
+def test_predict_batch_single_call_in_order(fake_model):
+    items = [_item(0.9), _item(0.1), _item(0.6)]
+    resp = client.post("/predict_batch", json={"items": items})
+    assert resp.status_code == 200
+    body = resp.json()
+
+    assert fake_model.calls == 1
+    assert body["n_items"] == 3 and body["n_ok"] == 3 and body["n_errors"] == 0
+    assert [r["index"] for r in body["results"]] == [0, 1, 2]
+    assert [r["y_prob"] for r in body["results"]] == pytest.approx([0.9, 0.1, 0.6])
+    assert [r["y_pred"] for r in body["results"]] == [1, 0, 1]
+
+
+def test_predict_batch_item_errors_do_not_fail_batch(fake_model):
+    items = [_item(0.9), {"cand_text": "sem vaga", "situacao_norm": "prospect", "score_tecnico": 0.2}, _item(-1.0), _item(0.3)]
+    resp = client.post("/predict_batch", json={"items": items})
+    assert resp.status_code == 200
+    body = resp.json()
+
+    assert body["n_ok"] == 2 and body["n_errors"] == 2
+    ok, missing, negative, low = body["results"]
+    assert ok["y_pred"] == 1 and ok["error"] is None
+    assert missing["y_prob"] is None and missing["error"]
+    assert any("job_text" in e["msg"] for e in missing["error"])
+    assert negative["y_prob"] is None and negative["error"]
+    assert low["y_prob"] == pytest.approx(0.3) and low["y_pred"] == 0
+
+
+def test_predict_batch_too_large(fake_model, monkeypatch):
+    monkeypatch.setattr(api, "MAX_BATCH_ITEMS", 2)
+    resp = client.post("/predict_batch", json={"items": [_item(0.5)] * 3})
+    assert resp.status_code == 413
+    assert fake_model.calls == 0
+
+
+def test_predict_batch_text_fallback():
+    class TextListModel:
+        def predict_proba(self, X):
+            if not isinstance(X, list):
+                raise ValueError("only lists")
+            return [[0.0, 1.0] if "[SCORE]0.9" in t else [1.0, 0.0] for t in X]
+
+    probas = api._predict_proba_flexible_batch(TextListModel(), [_item(0.9), _item(0.2)])
+    assert list(probas) == [1.0, 0.0]
@@ -0,0 +1,101 @@
+import numpy as np
+import pytest
+from fastapi.testclient import TestClient
+
+import src.api as api
+
+client = TestClient(api.app)
+
+
+def _row(score=0.8, cand="Python, FastAPI"):
+    return {
+        "job_text": "Desenvolvedor Python",
+        "cand_text": cand,
+        "situacao_norm": "prospect",
+        "score_tecnico": score,
+    }
+
+
+class CountingModel:
+    def __init__(self, p=0.9):
+        self.p = p
+        self.calls = 0
+
+    def predict_proba(self, X):
+        self.calls += 1
+        return np.tile([1.0 - self.p, self.p], (len(X), 1))
+
+
+@pytest.fixture()
+def fresh_cache(monkeypatch):
+    cache = api.PredictionCache(max_size=2, ttl_s=60)
+    monkeypatch.setattr(api, "_cache", cache)
+    monkeypatch.setattr(api, "_batcher", None)
+    monkeypatch.setattr(api, "MICROBATCH_ENABLED", False)
+    monkeypatch.setattr(api, "_model_loaded", True)
+    return cache
+
+
+def test_cache_hits_skip_pipeline(fresh_cache, monkeypatch):
+    model = CountingModel(0.9)
+    monkeypatch.setattr(api, "_model", model)
+
+    first = client.post("/predict", json=_row())
+    calls_after_first = model.calls
+    second = client.post("/predict", json={**_row(), "cand_text": "  Python, FastAPI "})
+
+    assert first.json()["y_prob"] == second.json()["y_prob"] == pytest.approx(0.9)
+    assert model.calls == calls_after_first
+    stats = client.get("/stats").json()["cache"]
+    assert stats["hits"] == 1 and stats["misses"] == 1 and stats["size"] == 1
+    assert stats["hit_rate"] == pytest.approx(0.5)
+
+
+def test_cache_invalidated_when_model_changes(fresh_cache, monkeypatch):
+    monkeypatch.setattr(api, "_model", CountingModel(0.9))
+    assert client.post("/predict", json=_row()).json()["y_prob"] == pytest.approx(0.9)
+
+    monkeypatch.setattr(api, "_model", CountingModel(0.2))
+    assert client.post("/predict", json=_row()).json()["y_prob"] == pytest.approx(0.2)
+    assert fresh_cache.hits == 0
+
+
+def test_cache_lru_eviction_and_ttl(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(api.time, "monotonic", lambda: now[0])
+    cache = api.PredictionCache(max_size=2, ttl_s=10)
+
+    keys = [api.PredictionCache.make_key(_row(s), "v1", 0.5) for s in (0.1, 0.2, 0.3)]
+    cache.put(keys[0], 0.1)
+    cache.put(keys[1], 0.2)
+    assert cache.get(keys[0]) == 0.1  # keys[0] vira o mais recente
+    cache.put(keys[2], 0.3)  # despeja keys[1]
+    assert cache.get(keys[1]) is None
+    assert cache.evictions == 1
+
+    now[0] += 11
+    assert cache.get(keys[2]) is None
+    assert cache.expirations == 1
+
+
+def test_cache_key_depends_on_version_and_threshold():
+    k = api.PredictionCache.make_key
+    assert k(_row(), "v1", 0.5) != k(_row(), "v2", 0.5)
+    assert k(_row(), "v1", 0.5) != k(_row(), "v1", 0.6)
+    assert k(_row(), "v1", 0.5) == k({**_row(), "job_text": " Desenvolvedor Python "}, "v1", 0.5)
+
+
+def test_cache_disabled(monkeypatch):
+    cache = api.PredictionCache(max_size=0, ttl_s=60)
+    monkeypatch.setattr(api, "_cache", cache)
+    monkeypatch.setattr(api, "_batcher", None)
+    monkeypatch.setattr(api, "MICROBATCH_ENABLED", False)
+    monkeypatch.setattr(api, "_model_loaded", True)
+    model = CountingModel(0.7)
+    monkeypatch.setattr(api, "_model", model)
+
+    client.post("/predict", json=_row())
+    calls = model.calls
+    client.post("/predict", json=_row())
+    assert model.calls == calls + 1
+    assert cache.stats()["enabled"] is False
@@ -0,0 +1,123 @@
+import numpy as np
+import pytest
+from fastapi.testclient import TestClient
+
+import src.api as api
+from src.compiled_scorer import CompiledScorer
+from src.feature_store import FeatureStore, build, decode_vec, encode_vec
+from src.train_baseline import score_tecnico
+
+client = TestClient(api.app)
+
+APPLICANTS = {
+    "101": {
+        "infos_basicas": {"objetivo_profissional": "Analista de testes"},
+        "informacoes_profissionais": {"conhecimentos_tecnicos": "Selenium, Java, Cucumber"},
+        "cv_pt": "Experiência com Selenium WebDriver e Java",
+    },
+    "102": {"informacoes_profissionais": {"conhecimentos_tecnicos": "Python, FastAPI"}, "cv_pt": ""},
+}
+JOBS = {
+    "V1": {"informacoes_basicas": {"titulo_vaga": "QA Selenium"}, "perfil_vaga": {"competencias": "Java Selenium"}},
+}
+
+
+def _scorer():
+    return CompiledScorer(
+        vocabulary={"selenium": 0, "java": 1, "python": 2, "prospect": 3, "cand": 4},
+        idf=np.array([1.5, 1.2, 1.1, 1.0, 1.0]),
+        coef_text=np.array([1.0, 0.5, -1.0, 0.2, 0.1]),
+        coef_score=0.8,
+        score_mean=0.1,
+        score_scale=0.2,
+        intercept=-0.3,
+        token_pattern=r"(?u)\b\w\w+\b",
+    )
+
+
+class ScoreModel:
+    def predict_proba(self, X):
+        p = X["score_tecnico"].astype(float).to_numpy()
+        return np.column_stack([1.0 - p, p])
+
+
+def _serve(monkeypatch, model, store_path):
+    monkeypatch.setattr(api, "_model", model)
+    monkeypatch.setattr(api, "_model_loaded", True)
+    monkeypatch.setattr(api, "_model_version", "fs")
+    monkeypatch.setattr(api, "_adapter", None)
+    monkeypatch.setattr(api, "_adapter_model", None)
+    monkeypatch.setattr(api, "_threshold", 0.5)
+    monkeypatch.setattr(api, "MICROBATCH_ENABLED", False)
+    monkeypatch.setattr(api, "_batcher", None)
+    monkeypatch.setattr(api, "_cache", api.PredictionCache(0, 60))
+    monkeypatch.setattr(api, "_jobs", api.JobRegistry(8))
+    monkeypatch.setattr(api, "FEATURE_STORE_PATH", store_path)
+    monkeypatch.setattr(api, "_store", None)
+
+
+def test_vec_roundtrip():
+    counts = {3: 2, 0: 1, 7: 5}
+    assert decode_vec(encode_vec(counts)) == counts
+    assert decode_vec(encode_vec({})) == {}
+    assert decode_vec(None) is None
+
+
+def test_store_build_and_cached_lookup(tmp_path):
+    info = build(tmp_path / "fs.sqlite", APPLICANTS, JOBS)
+    assert info["candidates"] == 2 and info["jobs"] == 1 and info["with_vectors"] is False
+
+    store = FeatureStore(tmp_path / "fs.sqlite", cache_size=1)
+    cand = store.candidate("101")
+    assert "Selenium WebDriver" in cand.text and "selenium" in cand.tokens and cand.vec is None
+    assert store.candidate("101") is cand  # chave quente vem do LRU
+    assert store.candidate("999") is None
+    store.candidate("102")
+    assert store.stats()["hits"] == 1 and store.stats()["cached"]["candidates"] == 1
+
+
+def test_predict_by_ids_pipeline(tmp_path, monkeypatch):
+    build(tmp_path / "fs.sqlite", APPLICANTS, JOBS)
+    _serve(monkeypatch, ScoreModel(), tmp_path / "fs.sqlite")
+    store = FeatureStore(tmp_path / "fs.sqlite")
+
+    resp = client.post("/predict_by_ids", json={"vaga_code": "V1", "candidato_code": "101", "situacao_norm": "prospect"})
+    assert resp.status_code == 200
+    details = resp.json()["details"]
+    expected = score_tecnico(store.job("V1").text, store.candidate("101").text)
+    assert details["score_tecnico"] == pytest.approx(expected) and details["score_source"] == "server"
+    assert resp.json()["y_prob"] == pytest.approx(expected)
+
+    missing = {"vaga_code": "V1", "candidato_code": "999", "situacao_norm": "prospect"}
+    assert client.post("/predict_by_ids", json=missing).status_code == 404
+    missing = {"vaga_code": "V9", "candidato_code": "101", "situacao_norm": "prospect"}
+    assert client.post("/predict_by_ids", json=missing).status_code == 404
+    assert client.get("/stats").json()["feature_store"]["n_candidates"] == "2"
+
+
+def test_predict_by_ids_without_store_returns_503(tmp_path, monkeypatch):
+    _serve(monkeypatch, ScoreModel(), tmp_path / "nao_existe.sqlite")
+    resp = client.post("/predict_by_ids", json={"vaga_code": "V1", "candidato_code": "101", "situacao_norm": "x"})
+    assert resp.status_code == 503
+
+
+@pytest.mark.parametrize("registered", [False, True])
+def test_predict_by_ids_uses_stored_vectors(tmp_path, monkeypatch, registered):
+    scorer = _scorer()
+    build(tmp_path / "fs.sqlite", APPLICANTS, JOBS, scorer=scorer)
+    _serve(monkeypatch, scorer, tmp_path / "fs.sqlite")
+    store = FeatureStore(tmp_path / "fs.sqlite")
+    api._adapter_for(scorer)  # sonda do adaptador fora da contagem
+    if registered:
+        client.post("/jobs", json={"vaga_code": "V1", "job_text": store.job("V1").text})
+
+    analyzed = []
+    original = scorer.analyze
+    monkeypatch.setattr(scorer, "analyze", lambda doc: analyzed.append(doc) or original(doc))
+    body = {"vaga_code": "V1", "candidato_code": "101", "situacao_norm": "prospect", "score_tecnico": 0.4}
+    got = client.post("/predict_by_ids", json=body).json()["y_prob"]
+    assert all(d.startswith("[SIT]") for d in analyzed)  # vaga e candidato já vetorizados
+
+    row = {"job_text": store.job("V1").text, "cand_text": store.candidate("101").text,
+           "situacao_norm": "prospect", "score_tecnico": 0.4}
+    assert got == pytest.approx(float(original.__self__.predict_proba([row])[0, 1]), abs=1e-12)
@@ -45,3 +45,59 @@ def test_predict_proba_path_3_list():
     proba = _predict_proba_flexible(model, _req_dict_base())
     
     assert abs(proba - 0.4) < 1e-9
+
+
+# ----------------------- adaptador resolvido no load -----------------------
+import numpy as np
+import src.api as api
+
+
+class CountingTextDFModel(FakeModelTextDF):
+    def __init__(self):
+        self.calls = 0
+
+    def predict_proba(self, X):
+        self.calls += 1
+        if isinstance(X, pd.DataFrame) and "text" in X.columns:
+            return np.tile([0.3, 0.7], (len(X), 1))
+        return super().predict_proba(X)
+
+
+def test_resolve_adapter_probes_formats():
+    assert api._resolve_adapter(CountingTextDFModel()) == "text_df"
+    assert api._resolve_adapter(FakeModelListOnly()) == "flexible"  # sempre 1 linha -> sonda recusa
+
+
+def test_resolve_adapter_uses_pipeline_columns():
+    class ColumnsPipeline:
+        feature_names_in_ = np.array(["job_text", "cand_text", "situacao_norm", "score_tecnico"])
+
+        def predict_proba(self, X):
+            assert isinstance(X, pd.DataFrame) and list(X.columns) == api.FEATURE_COLS
+            return np.tile([0.5, 0.5], (len(X), 1))
+
+    assert api._inspect_adapter(ColumnsPipeline()) == "columns"
+    assert api._resolve_adapter(ColumnsPipeline()) == "columns"
+
+
+def test_inspect_adapter_from_column_transformer_steps():
+    class CT:
+        transformers = [("text", None, ["text"])]
+
+    class Pipe:
+        steps = [("prep", CT()), ("clf", None)]
+
+    assert api._inspect_adapter(Pipe()) == "text_df"
+    assert api._inspect_adapter(object()) is None
+
+
+def test_bound_adapter_skips_exception_path(monkeypatch):
+    model = CountingTextDFModel()
+    monkeypatch.setattr(api, "_adapter", None)
+    monkeypatch.setattr(api, "_adapter_model", None)
+    api._bind_adapter(model)
+    model.calls = 0
+
+    probas = api._predict_proba_rows(model, [_req_dict_base()] * 3)
+    assert list(probas) == [0.7, 0.7, 0.7]
+    assert model.calls == 1
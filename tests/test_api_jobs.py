@@ -0,0 +1,152 @@
+import numpy as np
+import pandas as pd
+import pytest
+from fastapi.testclient import TestClient
+
+import src.api as api
+from src.compiled_scorer import CompiledScorer
+from src.train_baseline import make_pipeline, score_tecnico
+
+client = TestClient(api.app)
+
+JOB = "Analista QA com Selenium, Java e testes automatizados " * 50
+CAND = "Selenium WebDriver, Java, Cucumber"
+
+
+class ScoreModel:
+    def __init__(self):
+        self.job_texts = []
+
+    def predict_proba(self, X):
+        self.job_texts.extend(X["job_text"].tolist())
+        p = X["score_tecnico"].astype(float).to_numpy()
+        return np.column_stack([1.0 - p, p])
+
+
+def _serve(monkeypatch, model, version="v1"):
+    monkeypatch.setattr(api, "_model", model)
+    monkeypatch.setattr(api, "_model_loaded", True)
+    monkeypatch.setattr(api, "_model_version", version)
+    monkeypatch.setattr(api, "_adapter", None)
+    monkeypatch.setattr(api, "_adapter_model", None)
+    monkeypatch.setattr(api, "_threshold", 0.5)
+    monkeypatch.setattr(api, "MICROBATCH_ENABLED", False)
+    monkeypatch.setattr(api, "_batcher", None)
+    monkeypatch.setattr(api, "_cache", api.PredictionCache(0, 60))
+
+
+@pytest.fixture()
+def registry(monkeypatch):
+    reg = api.JobRegistry(2)
+    monkeypatch.setattr(api, "_jobs", reg)
+    return reg
+
+
+def test_register_and_predict_by_vaga_code(monkeypatch, registry):
+    model = ScoreModel()
+    _serve(monkeypatch, model)
+
+    body = client.post("/jobs", json={"vaga_code": "V1", "job_text": JOB}).json()
+    assert body["vaga_code"] == "V1" and body["replaced"] is False
+    assert body["n_chars"] == len(JOB) and body["vectorized"] is False  # modelo sem TF-IDF aditivo: só tokens
+
+    resp = client.post("/predict", json={"vaga_code": "V1", "cand_text": CAND, "situacao_norm": "prospect"})
+    assert resp.status_code == 200
+    data = resp.json()
+    assert data["details"]["vaga_code"] == "V1" and data["details"]["score_source"] == "server"
+    assert data["details"]["score_tecnico"] == pytest.approx(score_tecnico(JOB, CAND))
+    assert model.job_texts[-1] == JOB  # texto do registro repassado ao pipeline
+
+    assert client.get("/jobs/V1").json()["digest"] == body["digest"]
+    again = client.post("/jobs", json={"vaga_code": "V1", "job_text": "Dev Python"}).json()
+    assert again["replaced"] is True
+
+
+def test_predict_requires_exactly_one_job_source(monkeypatch, registry):
+    _serve(monkeypatch, ScoreModel())
+    base = {"cand_text": CAND, "situacao_norm": "prospect", "score_tecnico": 0.2}
+    assert client.post("/predict", json=base).status_code == 422
+    assert client.post("/predict", json={**base, "job_text": "x", "vaga_code": "V1"}).status_code == 422
+    assert client.post("/predict", json={**base, "vaga_code": "nao-existe"}).status_code == 404
+
+
+def test_registry_is_bounded_and_deletable(monkeypatch, registry):
+    _serve(monkeypatch, ScoreModel())
+    for code in ("A", "B", "C"):
+        client.post("/jobs", json={"vaga_code": code, "job_text": f"vaga {code}"})
+    assert client.get("/jobs/A").status_code == 404
+    assert registry.stats()["evictions"] == 1 and registry.stats()["size"] == 2
+    assert client.delete("/jobs/B").json()["status"] == "deleted"
+    assert client.delete("/jobs/B").status_code == 404
+    assert client.get("/stats").json()["jobs"]["size"] == 1
+
+
+def test_batch_and_stream_accept_vaga_code(monkeypatch, registry):
+    _serve(monkeypatch, ScoreModel())
+    client.post("/jobs", json={"vaga_code": "V1", "job_text": JOB})
+    items = [
+        {"vaga_code": "V1", "cand_text": CAND, "situacao_norm": "prospect", "score_tecnico": 0.7},
+        {"vaga_code": "V9", "cand_text": CAND, "situacao_norm": "prospect", "score_tecnico": 0.7},
+    ]
+    results = client.post("/predict_batch", json={"items": items}).json()["results"]
+    assert results[0]["y_prob"] == pytest.approx(0.7)
+    assert "V9" in results[1]["error"]
+
+
+def test_compiled_scorer_uses_prevectorized_job(monkeypatch, registry):
+    scorer = CompiledScorer(
+        vocabulary={"selenium": 0, "java": 1, "python": 2},
+        idf=np.ones(3),
+        coef_text=np.array([1.0, 0.5, -1.0]),
+        coef_score=0.8,
+        score_mean=0.1,
+        score_scale=0.2,
+        intercept=-0.3,
+        token_pattern=r"(?u)\b\w\w+\b",
+    )
+    _serve(monkeypatch, scorer, version="c1")
+    analyzed = []
+    original = scorer.analyze
+    monkeypatch.setattr(scorer, "analyze", lambda doc: analyzed.append(doc) or original(doc))
+
+    assert client.post("/jobs", json={"vaga_code": "V1", "job_text": JOB}).json()["vectorized"] is True
+    n_job_analyses = len(analyzed)
+    row = {"cand_text": CAND, "situacao_norm": "prospect", "score_tecnico": 0.3}
+    for _ in range(3):
+        got = client.post("/predict", json={"vaga_code": "V1", **row}).json()["y_prob"]
+    assert len(analyzed) == n_job_analyses + 3  # só o candidato é analisado a cada chamada
+    assert all(not d.startswith("[JOB]") for d in analyzed[n_job_analyses:])
+
+    expected = float(scorer.predict_proba([{"job_text": JOB, **row}])[0, 1])
+    assert got == pytest.approx(expected, abs=1e-12)
+
+
+def test_sklearn_pipeline_uses_prevectorized_job(monkeypatch, registry):
+    rng = np.random.default_rng(0)
+    words = ["python", "sql", "java", "selenium", "excel", "vendas", "cucumber"]
+    X = pd.DataFrame({
+        "job_text": [" ".join(rng.choice(words, 3)) for _ in range(60)],
+        "cand_text": [" ".join(rng.choice(words, 4)) for _ in range(60)],
+        "situacao_norm": rng.choice(["prospect", "encaminhado"], 60),
+        "score_tecnico": rng.random(60),
+    })
+    pipe = make_pipeline().fit(X, (X["score_tecnico"] > 0.5).astype(int))
+    _serve(monkeypatch, pipe, version="p1")
+    vectorized = []
+    job_counts = api._job_counts
+    monkeypatch.setattr(api, "_job_counts", lambda model, text: vectorized.append(text) or job_counts(model, text))
+
+    assert client.post("/jobs", json={"vaga_code": "V1", "job_text": JOB}).json()["vectorized"] is True
+    row = {"cand_text": CAND, "situacao_norm": "prospect", "score_tecnico": 0.3}
+    expected = pipe.predict_proba(pd.DataFrame([{"job_text": JOB, **row}])[X.columns])[0, 1]
+    for _ in range(3):
+        got = client.post("/predict", json={"vaga_code": "V1", **row}).json()["y_prob"]
+        assert got == pytest.approx(expected, abs=1e-12)
+    assert vectorized == [JOB]  # vetorizada só no registro
+
+    # troca de modelo: contagens descartadas e refeitas uma vez para a nova versão
+    api._swap_model(pipe, "p2", "columns")
+    assert client.get("/jobs/V1").json()["vectorized"] is False
+    client.post("/predict", json={"vaga_code": "V1", **row})
+    client.post("/predict", json={"vaga_code": "V1", **row})
+    assert vectorized == [JOB, JOB]
@@ -0,0 +1,86 @@
+import pandas as pd
+import pytest
+from fastapi.testclient import TestClient
+from sklearn.compose import ColumnTransformer
+from sklearn.feature_extraction.text import TfidfVectorizer
+from sklearn.linear_model import LogisticRegression
+from sklearn.pipeline import Pipeline
+
+import src.api as api
+from src.serving_metrics import Counter, Gauge, Histogram, Registry
+
+client = TestClient(api.app)
+
+
+def _payload():
+    return {
+        "job_text": "Desenvolvedor Python",
+        "cand_text": "Python, FastAPI",
+        "situacao_norm": "prospect",
+        "score_tecnico": 0.4,
+    }
+
+
+@pytest.fixture()
+def sk_model(monkeypatch):
+    pipe = Pipeline([
+        ("prep", ColumnTransformer([("text", TfidfVectorizer(), "job_text")])),
+        ("clf", LogisticRegression()),
+    ])
+    X = pd.DataFrame([{**_payload(), "job_text": t} for t in ("python dev", "java dev", "python sql", "sap fi")])
+    pipe.fit(X, [1, 0, 1, 0])
+    monkeypatch.setattr(api, "_model", pipe)
+    monkeypatch.setattr(api, "_model_loaded", True)
+    monkeypatch.setattr(api, "_cache", api.PredictionCache(0, 60))
+    monkeypatch.setattr(api, "_batcher", None)
+    monkeypatch.setattr(api, "MICROBATCH_ENABLED", False)
+    return pipe
+
+
+def test_metrics_exposes_routes_and_stages(sk_model):
+    before = {s: api.STAGE_SECONDS.count(stage=s) for s in ("validation", "adapter", "vectorization", "classifier", "serialization")}
+    resp = client.post("/predict", json=_payload())
+    assert resp.status_code == 200
+    expected = sk_model.predict_proba(pd.DataFrame([_payload()]))[0, 1]
+    assert resp.json()["y_prob"] == pytest.approx(expected)
+    for stage, n in before.items():
+        assert api.STAGE_SECONDS.count(stage=stage) == n + 1, stage
+
+    client.post("/predict", json={"cand_text": "x"})  # 422
+    body = client.get("/metrics")
+    assert body.headers["content-type"].startswith("text/plain")
+    text = body.text
+    assert '# TYPE decision_request_duration_seconds histogram' in text
+    assert 'decision_requests_total{route="/predict",method="POST",status="200"}' in text
+    assert 'decision_requests_total{route="/predict",method="POST",status="422"}' in text
+    assert 'decision_stage_duration_seconds_bucket{stage="vectorization",le="+Inf"}' in text
+    assert 'decision_model_info{' in text
+    assert "decision_cache_events" in text
+
+
+def test_unmatched_routes_share_one_label():
+    client.get("/nao-existe-1")
+    client.get("/nao-existe-2")
+    assert api.REQUESTS_TOTAL.value(route="unmatched", method="GET", status="404") >= 2
+
+
+def test_registry_render_format():
+    reg = Registry()
+    c = reg.register(Counter("x_total", "help x", ("a",)))
+    h = reg.register(Histogram("y_seconds", "help y", ("a",), buckets=(0.1, 1.0)))
+    reg.register(Gauge("z", "help z", lambda: [(("q\"1",), 2.5)], ("a",)))
+    c.inc(a="1")
+    c.inc(2, a="1")
+    h.observe(0.05, a="1")
+    h.observe(0.5, a="1")
+    h.observe(5.0, a="1")
+
+    lines = reg.render().splitlines()
+    assert 'x_total{a="1"} 3' in lines
+    assert 'y_seconds_bucket{a="1",le="0.1"} 1' in lines
+    assert 'y_seconds_bucket{a="1",le="1"} 2' in lines
+    assert 'y_seconds_bucket{a="1",le="+Inf"} 3' in lines
+    assert 'y_seconds_count{a="1"} 3' in lines
+    assert 'y_seconds_sum{a="1"} 5.55' in lines
+    assert 'z{a="q\\"1"} 2.5' in lines
+    assert "# TYPE y_seconds histogram" in lines
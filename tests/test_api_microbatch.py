@@ -0,0 +1,189 @@
+import queue
+import threading
+
+import numpy as np
+import pytest
+from fastapi.testclient import TestClient
+
+import src.api as api
+
+client = TestClient(api.app)
+
+
+def _row(score):
+    return {
+        "job_text": "QA Selenium Java",
+        "cand_text": "Selenium WebDriver, Java",
+        "situacao_norm": "prospect",
+        "score_tecnico": score,
+    }
+
+
+def test_microbatcher_coalesces_concurrent_submits():
+    seen_sizes = []
+
+    def predict_fn(rows, tag):
+        seen_sizes.append(len(rows))
+        return np.array([r["score_tecnico"] for r in rows])
+
+    batcher = api.MicroBatcher(predict_fn, max_batch_size=8, max_wait_us=200_000, max_queue=64)
+    futures = [batcher.submit(_row(i / 10)) for i in range(10)]
+    batcher.start()
+    try:
+        results = [f.result(timeout=5) for f in futures]
+    finally:
+        batcher.stop()
+
+    assert results == pytest.approx([i / 10 for i in range(10)])
+    assert seen_sizes == [8, 2]
+    stats = batcher.stats()
+    assert stats["batches"] == 2 and stats["items"] == 10
+    assert stats["max_batch_seen"] == 8
+    assert stats["avg_batch_size"] == pytest.approx(5.0)
+
+
+def test_microbatcher_propagates_errors_to_every_caller():
+    def predict_fn(rows, tag):
+        raise ValueError("boom")
+
+    batcher = api.MicroBatcher(predict_fn, max_batch_size=4, max_wait_us=50_000, max_queue=8)
+    futures = [batcher.submit(_row(0.1)) for _ in range(3)]
+    batcher.start()
+    try:
+        for f in futures:
+            with pytest.raises(ValueError):
+                f.result(timeout=5)
+    finally:
+        batcher.stop()
+
+
+def test_microbatcher_fails_every_caller_on_short_output():
+    batcher = api.MicroBatcher(lambda rows, tag: [0.5] * (len(rows) - 1), max_batch_size=4, max_wait_us=50_000,
+                               max_queue=8)
+    futures = [batcher.submit(_row(0.1)) for _ in range(3)]
+    batcher.start()
+    try:
+        for f in futures:
+            with pytest.raises(ValueError):
+                f.result(timeout=5)
+    finally:
+        batcher.stop()
+
+
+def test_microbatcher_groups_by_tag():
+    calls = []
+
+    def predict_fn(rows, tag):
+        calls.append((tag, len(rows)))
+        return [1.0 if tag == "new" else 0.0] * len(rows)
+
+    batcher = api.MicroBatcher(predict_fn, max_batch_size=8, max_wait_us=50_000, max_queue=8)
+    futures = [batcher.submit(_row(0.1), tag) for tag in ("old", "new", "old", "new", "new")]
+    batcher.start()
+    try:
+        assert [f.result(timeout=5) for f in futures] == [0.0, 1.0, 0.0, 1.0, 1.0]
+    finally:
+        batcher.stop()
+    assert calls == [("old", 2), ("new", 3)]
+
+
+def test_microbatcher_stop_resolves_pending_futures():
+    batcher = api.MicroBatcher(lambda rows, tag: [r["score_tecnico"] for r in rows],
+                               max_batch_size=2, max_wait_us=0, max_queue=8)
+    futures = [batcher.submit(_row(i / 10)) for i in range(5)]  # worker nunca iniciado
+    batcher.stop()
+    assert [f.result(timeout=0) for f in futures] == pytest.approx([i / 10 for i in range(5)])
+    with pytest.raises(RuntimeError):
+        batcher.submit(_row(0.1))
+
+
+def test_microbatcher_stop_fails_queue_when_worker_is_stuck():
+    entered, release = threading.Event(), threading.Event()
+
+    def predict_fn(rows, tag):
+        entered.set()
+        release.wait(5)
+        return [0.5] * len(rows)
+
+    batcher = api.MicroBatcher(predict_fn, max_batch_size=1, max_wait_us=0, max_queue=8).start()
+    first = batcher.submit(_row(0.1))
+    assert entered.wait(5)
+    queued = [batcher.submit(_row(0.2)) for _ in range(2)]
+    batcher.stop(timeout=0.05)
+    for f in queued:
+        with pytest.raises(RuntimeError):
+            f.result(timeout=0)
+    release.set()
+    assert first.result(timeout=5) == 0.5
+
+
+def test_microbatcher_bounded_queue():
+    batcher = api.MicroBatcher(lambda rows, tag: [0.0] * len(rows), max_batch_size=4, max_wait_us=0, max_queue=1)
+    batcher.submit(_row(0.1))
+    with pytest.raises(queue.Full):
+        batcher.submit(_row(0.2))
+    assert batcher.stats()["rejected"] == 1
+    assert batcher.stats()["queue_depth"] == 1
+
+
+def test_predict_goes_through_batcher(monkeypatch):
+    class FakeModel:
+        def predict_proba(self, X):
+            p = X["score_tecnico"].astype(float).to_numpy()
+            return np.column_stack([1.0 - p, p])
+
+    monkeypatch.setattr(api, "_model", FakeModel())
+    monkeypatch.setattr(api, "_model_loaded", True)
+    monkeypatch.setattr(api, "MICROBATCH_ENABLED", True)
+    monkeypatch.setattr(api, "MICROBATCH_MAX_WAIT_US", 20_000)
+    monkeypatch.setattr(api, "_batcher", None)
+
+    responses = {}
+
+    def call(score):
+        responses[score] = client.post("/predict", json=_row(score))
+
+    threads = [threading.Thread(target=call, args=(s,)) for s in (0.2, 0.7, 0.9)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    batcher = api._batcher
+    try:
+        for score, resp in responses.items():
+            assert resp.status_code == 200
+            assert resp.json()["y_prob"] == pytest.approx(score)
+
+        body = client.get("/stats").json()["microbatch"]
+        assert body["enabled"] is True
+        assert body["items"] == 3
+        assert body["max_batch_size"] == api.MICROBATCH_MAX_SIZE
+    finally:
+        batcher.stop()
+
+
+def test_predict_queue_full_returns_503(monkeypatch):
+    class FullBatcher:
+        def submit(self, row, tag=None):
+            raise queue.Full
+
+    monkeypatch.setattr(api, "_model_loaded", True)
+    monkeypatch.setattr(api, "_batcher", FullBatcher())
+    resp = client.post("/predict", json=_row(0.5))
+    assert resp.status_code == 503
+
+
+def test_predict_after_batcher_stop_returns_503(monkeypatch):
+    batcher = api.MicroBatcher(lambda rows, tag: [0.0] * len(rows), max_batch_size=1, max_wait_us=0, max_queue=1)
+    batcher.stop()
+    monkeypatch.setattr(api, "_model_loaded", True)
+    monkeypatch.setattr(api, "_batcher", batcher)
+    resp = client.post("/predict", json=_row(0.5))
+    assert resp.status_code == 503
+
+
+def test_stats_disabled_by_default(monkeypatch):
+    monkeypatch.setattr(api, "_batcher", None)
+    monkeypatch.setattr(api, "MICROBATCH_ENABLED", False)
+    assert client.get("/stats").json()["microbatch"] == {"enabled": False}
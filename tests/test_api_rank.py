@@ -0,0 +1,119 @@
+import numpy as np
+import pandas as pd
+import pytest
+from fastapi.testclient import TestClient
+
+import src.api as api
+
+client = TestClient(api.app)
+
+
+class ScoreModel:
+    """Prob da classe 1 = score_tecnico; exige que a vaga venha em todas as linhas."""
+
+    def __init__(self):
+        self.calls = 0
+
+    def predict_proba(self, X):
+        self.calls += 1
+        assert isinstance(X, pd.DataFrame)
+        assert (X["job_text"] == "Vaga QA Selenium").all()
+        p = X["score_tecnico"].astype(float).to_numpy()
+        return np.column_stack([1.0 - p, p])
+
+
+@pytest.fixture()
+def score_model(monkeypatch):
+    model = ScoreModel()
+    monkeypatch.setattr(api, "_model", model)
+    monkeypatch.setattr(api, "_model_loaded", True)
+    monkeypatch.setattr(api, "_threshold", 0.5)
+    monkeypatch.setattr(api, "_adapter", None)
+    monkeypatch.setattr(api, "_adapter_model", None)
+    return model
+
+
+def _cands(scores):
+    return [
+        {"cand_text": f"candidato {i}", "situacao_norm": "prospect", "score_tecnico": s, "candidato_code": str(i)}
+        for i, s in enumerate(scores)
+    ]
+
+
+def test_rank_sorted_by_probability(score_model):
+    resp = client.post("/rank", json={"job_text": "Vaga QA Selenium", "candidates": _cands([0.2, 0.9, 0.5, 0.9])})
+    assert resp.status_code == 200
+    body = resp.json()
+
+    assert body["n_candidates"] == 4
+    assert [r["candidato_code"] for r in body["results"]] == ["1", "3", "2", "0"]
+    assert [r["rank"] for r in body["results"]] == [1, 2, 3, 4]
+    assert [r["y_pred"] for r in body["results"]] == [1, 1, 1, 0]
+
+
+def test_rank_top_k(score_model):
+    api._adapter_for(score_model)
+    score_model.calls = 0
+    resp = client.post(
+        "/rank", json={"job_text": "Vaga QA Selenium", "candidates": _cands([0.1, 0.7, 0.3]), "top_k": 2}
+    )
+    body = resp.json()
+    assert [r["index"] for r in body["results"]] == [1, 2]
+    assert body["n_candidates"] == 3
+    assert score_model.calls == 1
+
+
+def test_rank_empty_and_limits(score_model, monkeypatch):
+    body = client.post("/rank", json={"job_text": "Vaga QA Selenium", "candidates": []}).json()
+    assert body["results"] == []
+
+    monkeypatch.setattr(api, "MAX_BATCH_ITEMS", 1)
+    resp = client.post("/rank", json={"job_text": "Vaga QA Selenium", "candidates": _cands([0.1, 0.2])})
+    assert resp.status_code == 413
+
+    resp = client.post("/rank", json={"job_text": "Vaga", "candidates": _cands([0.1]), "top_k": 0})
+    assert resp.status_code == 422
+
+
+@pytest.mark.parametrize("params, job_docs", [
+    ({}, 1),
+    ({"prep__text__tfidf__sublinear_tf": True, "prep__text__tfidf__binary": True}, 1),
+    ({"prep__text__tfidf__ngram_range": (1, 2)}, 3),  # bigramas cruzam vaga/candidato: vaga repetida por linha
+])
+def test_rank_sklearn_pipeline_tokenizes_job_once(monkeypatch, params, job_docs):
+    from sklearn.feature_extraction.text import TfidfVectorizer
+
+    from src.train_baseline import make_pipeline
+
+    rng = np.random.default_rng(0)
+    words = ["python", "sql", "java", "selenium", "excel", "vendas", "aws"]
+    X = pd.DataFrame({
+        "job_text": [" ".join(rng.choice(words, 3)) for _ in range(60)],
+        "cand_text": [" ".join(rng.choice(words, 4)) for _ in range(60)],
+        "situacao_norm": rng.choice(["prospect", "encaminhado"], 60),
+        "score_tecnico": rng.random(60),
+    })
+    pipe = make_pipeline().set_params(**params).fit(X, (X["score_tecnico"] > 0.5).astype(int))
+    monkeypatch.setattr(api, "_model", pipe)
+    monkeypatch.setattr(api, "_model_loaded", True)
+    monkeypatch.setattr(api, "_threshold", 0.5)
+    monkeypatch.setattr(api, "_adapter", None)
+    monkeypatch.setattr(api, "_adapter_model", None)
+
+    job = "Vaga python sql aws python"
+    cands = _cands([0.2, 0.9, 0.5])
+    expected = pipe.predict_proba(pd.DataFrame([{"job_text": job, **c} for c in cands])[X.columns])[:, 1]
+
+    api._adapter_for(pipe)  # a sonda do adaptador também passa pelo TF-IDF
+    docs = []
+    build = TfidfVectorizer.build_analyzer
+
+    def spy(self):
+        analyze = build(self)
+        return lambda doc: docs.append(doc) or analyze(doc)
+
+    monkeypatch.setattr(TfidfVectorizer, "build_analyzer", spy)
+    body = client.post("/rank", json={"job_text": job, "candidates": cands}).json()
+    got = {r["index"]: r["y_prob"] for r in body["results"]}
+    assert np.allclose([got[i] for i in range(3)], expected)
+    assert sum(d.startswith("[JOB]") for d in docs) == job_docs
@@ -0,0 +1,139 @@
+import json
+import os
+import threading
+
+import joblib
+import numpy as np
+import pytest
+from fastapi.testclient import TestClient
+
+import src.api as api
+
+client = TestClient(api.app)
+TOKEN = "s3cr3t"
+ADMIN = {"X-Admin-Token": TOKEN}
+
+
+class ConstModel:
+    def __init__(self, p):
+        self.p = p
+
+    def predict_proba(self, X):
+        return np.tile([1.0 - self.p, self.p], (len(X), 1))
+
+
+def _row():
+    return {
+        "job_text": "Desenvolvedor Python",
+        "cand_text": "Python, FastAPI",
+        "situacao_norm": "prospect",
+        "score_tecnico": 0.4,
+    }
+
+
+@pytest.fixture()
+def models_dir(tmp_path, monkeypatch):
+    for name in ("_model", "_model_loaded", "_model_version", "_adapter", "_adapter_model", "_threshold",
+                 "_last_reload"):
+        monkeypatch.setattr(api, name, getattr(api, name))
+    monkeypatch.setattr(api, "MODELS_DIR", tmp_path)
+    monkeypatch.setattr(api, "THRESHOLD_FILE", tmp_path / "decision_threshold.json")
+    monkeypatch.setattr(api, "COMPILED_MODEL_FILE", tmp_path / "model_compiled.joblib")
+    monkeypatch.setattr(api, "ADMIN_TOKEN", TOKEN)
+    monkeypatch.setattr(api, "_batcher", None)
+    monkeypatch.setattr(api, "MICROBATCH_ENABLED", False)
+    monkeypatch.setattr(api, "_cache", api.PredictionCache(16, 60))
+    return tmp_path
+
+
+def _deploy(models_dir, p, threshold=0.5):
+    path = models_dir / "model.joblib"
+    joblib.dump(ConstModel(p), path)
+    (models_dir / "decision_threshold.json").write_text(json.dumps({"threshold": threshold}), encoding="utf-8")
+    st = path.stat()
+    os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000_000))  # garante mtime diferente
+
+
+def test_admin_reload_swaps_model_and_version(models_dir):
+    _deploy(models_dir, 0.3)
+    assert client.post("/admin/reload", headers=ADMIN).json()["status"] == "ok"
+    first = client.post("/predict", json=_row()).json()
+    assert first["y_prob"] == pytest.approx(0.3)
+    v1 = first["details"]["model_version"]
+
+    _deploy(models_dir, 0.8, threshold=0.7)
+    body = client.post("/admin/reload", headers=ADMIN).json()
+    assert body["previous_version"] == v1 and body["version"] != v1
+
+    second = client.post("/predict", json=_row()).json()
+    assert second["y_prob"] == pytest.approx(0.8)
+    assert second["y_pred"] == 1 and second["details"]["threshold"] == 0.7
+    assert second["details"]["model_version"] == body["version"]
+
+    status = client.get("/admin/reload").json()
+    assert status["version"] == body["version"]
+    assert status["last_reload"]["status"] == "ok"
+
+
+def test_in_flight_snapshot_keeps_old_model(models_dir):
+    _deploy(models_dir, 0.3)
+    api._reload()
+    snap = api._snapshot()
+
+    _deploy(models_dir, 0.9)
+    api._reload()
+
+    assert api._cached_predict(snap, _row()) == pytest.approx(0.3)
+    assert api._cached_predict(api._snapshot(), _row()) == pytest.approx(0.9)
+
+
+def test_failed_reload_keeps_serving_old_model(models_dir):
+    _deploy(models_dir, 0.3)
+    api._reload()
+    (models_dir / "model.joblib").write_text("corrompido", encoding="utf-8")
+
+    resp = client.post("/admin/reload", headers=ADMIN)
+    assert resp.status_code == 500
+    assert client.post("/predict", json=_row()).json()["y_prob"] == pytest.approx(0.3)
+
+
+def test_admin_reload_requires_token(models_dir):
+    _deploy(models_dir, 0.3)
+    assert client.post("/admin/reload").status_code == 403
+    assert client.post("/admin/reload", headers={"X-Admin-Token": "errado"}).status_code == 403
+    assert client.post("/admin/reload", headers=ADMIN).status_code == 200
+
+
+def test_admin_reload_disabled_without_token(models_dir, monkeypatch):
+    _deploy(models_dir, 0.3)
+    monkeypatch.setattr(api, "ADMIN_TOKEN", None)
+    monkeypatch.setattr(api, "_reload", lambda reason="admin": pytest.fail("reload sem token"))
+    for headers in ({}, ADMIN, {"X-Admin-Token": ""}):
+        resp = client.post("/admin/reload", headers=headers)
+        assert resp.status_code == 403 and "ADMIN_TOKEN" in resp.json()["detail"]
+
+
+def test_admin_reload_in_progress_and_background(models_dir, monkeypatch):
+    _deploy(models_dir, 0.3)
+    assert api._reload_lock.acquire(blocking=False)
+    try:
+        assert client.post("/admin/reload", headers=ADMIN).status_code == 409
+    finally:
+        api._reload_lock.release()
+
+    done = threading.Event()
+    monkeypatch.setattr(api, "_reload", lambda reason="admin": done.set())
+    assert client.post("/admin/reload", headers=ADMIN, params={"wait": False}).json()["status"] == "scheduled"
+    assert done.wait(timeout=5)
+
+
+def test_watcher_detects_artifact_changes(models_dir):
+    _deploy(models_dir, 0.3)
+    changes = []
+    watcher = api.ModelWatcher(interval_s=60, on_change=lambda: changes.append(1))
+    assert watcher.check() is False
+
+    _deploy(models_dir, 0.6)
+    assert watcher.check() is True
+    assert watcher.check() is False
+    assert changes == [1]
@@ -0,0 +1,122 @@
+import joblib
+import numpy as np
+import pandas as pd
+import pytest
+from fastapi.testclient import TestClient
+
+import src.api as api
+from src.candidate_index import build_index, extract_vectorizer
+from src.compiled_scorer import compile_pipeline
+from src.feature_store import FeatureStore, build
+from src.train_baseline import make_pipeline, score_tecnico
+
+client = TestClient(api.app)
+
+CVS = {
+    "1": "Selenium WebDriver Java testes automatizados",
+    "2": "Python FastAPI SQL Docker",
+    "3": "Spark Airflow Python dados",
+    "4": "SAP FI CO contabilidade",
+    "5": "Java Spring Boot microserviços testes",
+    "6": "atendimento vendas varejo",
+}
+JOB = "Analista QA Selenium Java testes"
+
+
+@pytest.fixture(scope="module")
+def trained():
+    rows = []
+    for job in (JOB, "Desenvolvedor Python SQL", "Consultor SAP FI"):
+        for code, cv in CVS.items():
+            st = score_tecnico(job, cv)
+            rows.append({"job_text": job, "cand_text": cv, "situacao_norm": "prospect", "score_tecnico": st,
+                         "y": int(st > 0.15)})
+    df = pd.DataFrame(rows)
+    return make_pipeline().fit(df[["job_text", "cand_text", "situacao_norm", "score_tecnico"]], df["y"].values)
+
+
+@pytest.fixture()
+def served(trained, tmp_path, monkeypatch):
+    applicants = {code: {"cv_pt": cv} for code, cv in CVS.items()}
+    build(tmp_path / "fs.sqlite", applicants, {"V1": {"perfil_vaga": {"competencias": JOB}}})
+    store = FeatureStore(tmp_path / "fs.sqlite")
+    index = build_index(store, extract_vectorizer(trained), source_digest="r1")
+
+    monkeypatch.setattr(api, "_model_loaded", True)
+    monkeypatch.setattr(api, "_model_version", "r1")
+    monkeypatch.setattr(api, "_adapter", None)
+    monkeypatch.setattr(api, "_adapter_model", None)
+    monkeypatch.setattr(api, "_threshold", 0.5)
+    monkeypatch.setattr(api, "_jobs", api.JobRegistry(8))
+    monkeypatch.setattr(api, "_store", store)
+    monkeypatch.setattr(api, "_index", index)
+    monkeypatch.setattr(api, "_index_sig", None)
+
+    def serve(model):
+        monkeypatch.setattr(api, "_model", model)
+        return store
+    return serve
+
+
+def _expected(pipe, store, codes):
+    rows = []
+    for code in codes:
+        text = store.candidate(code).text
+        rows.append({"job_text": JOB, "cand_text": text, "situacao_norm": "prospect",
+                     "score_tecnico": score_tecnico(JOB, text)})
+    return pipe.predict_proba(pd.DataFrame(rows))[:, 1]
+
+
+def test_retrieve_prunes_and_rescores_with_full_model(trained, served):
+    store = served(trained)
+    body = client.post("/retrieve", json={"job_text": JOB, "top_k": 3}).json()
+
+    assert body["n_pool"] == len(CVS)
+    assert body["n_matched"] == 2  # só quem compartilha termos com a vaga ("1" e "5")
+    assert body["n_rescored"] == 2 and body["truncated"] is False
+    codes = [r["candidato_code"] for r in body["results"]]
+    assert sorted(codes) == ["1", "5"]
+    probas = [r["y_prob"] for r in body["results"]]
+    assert probas == sorted(probas, reverse=True)
+    assert np.allclose(probas, _expected(trained, store, codes), atol=1e-9)
+    assert set(body["timings_ms"]) == {"retrieval", "rescoring"}
+    assert client.get("/stats").json()["candidate_index"]["nnz"] > 0
+
+
+def test_retrieve_by_vaga_code_with_compiled_scorer(trained, served):
+    store = served(compile_pipeline(trained))
+    body = client.post("/retrieve", json={"vaga_code": "V1", "top_k": 1}).json()
+    assert len(body["results"]) == 1
+    top = body["results"][0]
+    assert top["y_prob"] == pytest.approx(float(_expected(trained, store, [top["candidato_code"]])[0]), abs=1e-9)
+
+
+def test_retrieve_budget_truncates(trained, served, monkeypatch):
+    served(trained)
+    monkeypatch.setattr(api, "RETRIEVAL_CHUNK", 1)
+    body = client.post("/retrieve", json={"job_text": JOB, "budget_ms": 1e-6}).json()
+    assert body["truncated"] is True and body["n_rescored"] == 1 and len(body["results"]) == 1
+
+
+def test_retrieve_without_index_returns_503(trained, served, monkeypatch, tmp_path):
+    served(trained)
+    monkeypatch.setattr(api, "_index", None)
+    monkeypatch.setattr(api, "CANDIDATE_INDEX_PATH", tmp_path / "nao_existe.joblib")
+    assert client.post("/retrieve", json={"job_text": JOB}).status_code == 503
+
+
+def test_retrieve_rejects_index_from_another_model(trained, served, monkeypatch, tmp_path):
+    store = served(trained)
+    path = tmp_path / "candidate_index.joblib"
+    joblib.dump(api._index, path)  # índice do pipeline "r1"
+    monkeypatch.setattr(api, "CANDIDATE_INDEX_PATH", path)
+
+    api._swap_model(trained, "r2", "columns")  # reload: outro pipeline, índice antigo descartado
+    assert api._index is None
+    resp = client.post("/retrieve", json={"job_text": JOB})
+    assert resp.status_code == 409 and "candidate_index.py" in resp.json()["detail"]
+
+    # índice regenerado para o novo modelo: relido do disco sem reiniciar
+    joblib.dump(build_index(store, extract_vectorizer(trained), source_digest="r2"), path)
+    assert client.post("/retrieve", json={"job_text": JOB}).status_code == 200
+    assert api._index.meta["source_digest"] == "r2"
@@ -0,0 +1,73 @@
+import numpy as np
+import pandas as pd
+import pytest
+from fastapi.testclient import TestClient
+
+import src.api as api
+from src.train_baseline import score_tecnico
+
+client = TestClient(api.app)
+
+JOB = "Analista QA Selenium/Java, testes automatizados"
+CAND = "Selenium WebDriver, Java, Cucumber"
+
+
+class EchoScoreModel:
+    def predict_proba(self, X):
+        p = X["score_tecnico"].astype(float).to_numpy()
+        return np.column_stack([1.0 - p, p])
+
+
+@pytest.fixture(autouse=True)
+def echo_model(monkeypatch):
+    monkeypatch.setattr(api, "_model", EchoScoreModel())
+    monkeypatch.setattr(api, "_model_loaded", True)
+    monkeypatch.setattr(api, "_job_tokens", api.TokenSetCache(2))
+
+
+def test_server_score_matches_training_jaccard():
+    body = client.post("/predict", json={"job_text": JOB, "cand_text": CAND, "situacao_norm": "prospect"}).json()
+    expected = score_tecnico(JOB, CAND)
+    assert expected > 0
+    assert body["details"]["score_tecnico"] == pytest.approx(expected)
+    assert body["details"]["score_source"] == "server"
+    assert body["y_prob"] == pytest.approx(expected)
+
+
+def test_client_score_kept_unless_mode_server():
+    payload = {"job_text": JOB, "cand_text": CAND, "situacao_norm": "prospect", "score_tecnico": 0.9}
+    body = client.post("/predict", json=payload).json()
+    assert body["details"]["score_source"] == "client"
+    assert body["details"]["score_tecnico"] == 0.9
+
+    body = client.post("/predict", json={**payload, "mode": "server"}).json()
+    assert body["details"]["score_source"] == "server"
+    assert body["details"]["score_tecnico"] == pytest.approx(score_tecnico(JOB, CAND))
+
+
+def test_job_tokens_cached_across_candidates():
+    cands = [{"cand_text": c, "situacao_norm": "prospect"} for c in (CAND, "Java Spring", "Python")]
+    body = client.post("/rank", json={"job_text": JOB, "candidates": cands}).json()
+    scores = {r["index"]: r["score_tecnico"] for r in body["results"]}
+    assert scores == {i: pytest.approx(score_tecnico(JOB, c["cand_text"])) for i, c in enumerate(cands)}
+
+    stats = api._job_tokens.stats()
+    assert stats["misses"] == 1 and stats["hits"] == 2 and stats["size"] == 1
+
+
+def test_batch_mixes_client_and_server_scores():
+    items = [
+        {"job_text": JOB, "cand_text": CAND, "situacao_norm": "prospect"},
+        {"job_text": JOB, "cand_text": CAND, "situacao_norm": "prospect", "score_tecnico": 0.75},
+    ]
+    results = client.post("/predict_batch", json={"items": items}).json()["results"]
+    assert results[0]["y_prob"] == pytest.approx(score_tecnico(JOB, CAND))
+    assert results[1]["y_prob"] == pytest.approx(0.75)
+
+
+def test_token_cache_is_bounded():
+    cache = api.TokenSetCache(2)
+    for text in ("a b", "c d", "e f", "a b"):
+        cache.get(text)
+    assert cache.stats() == {"max_size": 2, "size": 2, "hits": 0, "misses": 4}
+    assert api._jaccard(frozenset(), {"x"}) == 0.0
@@ -0,0 +1,78 @@
+import threading
+
+import numpy as np
+import pytest
+from fastapi.testclient import TestClient
+
+import src.api as api
+
+
+class SlowModel:
+    def __init__(self, gate: threading.Event):
+        self.gate = gate
+
+    def predict_proba(self, X):
+        self.gate.wait(timeout=5)
+        return np.tile([0.4, 0.6], (len(X), 1))
+
+
+@pytest.fixture()
+def cold(monkeypatch):
+    for name in ("_model", "_model_loaded", "_model_version", "_adapter", "_adapter_model", "_model_load_seconds",
+                 "_watcher", "_batcher"):
+        monkeypatch.setattr(api, name, getattr(api, name))
+    monkeypatch.setattr(api, "_model_loaded", False)
+    monkeypatch.setattr(api, "_startup", {k: None for k in api._startup} | {"state": "idle"})
+    monkeypatch.setattr(api, "MICROBATCH_ENABLED", False)
+    monkeypatch.setattr(api, "_cache", api.PredictionCache(16, 60))
+    gate = threading.Event()
+    monkeypatch.setattr(api, "_read_model", lambda: (SlowModel(gate), "slow", None))
+    return gate
+
+
+def test_lifespan_loads_in_background_with_readiness_gate(cold):
+    with TestClient(api.app) as client:
+        # processo vivo e aceitando conexões enquanto o modelo aquece
+        assert client.get("/health").status_code == 200
+        resp = client.get("/ready")
+        assert resp.status_code == 503 and resp.json()["status"] == "loading"
+
+        cold.set()
+        for _ in range(100):
+            resp = client.get("/ready")
+            if resp.status_code == 200:
+                break
+            threading.Event().wait(0.05)
+        body = resp.json()
+        assert resp.status_code == 200 and body["status"] == "ready"
+        assert body["model_version"] == "slow"
+        startup = body["startup"]
+        assert startup["state"] == "ready"
+        for key in ("import_seconds", "model_load_seconds", "warmup_seconds", "ready_seconds",
+                    "first_response_seconds"):
+            assert startup[key] is not None and startup[key] >= 0
+
+        metrics = client.get("/metrics").text
+        assert 'decision_startup_seconds{phase="first_response"}' in metrics
+        assert "decision_ready 1" in metrics
+
+
+def test_first_request_waits_for_load_when_lifespan_did_not_run(cold):
+    cold.set()
+    client = TestClient(api.app)
+    resp = client.post("/predict", json={
+        "job_text": "QA", "cand_text": "Selenium", "situacao_norm": "prospect", "score_tecnico": 0.2,
+    })
+    assert resp.status_code == 200 and resp.json()["y_prob"] == pytest.approx(0.6)
+    assert api._startup["state"] == "ready"
+
+
+def test_failed_startup_load_reports_error(cold, monkeypatch):
+    def boom():
+        raise RuntimeError("sem modelo")
+
+    monkeypatch.setattr(api, "_read_model", boom)
+    api._background_load()
+    resp = TestClient(api.app).get("/ready")
+    assert resp.status_code == 503
+    assert resp.json()["status"] == "error" and "sem modelo" in resp.json()["startup"]["error"]
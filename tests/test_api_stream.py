@@ -0,0 +1,99 @@
+import asyncio
+import json
+
+import numpy as np
+import pytest
+from fastapi.testclient import TestClient
+
+import src.api as api
+
+client = TestClient(api.app)
+
+
+class ScoreModel:
+    def __init__(self):
+        self.batch_sizes = []
+
+    def predict_proba(self, X):
+        self.batch_sizes.append(len(X))
+        p = X["score_tecnico"].astype(float).to_numpy()
+        return np.column_stack([1.0 - p, p])
+
+
+@pytest.fixture()
+def model(monkeypatch):
+    m = ScoreModel()
+    monkeypatch.setattr(api, "_model", m)
+    monkeypatch.setattr(api, "_model_loaded", True)
+    monkeypatch.setattr(api, "_threshold", 0.5)
+    monkeypatch.setattr(api, "_adapter", None)
+    monkeypatch.setattr(api, "_adapter_model", None)
+    monkeypatch.setattr(api, "STREAM_CHUNK_SIZE", 2)
+    api._adapter_for(m)
+    m.batch_sizes.clear()
+    return m
+
+
+def _line(score):
+    return json.dumps({
+        "job_text": "QA Selenium Java",
+        "cand_text": "Selenium WebDriver",
+        "situacao_norm": "prospect",
+        "score_tecnico": score,
+    })
+
+
+def _post(body: str):
+    resp = client.post("/predict_stream", content=body.encode("utf-8"),
+                       headers={"Content-Type": "application/x-ndjson"})
+    assert resp.status_code == 200
+    assert resp.headers["content-type"].startswith("application/x-ndjson")
+    return [json.loads(l) for l in resp.text.splitlines()]
+
+
+def test_stream_scores_in_chunks_and_keeps_order(model):
+    out = _post("\n".join(_line(s) for s in (0.9, 0.1, 0.6, 0.3, 0.7)) + "\n")
+    *results, summary = out
+    assert [r["line"] for r in results] == [1, 2, 3, 4, 5]
+    assert [r["y_prob"] for r in results] == pytest.approx([0.9, 0.1, 0.6, 0.3, 0.7])
+    assert [r["y_pred"] for r in results] == [1, 0, 1, 0, 1]
+    assert model.batch_sizes == [2, 2, 1]
+    assert summary == {"done": True, "n_lines": 5, "n_ok": 5, "n_errors": 0, "threshold": 0.5,
+                       "model_version": api._model_version}
+
+
+def test_stream_reports_errors_inline(model):
+    body = "\n".join([_line(0.8), "{nao json", "", json.dumps({"cand_text": "x", "situacao_norm": "prospect"}), "[1, 2]", _line(0.2)])
+    *results, summary = _post(body)
+    assert [r["line"] for r in results] == [1, 2, 4, 5, 6]
+    assert results[0]["y_prob"] == pytest.approx(0.8)
+    assert "JSON" in results[1]["error"]
+    assert any("job_text" in e["msg"] for e in results[2]["error"])
+    assert "objeto" in results[3]["error"]
+    assert results[4]["y_prob"] == pytest.approx(0.2)
+    assert summary["n_ok"] == 2 and summary["n_errors"] == 3 and summary["n_lines"] == 6
+
+
+def test_stream_oversized_line(model, monkeypatch):
+    monkeypatch.setattr(api, "MAX_STREAM_LINE_BYTES", 200)
+    body = _line(0.9) + "\n" + json.dumps({"job_text": "x" * 500}) + "\n" + _line(0.4)
+    *results, summary = _post(body)
+    assert "excede" in results[1]["error"]
+    assert results[2]["y_prob"] == pytest.approx(0.4)
+    assert summary["n_errors"] == 1
+
+
+def test_stream_parses_lines_off_the_event_loop(model, monkeypatch):
+    loops = []
+    parse = api._parse_stream_line
+
+    def spy(raw):
+        try:
+            loops.append(asyncio.get_running_loop())
+        except RuntimeError:
+            loops.append(None)
+        return parse(raw)
+
+    monkeypatch.setattr(api, "_parse_stream_line", spy)
+    *results, _ = _post("\n".join(_line(s) for s in (0.9, 0.1, 0.6)))
+    assert len(results) == 3 and loops == [None, None, None]
@@ -0,0 +1,203 @@
+import os
+
+import joblib
+import numpy as np
+import pandas as pd
+import pytest
+
+import src.api as api
+from src.compiled_scorer import CompiledScorer, SortedVocabulary, compile_pipeline, export
+from src.serve import ensure_shared_model
+from src.train_baseline import make_pipeline, score_tecnico
+
+JOBS = [
+    "Analista QA Selenium Java testes automatizados",
+    "Desenvolvedor Python FastAPI SQL",
+    "Engenheiro de dados Spark Airflow Python",
+    "Consultor SAP FI CO contabilidade",
+]
+CANDS = [
+    "Selenium WebDriver, Java, Cucumber",
+    "Python, Django, FastAPI, PostgreSQL",
+    "Spark Scala Airflow AWS",
+    "SAP FI, SAP CO, fechamento contábil",
+    "Atendimento ao cliente, vendas",
+    "Java Spring Boot microserviços",
+]
+
+
+def _frame():
+    rows = []
+    for i, job in enumerate(JOBS):
+        for j, cand in enumerate(CANDS):
+            rows.append({
+                "job_text": job,
+                "cand_text": cand,
+                "situacao_norm": "prospect" if (i + j) % 2 else "encaminhado ao requisitante",
+                "score_tecnico": score_tecnico(job, cand),
+                "y": int(i == j or (i == 0 and j == 5)),
+            })
+    return pd.DataFrame(rows)
+
+
+@pytest.fixture(scope="module")
+def trained():
+    df = _frame()
+    X = df[["job_text", "cand_text", "situacao_norm", "score_tecnico"]]
+    pipe = make_pipeline().fit(X, df["y"].values)
+    return pipe, X
+
+
+def test_compiled_parity_with_pipeline(trained):
+    pipe, X = trained
+    scorer = compile_pipeline(pipe)
+
+    expected = pipe.predict_proba(X)
+    got_df = scorer.predict_proba(X)
+    got_rows = scorer.predict_proba(X.to_dict("records"))
+
+    assert np.max(np.abs(expected - got_df)) < 1e-9
+    assert np.max(np.abs(expected - got_rows)) < 1e-9
+
+
+def test_compiled_parity_unseen_text(trained):
+    pipe, _ = trained
+    scorer = compile_pipeline(pipe)
+    X_new = pd.DataFrame([
+        {"job_text": "Vaga Java", "cand_text": "xyz", "situacao_norm": "prospect", "score_tecnico": 0.0},
+        {"job_text": "Python Spark", "cand_text": "Ámbito ÇÃO python", "situacao_norm": "x", "score_tecnico": 0.37},
+    ])
+    assert np.max(np.abs(pipe.predict_proba(X_new) - scorer.predict_proba(X_new))) < 1e-9
+
+
+def test_compile_rejects_unknown_pipeline():
+    with pytest.raises(ValueError):
+        compile_pipeline(object())
+
+
+def test_api_prefers_fresh_compiled_scorer(trained, tmp_path, monkeypatch):
+    pipe, X = trained
+    source = tmp_path / "model.joblib"
+    compiled = tmp_path / "model_compiled.joblib"
+    joblib.dump(pipe, source)
+    export(source, compiled)
+
+    monkeypatch.setattr(api, "MODELS_DIR", tmp_path)
+    monkeypatch.setattr(api, "COMPILED_MODEL_FILE", compiled)
+    monkeypatch.setattr(api, "_model", None)
+    monkeypatch.setattr(api, "_model_loaded", False)
+    monkeypatch.setattr(api, "_adapter", None)
+    monkeypatch.setattr(api, "_adapter_model", None)
+    monkeypatch.setattr(api, "_model_version", None)
+
+    api._load_model()
+    assert isinstance(api._model, CompiledScorer)
+    assert api._adapter == "records"
+    probas = api._predict_proba_rows(api._model, X.to_dict("records"))
+    assert np.max(np.abs(probas - pipe.predict_proba(X)[:, 1])) < 1e-9
+
+    # pipeline retreinado sem recompilar: o compilado é ignorado mesmo com mtime mais novo
+    joblib.dump(make_pipeline().fit(X.iloc[::-1], pipe.predict(X)[::-1]), source)
+    st = source.stat()
+    os.utime(compiled, (st.st_atime, st.st_mtime + 10))
+    api._load_model()
+    assert not isinstance(api._model, CompiledScorer)
+    assert api._adapter == "columns"
+
+    # compilado antigo, sem digest: também não é usado
+    joblib.dump(compile_pipeline(pipe), compiled)
+    api._load_model()
+    assert not isinstance(api._model, CompiledScorer)
+
+
+def test_rank_proba_matches_row_by_row(trained):
+    pipe, X = trained
+    scorer = compile_pipeline(pipe)
+    job = JOBS[1]
+    cands = [
+        {"cand_text": c, "situacao_norm": "prospect", "score_tecnico": score_tecnico(job, c)} for c in CANDS
+    ]
+    expected = pipe.predict_proba(pd.DataFrame([{"job_text": job, **c} for c in cands]))[:, 1]
+    assert np.max(np.abs(scorer.rank_proba(job, cands) - expected)) < 1e-9
+
+
+def test_api_rank_uses_compiled_scorer(trained, monkeypatch):
+    pipe, _ = trained
+    scorer = compile_pipeline(pipe)
+    monkeypatch.setattr(api, "_model", scorer)
+    monkeypatch.setattr(api, "_model_loaded", True)
+    monkeypatch.setattr(api, "_adapter", None)
+    monkeypatch.setattr(api, "_adapter_model", None)
+    calls = []
+    monkeypatch.setattr(scorer, "rank_proba", lambda job, rows: calls.append(job) or np.zeros(len(rows)))
+
+    from fastapi.testclient import TestClient
+    body = TestClient(api.app).post("/rank", json={
+        "job_text": JOBS[0],
+        "candidates": [{"cand_text": c, "situacao_norm": "prospect", "score_tecnico": 0.1} for c in CANDS],
+    }).json()
+    assert calls == [JOBS[0]]
+    assert len(body["results"]) == len(CANDS)
+
+
+def test_shared_layout_parity_and_mmap(trained, tmp_path):
+    pipe, X = trained
+    path = tmp_path / "model_shared.joblib"
+    joblib.dump(compile_pipeline(pipe).shared(), path)
+    scorer = joblib.load(path, mmap_mode="r")
+
+    assert isinstance(scorer.vocabulary, SortedVocabulary)
+    assert isinstance(scorer.vocabulary.terms, np.memmap)
+    assert isinstance(scorer.coef_text, np.memmap)
+    assert np.max(np.abs(scorer.predict_proba(X) - pipe.predict_proba(X))) < 1e-9
+    X_new = pd.DataFrame([
+        {"job_text": "Ámbito " + "z" * 80, "cand_text": "ÇÃO python", "situacao_norm": "x", "score_tecnico": 0.3},
+    ])
+    assert np.max(np.abs(scorer.predict_proba(X_new) - pipe.predict_proba(X_new))) < 1e-9
+
+
+def test_api_loads_shared_scorer_with_mmap(trained, tmp_path, monkeypatch):
+    pipe, X = trained
+    joblib.dump(pipe, tmp_path / "model.joblib")
+    shared = tmp_path / "model_shared.joblib"
+    assert ensure_shared_model(tmp_path / "model.joblib", shared) is True
+    mtime = shared.stat().st_mtime_ns
+    assert ensure_shared_model(tmp_path / "model.joblib", shared) is True  # atualizado: não reexporta
+    assert shared.stat().st_mtime_ns == mtime
+
+    monkeypatch.setattr(api, "MODELS_DIR", tmp_path)
+    monkeypatch.setattr(api, "SHARED_MODEL_FILE", shared)
+    monkeypatch.setattr(api, "COMPILED_MODEL_FILE", tmp_path / "model_compiled.joblib")
+    for name in ("_model", "_model_loaded", "_adapter", "_adapter_model", "_model_version"):
+        monkeypatch.setattr(api, name, getattr(api, name))
+
+    monkeypatch.setattr(api, "MODEL_MMAP_ENABLED", False)
+    assert api._model_candidates() == [tmp_path / "model.joblib"]
+
+    monkeypatch.setattr(api, "MODEL_MMAP_ENABLED", True)
+    api._load_model()
+    assert isinstance(api._model.idf, np.memmap)
+    probas = api._predict_proba_rows(api._model, X.to_dict("records"))
+    assert np.max(np.abs(probas - pipe.predict_proba(X)[:, 1])) < 1e-9
+
+
+def test_ensure_shared_model_reexports_when_source_changes(trained, tmp_path):
+    pipe, X = trained
+    source, shared = tmp_path / "model.joblib", tmp_path / "model_shared.joblib"
+    joblib.dump(pipe, source)
+    assert ensure_shared_model(source, shared) is True
+    before = joblib.load(shared).intercept
+
+    retrained = make_pipeline().set_params(clf__C=0.01).fit(X, pipe.predict(X))
+    joblib.dump(retrained, source)
+    st = shared.stat()
+    os.utime(source, (st.st_atime, st.st_mtime - 10))  # origem "mais velha" que o export
+    assert ensure_shared_model(source, shared) is True
+    after = joblib.load(shared)
+    assert after.intercept != before
+    assert np.max(np.abs(after.predict_proba(X) - retrained.predict_proba(X))) < 1e-9
+
+
+def test_ensure_shared_model_falls_back_when_not_compilable(tmp_path):
+    joblib.dump({"nao": "pipeline"}, tmp_path / "model.joblib")
+    assert ensure_shared_model(tmp_path / "model.joblib", tmp_path / "model_shared.joblib") is False
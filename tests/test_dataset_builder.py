@@ -0,0 +1,97 @@
+import json
+import os
+
+import pandas as pd
+import pytest
+
+from src.dataset_builder import load_pairs
+
+JOBS = {
+    "V1": {"informacoes_basicas": {"titulo_vaga": "Analista QA"}, "perfil_vaga": {"competencias": "Selenium Java"}},
+    "V2": {"informacoes_basicas": {"titulo_vaga": "Dev Python"}, "perfil_vaga": {"competencias": "Python SQL"}},
+}
+PROSPECTS = {
+    "V1": {"prospects": [
+        {"codigo": "10", "situacao_candidado": "Contratado pela Decision", "comentario": ""},
+        {"codigo": "11", "situacao_candidado": "Prospect", "comentario": "reprovado na entrevista"},
+    ]},
+    "V2": {"prospects": [
+        {"codigo": "12", "situacao_candidado": "Prospect", "comentario": ""},
+        "item inválido",
+    ]},
+}
+APPLICANTS = {
+    "10": {"infos_basicas": {"objetivo_profissional": "QA"}, "cv_pt": "Selenium Java testes"},
+    "11": {"infos_basicas": {"objetivo_profissional": "QA"}, "cv_pt": "Cypress"},
+    "12": {"infos_basicas": {"objetivo_profissional": "Dev"}, "cv_pt": "Python FastAPI SQL"},
+}
+
+
+@pytest.fixture
+def raw(tmp_path):
+    paths = {}
+    for name, obj in (("Jobs.json", JOBS), ("Prospects.json", PROSPECTS), ("Applicants.json", APPLICANTS)):
+        paths[name] = tmp_path / name
+        paths[name].write_text(json.dumps(obj), encoding="utf-8")
+    return paths
+
+
+def test_pairs_table_and_labels(raw, tmp_path):
+    df, info = load_pairs(raw, cache_dir=tmp_path / "cache", verbose=False)
+    assert not info["hit"] and info["rows"] == 3
+    assert list(df["candidato_code"]) == ["10", "11", "12"]
+    # y usa o comentário como fallback; y_status (drift report) não
+    assert df["y"].tolist()[:2] == [1, 0] and pd.isna(df["y"].iloc[2])
+    assert df["y_status"].iloc[0] == 1 and df["y_status"].iloc[1:].isna().all()
+    assert df.loc[0, "score_tecnico"] > df.loc[1, "score_tecnico"]
+
+
+def test_cache_hit_then_invalidated_by_content_change(raw, tmp_path):
+    cache = tmp_path / "cache"
+    first, info1 = load_pairs(raw, cache_dir=cache, verbose=False)
+    again, info2 = load_pairs(raw, cache_dir=cache, verbose=False)
+    assert info2["hit"] and info2["key"] == info1["key"]
+    pd.testing.assert_frame_equal(first, again)
+
+    # mesmo tamanho e mtime: o memo de hashes não relê o arquivo
+    st = raw["Prospects.json"].stat()
+    changed = raw["Prospects.json"].read_text(encoding="utf-8").replace('"12"', '"10"')
+    raw["Prospects.json"].write_text(changed, encoding="utf-8")
+    os.utime(raw["Prospects.json"], ns=(st.st_atime_ns, st.st_mtime_ns + 1))
+    df, info3 = load_pairs(raw, cache_dir=cache, verbose=False)
+    assert not info3["hit"] and info3["key"] != info1["key"]
+    assert list(df["candidato_code"]) == ["10", "11", "10"]
+    assert len(list(cache.glob("pairs-*"))) == 2  # tabela + manifesto só da chave atual
+
+    _, info4 = load_pairs(raw, cache_dir=cache, refresh=True, verbose=False)
+    assert not info4["hit"] and info4["key"] == info3["key"]
+
+
+def test_cache_invalidated_by_label_rules(raw, tmp_path, monkeypatch):
+    import src.dataset_builder as db
+    import src.train_baseline as tb
+
+    cache = tmp_path / "cache"
+    _, info1 = load_pairs(raw, cache_dir=cache, verbose=False)
+
+    # sem "contratado" nas regras positivas: nova chave e o rótulo é recalculado
+    pos = set(tb.POS_KEYS) - {"contratado"}
+    monkeypatch.setattr(tb, "POS_KEYS", pos)
+    monkeypatch.setattr(db, "POS_KEYS", pos)
+    df, info2 = load_pairs(raw, cache_dir=cache, verbose=False)
+    assert not info2["hit"] and info2["key"] != info1["key"]
+    assert pd.isna(df["y"].iloc[0]) and df["y"].iloc[1] == 0
+
+
+def test_rebuild_streams_pairs_in_row_groups(raw, tmp_path, monkeypatch):
+    import pyarrow.parquet as pq
+
+    import src.dataset_builder as db
+
+    monkeypatch.setattr(db, "ROW_GROUP_ROWS", 2)
+    table, info = db.pairs_table(raw, cache_dir=tmp_path / "cache", verbose=False)
+    assert table.suffix == ".parquet" and info["rows"] == 3
+    assert pq.ParquetFile(table).metadata.num_row_groups == 2
+
+    expected = db.build_pairs(JOBS, PROSPECTS, db.applicant_texts(APPLICANTS.items()))
+    pd.testing.assert_frame_equal(pd.read_parquet(table), expected)
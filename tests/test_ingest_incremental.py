@@ -0,0 +1,74 @@
+import json
+
+import pandas as pd
+
+from src.interim_store import read_interim, write_interim
+from src.load_jsons import ingest_incremental, load_applicants, load_prospects, prospect_rows, record_row
+
+APPLICANTS = {
+    "001": {"infos_basicas": {"nome": "Ana"}, "cv_pt": "Selenium Java"},
+    "002": {"infos_basicas": {"nome": "Bruno"}, "cv_pt": "Python SQL"},
+    "003": {"infos_basicas": {"nome": "Caio"}, "cv_pt": "SAP FI"},
+}
+PROSPECTS = {
+    "10": {"titulo": "QA", "modalidade": "", "prospects": [
+        {"codigo": "001", "situacao_candidado": "Prospect", "data_candidatura": "01-02-2021", "recrutador": "Rita"},
+        {"codigo": "002", "situacao_candidado": "Contratado pela Decision", "recrutador": "Rita"},
+    ]},
+    "20": {"titulo": "Dev", "modalidade": "PJ", "prospects": [{"codigo": "003", "situacao_candidado": "Prospect"}]},
+}
+
+
+def _applicant_rows(k, v):
+    return [record_row("candidato_code", k, v)]
+
+
+def _full(tmp_path, name, df):
+    base = tmp_path / "full"
+    write_interim(df, name, base)
+    return read_interim(name, base=base)
+
+
+def _same(a, b):
+    cols = sorted(a.columns)
+    assert sorted(b.columns) == cols
+    pd.testing.assert_frame_equal(a[cols], b[cols], check_dtype=False, check_categorical=False)
+
+
+def test_incremental_applicants_tracks_changes_and_matches_full_load(tmp_path):
+    raw = tmp_path / "Applicants.json"
+    out = tmp_path / "interim"
+    raw.write_text(json.dumps(APPLICANTS), encoding="utf-8")
+
+    first = ingest_incremental("applicants", raw, "candidato_code", _applicant_rows, out)
+    assert (first["new"], first["changed"], first["unchanged"], first["deleted"]) == (3, 0, 0, 0)
+
+    same = ingest_incremental("applicants", raw, "candidato_code", _applicant_rows, out)
+    assert (same["new"], same["changed"], same["unchanged"], same["deleted"]) == (0, 0, 3, 0)
+
+    data = {k: v for k, v in APPLICANTS.items() if k != "002"}   # removido
+    data["001"] = {**APPLICANTS["001"], "cv_pt": "Cypress"}      # alterado
+    data["000"] = {"infos_basicas": {"nome": "Zoe"}, "extra": 1}  # novo (coluna nova, no início)
+    raw.write_text(json.dumps(data), encoding="utf-8")
+    info = ingest_incremental("applicants", raw, "candidato_code", _applicant_rows, out)
+    assert (info["new"], info["changed"], info["unchanged"], info["deleted"]) == (1, 1, 1, 1)
+
+    got = read_interim("applicants", base=out)
+    assert got["candidato_code"].tolist() == ["001", "003", "000"]  # ordem do arquivo atual
+    _same(got, _full(tmp_path, "applicants", load_applicants(raw)))
+    state = json.loads((out / "_state" / "applicants.json").read_text(encoding="utf-8"))
+    assert state["deleted_keys"] == ["002"] and set(state["hashes"]) == {"000", "001", "003"}
+
+
+def test_incremental_prospects_reflattens_only_changed_vagas(tmp_path):
+    raw = tmp_path / "Prospects.json"
+    out = tmp_path / "interim"
+    raw.write_text(json.dumps(PROSPECTS), encoding="utf-8")
+    ingest_incremental("prospects", raw, "vaga_code", prospect_rows, out)
+
+    data = json.loads(json.dumps(PROSPECTS))
+    data["20"]["prospects"].append({"codigo": "001", "situacao_candidado": "Encaminhado ao Requisitante"})
+    raw.write_text(json.dumps(data), encoding="utf-8")
+    info = ingest_incremental("prospects", raw, "vaga_code", prospect_rows, out)
+    assert (info["changed"], info["unchanged"], info["rows"]) == (1, 1, 4)
+    _same(read_interim("prospects", base=out), _full(tmp_path, "prospects", load_prospects(raw)))
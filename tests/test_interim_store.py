@@ -0,0 +1,53 @@
+import pandas as pd
+import pytest
+
+from src.interim_store import apply_schema, read_interim, write_interim
+
+PROSPECTS = pd.DataFrame({
+    "vaga_code": ["0101", "0101", "0202"],
+    "candidato_code": ["007", None, "31000"],
+    "nome": ["Ana", "Bia", "Caio"],
+    "situacao_norm": ["prospect", "contratado pela decision", "prospect"],
+    "modalidade": ["", "PJ", ""],
+    "recrutador": ["Rita", "Rita", "Joao"],
+    "data_candidatura": ["25-03-2021", "01-12-2020", None],
+    "n_misto": [1, "dois", 3],
+    "n_int": [1, 2, 3],
+})
+
+
+def test_write_and_read_typed_parquet(tmp_path):
+    written = write_interim(PROSPECTS, "prospects", tmp_path)
+    assert [p.name for p in written] == ["prospects.parquet"]
+
+    df = read_interim("prospects", base=tmp_path)
+    assert df["vaga_code"].tolist() == ["0101", "0101", "0202"]  # zeros à esquerda preservados
+    assert df["candidato_code"].tolist()[0] == "007" and pd.isna(df["candidato_code"].iloc[1])
+    for c in ("situacao_norm", "modalidade", "recrutador"):
+        assert isinstance(df[c].dtype, pd.CategoricalDtype)
+    assert pd.api.types.is_datetime64_any_dtype(df["data_candidatura"])
+    assert df["data_candidatura"].iloc[0] == pd.Timestamp(2021, 3, 25)
+    assert df["n_misto"].tolist() == ["1", "dois", "3"]
+    assert df["n_int"].tolist() == [1, 2, 3]
+
+
+def test_read_only_requested_columns(tmp_path):
+    write_interim(PROSPECTS, "prospects", tmp_path)
+    df = read_interim("prospects", columns=["vaga_code", "situacao", "nome"], base=tmp_path)
+    assert list(df.columns) == ["vaga_code", "nome"]  # ausentes ficam a cargo de quem chama
+
+
+def test_csv_fallback_applies_same_schema(tmp_path):
+    PROSPECTS.to_csv(tmp_path / "prospects.csv", index=False)
+    df = read_interim("prospects", columns=["vaga_code", "candidato_code", "situacao_norm"], base=tmp_path)
+    expected = apply_schema(PROSPECTS[["vaga_code", "candidato_code", "situacao_norm"]])
+    assert df["vaga_code"].tolist() == expected["vaga_code"].tolist()
+    assert isinstance(df["situacao_norm"].dtype, pd.CategoricalDtype)
+
+    with pytest.raises(FileNotFoundError):
+        read_interim("jobs", base=tmp_path)
+
+
+def test_write_with_legacy_csv(tmp_path):
+    written = write_interim(PROSPECTS, "prospects", tmp_path, csv=True)
+    assert {p.name for p in written} == {"prospects.parquet", "prospects.csv"}
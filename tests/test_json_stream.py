@@ -0,0 +1,85 @@
+import json
+
+import pandas as pd
+import pytest
+
+from src.json_stream import iter_json_items
+from src.interim_store import write_interim
+from src.load_jsons import load_applicants, write_applicants_streaming
+
+DATA = {
+    "001": {"infos_basicas": {"nome": "Ana \"QA\"", "email": "a@x.com"}, "cv_pt": "Selenium {Java} [testes]"},
+    "002": {"infos_basicas": {"nome": "Bruno"}, "formacao_e_idiomas": {"idiomas": ["pt", "en"]}, "n": 12345},
+    "003": {"cargo_atual": {"cargo": "Analista"}, "cv_pt": "Python, SQL — ação\n\tlinha"},
+    "004": 987654321,
+    "005": None,
+}
+
+
+@pytest.mark.parametrize("chunk_chars", [1, 3, 7, 64, 1 << 20])
+@pytest.mark.parametrize("indent", [None, 2])
+def test_iter_json_items_matches_json_loads(tmp_path, chunk_chars, indent):
+    path = tmp_path / "Applicants.json"
+    path.write_text(json.dumps(DATA, ensure_ascii=False, indent=indent), encoding="utf-8")
+    items = list(iter_json_items(path, chunk_chars=chunk_chars))
+    assert items == list(DATA.items())
+
+
+def test_iter_json_items_empty_and_invalid(tmp_path):
+    path = tmp_path / "x.json"
+    path.write_text(" { } ", encoding="utf-8")
+    assert list(iter_json_items(path)) == []
+
+    for bad in ('{"a": 1', '{"a": 1 "b": 2}', '[1, 2]', ""):
+        path.write_text(bad, encoding="utf-8")
+        with pytest.raises(ValueError):
+            list(iter_json_items(path, chunk_chars=4))
+
+
+def test_streaming_applicants_match_full_load(tmp_path):
+    src = tmp_path / "Applicants.json"
+    src.write_text(json.dumps(DATA, ensure_ascii=False), encoding="utf-8")
+    info = write_applicants_streaming(src, tmp_path, batch_size=2, csv=True)
+
+    # mesmo CSV do modo sem stream
+    load_applicants(src).to_csv(tmp_path / "full.csv", index=False)
+    expected = pd.read_csv(tmp_path / "full.csv", dtype=str)
+    got = pd.read_csv(info["csv"], dtype=str)
+    assert info["rows"] == len(expected) == 5
+    assert got["candidato_code"].tolist() == ["001", "002", "003", "004", "005"]
+    pd.testing.assert_frame_equal(got, expected)
+
+
+def test_streaming_applicants_parquet_schema_matches_write_interim(tmp_path):
+    pytest.importorskip("pyarrow")
+    data = {
+        "001": {"infos_basicas": {"nome": "Ana", "idade": 30, "codigo": "000123"}, "cod": 7, "recrutador": "Rita",
+                "data_candidatura": "25-03-2021"},
+        "002": {"infos_basicas": {"nome": "Bruno", "idade": 41, "codigo": "000456"}, "n": 12345, "recrutador": "Ana"},
+        "003": {"infos_basicas": {"nome": None, "idade": 22}, "cod": "007", "score": 1.5, "flag": True},
+        "004": 987654321,
+        "005": {"infos_basicas": {"idade": 50}, "score": 2, "recrutador": "Zé", "data_candidatura": "01-02-2020 10:00"},
+    }
+    src = tmp_path / "Applicants.json"
+    src.write_text(json.dumps(data, ensure_ascii=False), encoding="utf-8")
+    (tmp_path / "stream").mkdir()
+    info = write_applicants_streaming(src, tmp_path / "stream", batch_size=2, csv=True)
+    write_interim(load_applicants(src), "applicants", tmp_path / "full", csv=True)
+
+    got = pd.read_parquet(info["parquet"])
+    expected = pd.read_parquet(tmp_path / "full" / "applicants.parquet")
+    pd.testing.assert_frame_equal(got, expected)
+    assert str(got["recrutador"].dtype) == "category"
+    assert got["data_candidatura"].dtype.kind == "M" and got["infos_basicas__idade"].dtype == float
+    assert sorted((tmp_path / "stream").iterdir()) == sorted([info["parquet"], info["csv"]])  # spool removido
+    pd.testing.assert_frame_equal(pd.read_csv(info["csv"], dtype=str),
+                                  pd.read_csv(tmp_path / "full" / "applicants.csv", dtype=str))
+
+
+def test_iter_json_items_with_raw_text(tmp_path):
+    path = tmp_path / "x.json"
+    text = '{"a": {"x": [1, 2]},\n "b" :  "texto, com {chaves}" , "c": 12345}'
+    path.write_text(text, encoding="utf-8")
+    items = list(iter_json_items(path, chunk_chars=3, with_raw=True))
+    assert [(k, raw) for k, _, raw in items] == [("a", '{"x": [1, 2]}'), ("b", '"texto, com {chaves}"'), ("c", "12345")]
+    assert [json.loads(raw) for _, _, raw in items] == [v for _, v, _ in items]
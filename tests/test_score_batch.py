@@ -0,0 +1,75 @@
+import joblib
+import numpy as np
+import pandas as pd
+import pytest
+
+import src.api as api
+from src.feature_store import build
+from src.score_batch import run
+from src.train_baseline import make_pipeline, score_tecnico
+
+CVS = ["Selenium Java testes", "Python FastAPI SQL", "Spark Airflow Python", "SAP FI CO", "Java Spring testes"]
+JOBS = ["Analista QA Selenium Java", "Desenvolvedor Python SQL", "Consultor SAP FI"]
+
+
+@pytest.fixture(scope="module")
+def model_path(tmp_path_factory):
+    rows = [
+        {"job_text": j, "cand_text": c, "situacao_norm": "prospect", "score_tecnico": score_tecnico(j, c)}
+        for j in JOBS for c in CVS
+    ]
+    df = pd.DataFrame(rows)
+    pipe = make_pipeline().fit(df, (df["score_tecnico"] > 0.1).astype(int).values)
+    path = tmp_path_factory.mktemp("m") / "model.joblib"
+    joblib.dump(pipe, path)
+    return path
+
+
+def _pairs():
+    return pd.DataFrame([
+        {"vaga_code": f"V{i}", "candidato_code": str(k), "job_text": j, "cand_text": c, "situacao_norm": "prospect"}
+        for i, j in enumerate(JOBS) for k, c in enumerate(CVS)
+    ])
+
+
+def _api_probas(model_path, pairs):
+    model = joblib.load(model_path)
+    rows = [
+        {"job_text": r.job_text, "cand_text": r.cand_text, "situacao_norm": r.situacao_norm,
+         "score_tecnico": api._resolve_score(r.job_text, r.cand_text, None, "server")[0]}
+        for r in pairs.itertuples()
+    ]
+    return api._predict_proba_rows(model, rows, api._resolve_adapter(model))
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_score_batch_matches_api_in_input_order(model_path, tmp_path, workers):
+    pairs = _pairs()
+    pairs.to_csv(tmp_path / "pairs.csv", index=False)
+    info = run(tmp_path / "pairs.csv", tmp_path / "out.csv", model_path, workers=workers, chunk_size=4,
+               threshold=0.5)
+
+    out = pd.read_csv(tmp_path / "out.csv", dtype={"candidato_code": str})
+    assert info["rows"] == len(pairs) and info["rows_per_s"] > 0
+    assert list(out["vaga_code"]) == list(pairs["vaga_code"])
+    assert list(out["candidato_code"]) == list(pairs["candidato_code"])
+    assert np.allclose(out["y_prob"], _api_probas(model_path, pairs), atol=1e-12)
+    assert (out["y_pred"] == (out["y_prob"] >= 0.5).astype(int)).all()
+
+
+def test_score_batch_ids_from_feature_store_to_parquet(model_path, tmp_path):
+    pytest.importorskip("pyarrow")
+    applicants = {str(k): {"cv_pt": c} for k, c in enumerate(CVS)}
+    jobs = {f"V{i}": {"perfil_vaga": {"competencias": j}} for i, j in enumerate(JOBS)}
+    build(tmp_path / "fs.sqlite", applicants, jobs)
+
+    ids = _pairs()[["vaga_code", "candidato_code", "situacao_norm"]]
+    ids = pd.concat([ids, pd.DataFrame([{"vaga_code": "V0", "candidato_code": "999", "situacao_norm": "x"}])])
+    ids.to_parquet(tmp_path / "ids.parquet", index=False)
+    run(tmp_path / "ids.parquet", tmp_path / "out.parquet", model_path, tmp_path / "fs.sqlite", chunk_size=7,
+        threshold=0.5)
+
+    out = pd.read_parquet(tmp_path / "out.parquet")
+    assert len(out) == len(ids)
+    assert np.allclose(out["y_prob"].iloc[:-1], _api_probas(model_path, _pairs()), atol=1e-12)
+    assert pd.isna(out["y_prob"].iloc[-1]) and "candidato_code" in out["error"].iloc[-1]
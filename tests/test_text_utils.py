@@ -0,0 +1,21 @@
+import subprocess
+import sys
+from pathlib import Path
+
+from src import train_baseline
+from src.text_utils import score_tecnico, tokenize
+
+ROOT = Path(__file__).resolve().parents[1]
+
+
+def test_tokenize_and_score_tecnico():
+    assert tokenize("Python, SQL/AWS  python") == {"python", "sql", "aws"}
+    assert score_tecnico("Python SQL", "python excel") == 1 / 3
+    assert score_tecnico("", "python") == 0.0
+    assert train_baseline.tokenize is tokenize and train_baseline.score_tecnico is score_tecnico
+
+
+def test_api_import_does_not_load_training_module():
+    code = "import sys, src.api; print('src.train_baseline' in sys.modules)"
+    out = subprocess.run([sys.executable, "-c", code], cwd=ROOT, capture_output=True, text=True, check=True)
+    assert out.stdout.strip() == "False"
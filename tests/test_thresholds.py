@@ -0,0 +1,69 @@
+import numpy as np
+import pytest
+from sklearn.metrics import f1_score, precision_score, recall_score, roc_curve
+
+from src.thresholds import best_threshold, confusion_curve, objective_values
+from src.train_baseline import DEFAULT_THRESHOLD, choose_threshold
+
+
+@pytest.fixture
+def data():
+    rng = np.random.default_rng(0)
+    y = (rng.random(500) < 0.4).astype(int)
+    scores = np.round(np.clip(rng.normal(0.4 + 0.2 * y, 0.15), 0, 1), 2)  # arredonda: força empates
+    return scores, y
+
+
+def _brute(scores, y, metric):
+    # referência O(n²): avalia cada threshold distinto com uma máscara completa
+    return max((metric(scores >= t), -t) for t in np.unique(scores))
+
+
+def test_confusion_counts_match_masks(data):
+    scores, y = data
+    curve = confusion_curve(scores, y)
+    assert np.all(np.diff(curve.thresholds) < 0)
+    assert (curve.tp[0], curve.fp[0]) == (0, 0)
+    for t, tp, fp, fn, tn in zip(*curve):
+        pred = scores >= t
+        assert (tp, fp, fn, tn) == ((pred & (y == 1)).sum(), (pred & (y == 0)).sum(),
+                                    (~pred & (y == 1)).sum(), (~pred & (y == 0)).sum())
+
+
+def test_youden_matches_roc_curve(data):
+    scores, y = data
+    fpr, tpr, thr = roc_curve(y, scores)
+    t, j = best_threshold(scores, y, "youden")
+    assert j == pytest.approx(np.max(tpr - fpr))
+    assert t in thr
+
+
+@pytest.mark.parametrize("objective, metric", [
+    ("f1", lambda y, p: f1_score(y, p)),
+    ("cost", lambda y, p: -(2.0 * ((p == 1) & (y == 0)).sum() + 5.0 * ((p == 0) & (y == 1)).sum())),
+])
+def test_objectives_match_brute_force(data, objective, metric):
+    scores, y = data
+    kw = {"cost_fp": 2.0, "cost_fn": 5.0} if objective == "cost" else {}
+    t, value = best_threshold(scores, y, objective, **kw)
+    best_value, neg_t = _brute(scores, y, lambda p: metric(y, p.astype(int)))
+    assert value == pytest.approx(best_value)
+    assert t == pytest.approx(-neg_t)  # empate: maior threshold
+
+
+def test_precision_at_recall(data):
+    scores, y = data
+    t, prec = best_threshold(scores, y, "precision_at_recall", min_recall=0.8)
+    pred = (scores >= t).astype(int)
+    assert recall_score(y, pred) >= 0.8
+    assert prec == pytest.approx(precision_score(y, pred))
+    values = objective_values(confusion_curve(scores, y), "precision_at_recall", min_recall=1.01)
+    assert np.isneginf(values).all()
+
+
+def test_choose_threshold_fallbacks(data):
+    scores, y = data
+    assert choose_threshold(scores, np.ones_like(y)) == DEFAULT_THRESHOLD
+    assert choose_threshold(scores, y, "precision_at_recall", min_recall=1.01) == DEFAULT_THRESHOLD
+    with pytest.raises(ValueError):
+        choose_threshold(scores, y, "acuracia")
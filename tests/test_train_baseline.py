@@ -0,0 +1,82 @@
+import copy
+import pickle
+import warnings
+
+import numpy as np
+import pandas as pd
+from sklearn.base import clone
+from sklearn.feature_extraction.text import TfidfVectorizer
+
+from src.train_baseline import (
+    CachedAnalyzer,
+    _fitted_tfidf,
+    concat_cols_df,
+    fit_steps,
+    make_pipeline,
+    release_analyzer,
+    warm_start_coef,
+)
+
+
+def _data(n=200, seed=0):
+    rng = np.random.default_rng(seed)
+    y = (rng.random(n) < 0.5).astype(int)
+    X = pd.DataFrame({
+        "job_text": "Python SQL",
+        "cand_text": [" ".join(rng.choice(["Python", "SQL", "AWS", "Ação"] if t else ["Excel", "Vendas", "SAP"], 3))
+                      for t in y],
+        "situacao_norm": rng.choice(["Prospect", "Encaminhado"], n),
+        "score_tecnico": rng.random(n),
+    })
+    return X, y
+
+
+def test_cached_analyzer_matches_default_and_is_shared():
+    X, _ = _data()
+    analyzer = CachedAnalyzer()
+    default = TfidfVectorizer().build_analyzer()
+    docs = concat_cols_df(X).tolist()
+    assert [analyzer(d) for d in docs] == [default(d) for d in docs]
+    assert analyzer.hits == len(docs) - len(set(docs))
+    assert copy.deepcopy(analyzer) is analyzer
+    pipe = make_pipeline().set_params(prep__text__tfidf__analyzer=analyzer)
+    assert clone(pipe).get_params()["prep__text__tfidf__analyzer"] is analyzer
+
+
+def test_fit_steps_matches_plain_pipeline_and_releases_analyzer():
+    X, y = _data()
+    plain = make_pipeline().fit(X, y)
+    with warnings.catch_warnings():
+        warnings.simplefilter("error")  # sem o aviso "token_pattern will not be used"
+        pipe, Xt = fit_steps(X, y, CachedAnalyzer())
+    assert (abs(Xt - plain.named_steps["prep"].transform(X)) > 1e-12).nnz == 0
+
+    release_analyzer(pipe)
+    fitted = _fitted_tfidf(pipe.named_steps["prep"])
+    assert fitted.analyzer == "word" and fitted.token_pattern == TfidfVectorizer().token_pattern
+    assert b"CachedAnalyzer" not in pickle.dumps(pipe)
+    np.testing.assert_allclose(pipe.predict_proba(X), plain.predict_proba(X))
+
+
+def test_warm_start_maps_coefficients_by_term():
+    X, y = _data(300)
+    X_tr, y_tr = X.iloc[:150], y[:150]
+    X_tr = X_tr.assign(cand_text=X_tr["cand_text"].str.replace("AWS", "Python"))  # 'aws' só no corpus completo
+    analyzer = CachedAnalyzer()
+    holdout, _ = fit_steps(X_tr, y_tr, analyzer)
+    full, _ = fit_steps(X, y, analyzer, warm_from=holdout)
+    cold = make_pipeline().fit(X, y)
+
+    # mesmo ótimo (problema convexo), em menos iterações
+    np.testing.assert_allclose(full.predict_proba(X), cold.predict_proba(X), atol=1e-3)
+    assert full.named_steps["clf"].n_iter_[0] <= cold.named_steps["clf"].n_iter_[0]
+    assert full.named_steps["clf"].warm_start is False
+
+    prep = full.named_steps["prep"]
+    coef, _ = warm_start_coef(holdout, prep, prep.transform(X).shape[1])
+    src_vocab = _fitted_tfidf(holdout.named_steps["prep"]).vocabulary_
+    dst_vocab = _fitted_tfidf(prep).vocabulary_
+    src_coef = holdout.named_steps["clf"].coef_[0]
+    assert coef[0, dst_vocab["python"]] == src_coef[src_vocab["python"]]
+    assert "aws" not in src_vocab and coef[0, dst_vocab["aws"]] == 0
+    assert coef[0, -1] == src_coef[-1]  # score_tecnico
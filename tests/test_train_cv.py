@@ -0,0 +1,37 @@
+import numpy as np
+import pandas as pd
+
+from src.train_cv import run_cv
+
+
+def _data(n=80):
+    rng = np.random.default_rng(0)
+    y = np.array([1, 0] * (n // 2))
+    words = np.array(["python", "sql", "java", "selenium", "excel", "vendas"])
+    cand = [" ".join(rng.choice(words[:3] if t else words[3:], 4)) for t in y]
+    X = pd.DataFrame({
+        "job_text": ["python sql java"] * n,
+        "cand_text": cand,
+        "situacao_norm": rng.choice(["prospect", "encaminhado"], n),
+        "score_tecnico": rng.random(n),
+    })
+    return X, y
+
+
+def test_parallel_folds_match_serial():
+    X, y = _data()
+    serial = run_cv(X, y, n_splits=3, n_jobs=1)
+    parallel = run_cv(X, y, n_splits=3, n_jobs=2)
+    assert [r["fold"] for r in parallel] == [1, 2, 3]
+    drop = lambda rs: [{k: v for k, v in r.items() if k != "seconds"} for r in rs]  # noqa: E731
+    assert drop(parallel) == drop(serial)
+    assert all(r["seconds"] > 0 for r in parallel)
+
+
+def test_resolve_n_jobs():
+    from src.train_cv import resolve_n_jobs
+
+    assert resolve_n_jobs(1, 5) == 1
+    assert resolve_n_jobs(8, 5) == 5
+    assert resolve_n_jobs(0, 5) == 1
+    assert 1 <= resolve_n_jobs(-1, 5) <= 5
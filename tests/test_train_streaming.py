@@ -0,0 +1,84 @@
+import numpy as np
+import pandas as pd
+from sklearn.model_selection import train_test_split
+
+from src.dataset_builder import _write_table, iter_pair_chunks
+from src.train_baseline import PCTL_NEG, PCTL_POS
+from src.train_streaming import fit_streaming, holdout_mask, plan_labels, predict_streaming
+
+
+def _table(tmp_path, n=400):
+    rng = np.random.default_rng(0)
+    good = rng.random(n) < 0.5
+    y = pd.array(np.where(rng.random(n) < 0.6, good.astype(int), None), dtype="Int8")
+    df = pd.DataFrame({
+        "vaga_code": rng.integers(0, 20, n).astype(str),
+        "candidato_code": rng.integers(0, 150, n).astype(str),  # gera duplicatas vaga-candidato
+        "job_text": "python sql",
+        "cand_text": np.where(good, "python sql aws", "excel vendas"),
+        "situacao_norm": "prospect",
+        "score_tecnico": rng.random(n),
+        "y_status": y,
+        "y": y,
+    })
+    return df, _write_table(df, tmp_path / "pairs-test")
+
+
+def _baseline_labels(df):
+    # as regras de train_baseline.main, em memória
+    df = df.copy()
+    unlabeled = df["y"].isna()
+    scores = df.loc[unlabeled, "score_tecnico"].values
+    t_pos = float(np.nanpercentile(scores, PCTL_POS * 100))
+    t_neg = float(np.nanpercentile(scores, PCTL_NEG * 100))
+    df.loc[unlabeled & (df["score_tecnico"] >= t_pos), "y"] = 1
+    df.loc[unlabeled & (df["score_tecnico"] <= t_neg), "y"] = 0
+    df = df.dropna(subset=["y"])
+    return df.drop_duplicates(subset=["vaga_code", "candidato_code"], keep="last")
+
+
+def test_chunks_cover_table_in_order(tmp_path):
+    df, table = _table(tmp_path)
+    chunks = list(iter_pair_chunks(table, chunk_rows=64, columns=["candidato_code", "score_tecnico"]))
+    assert [len(c) for c in chunks][:-1] == [64] * (len(chunks) - 1)
+    got = pd.concat(chunks)
+    assert got.index.tolist() == list(range(len(df)))
+    assert got["candidato_code"].tolist() == df["candidato_code"].tolist()
+
+
+def test_labels_and_holdout_match_baseline(tmp_path):
+    df, table = _table(tmp_path)
+    labels = plan_labels(table, chunk_rows=50)
+    expected = _baseline_labels(df)
+    kept = np.flatnonzero(labels >= 0)
+    assert kept.tolist() == expected.index.tolist()
+    assert labels[kept].tolist() == expected["y"].astype(int).tolist()
+
+    is_val = holdout_mask(labels)
+    _, X_val, _, _ = train_test_split(expected, expected["y"].astype(int).values, test_size=0.20,
+                                      stratify=expected["y"].astype(int).values, random_state=42)
+    assert np.flatnonzero(is_val).tolist() == sorted(X_val.index)
+
+
+def test_fit_streaming_learns_and_is_servable(tmp_path):
+    _, table = _table(tmp_path)
+    labels = plan_labels(table, chunk_rows=50)
+    pipe, stats = fit_streaming(table, labels, labels >= 0, epochs=3, chunk_rows=50, n_features=2 ** 10)
+    assert stats["rows_seen"] == 3 * int((labels >= 0).sum())
+
+    proba = predict_streaming(pipe, table, labels, chunk_rows=70)
+    assert np.isnan(proba[labels < 0]).all()
+    rows = [{"job_text": "python sql", "cand_text": t, "situacao_norm": "prospect", "score_tecnico": 0.5}
+            for t in ("python sql aws", "excel vendas")]
+    p_good, p_bad = pipe.predict_proba(pd.DataFrame(rows))[:, 1]
+    assert p_good > p_bad
+
+
+def test_score_scaler_sees_every_chunk(tmp_path):
+    df, table = _table(tmp_path)
+    labels = plan_labels(table, chunk_rows=50)
+    pipe, _ = fit_streaming(table, labels, labels >= 0, epochs=1, chunk_rows=50, n_features=2 ** 10)
+    scaler = pipe.named_steps["prep"].named_transformers_["score"].named_steps["scaler"]
+    scores = df["score_tecnico"].to_numpy()[labels >= 0]
+    assert scaler.n_samples_seen_ == len(scores)
+    assert np.isclose(scaler.scale_[0], scores.std())
@@ -0,0 +1,70 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.tune import TransformCache, _stratified_order, expand_grid, successive_halving
+
+
+def _data(n, seed):
+    rng = np.random.default_rng(seed)
+    y = (rng.random(n) < 0.5).astype(int)
+    X = pd.DataFrame({
+        "job_text": "python sql",
+        "cand_text": [" ".join(rng.choice(["python", "sql", "aws"] if t else ["excel", "vendas", "sap"], 3)) for t in y],
+        "situacao_norm": "prospect",
+        "score_tecnico": rng.random(n),
+    })
+    return X, y
+
+
+GRID = {"prep__text__tfidf__sublinear_tf": [False, True], "clf__C": [0.1, 1.0, 10.0]}
+
+
+def test_stratified_prefixes_keep_class_balance():
+    y = np.array([1] * 30 + [0] * 70)
+    order = _stratified_order(y)
+    assert sorted(order) == list(range(100))
+    assert y[order[:10]].sum() == 3
+
+
+def test_halving_reuses_transformer_outputs(tmp_path):
+    X_tr, y_tr = _data(120, 0)
+    X_val, y_val = _data(40, 1)
+    configs = expand_grid(GRID)
+    assert len(configs) == 6
+
+    cache = TransformCache(tmp_path / "cache")
+    results = successive_halving(configs, X_tr, y_tr, X_val, y_val, cache, min_rows=30, eta=3, verbose=False)
+    assert [(r["rung"], r["n_rows"]) for r in results] == [(0, 30)] * 6 + [(1, 120)] * 2
+    # por rodada, um miss por valor de sublinear_tf; o resto (só C muda) é hit
+    assert [r["cache_hit"] for r in results[:6]] == [False, False, True, True, True, True]
+    assert cache.stats()["misses"] == 2 + len({r["params"]["prep__text__tfidf__sublinear_tf"] for r in results[6:]})
+
+    warm = TransformCache(tmp_path / "cache")
+    again = successive_halving(configs, X_tr, y_tr, X_val, y_val, warm, min_rows=30, eta=3, verbose=False)
+    assert warm.stats()["hit_rate"] == 1.0
+    assert [r["auc_val"] for r in again] == pytest.approx([r["auc_val"] for r in results])
+
+    off = TransformCache(None)
+    cold = successive_halving(configs, X_tr, y_tr, X_val, y_val, off, min_rows=30, eta=3, verbose=False)
+    assert off.stats()["hits"] == 0
+    assert [r["auc_val"] for r in cold] == pytest.approx([r["auc_val"] for r in results])
+
+
+def test_build_dataset_uses_baseline_labels(monkeypatch):
+    import src.tune as tune
+
+    n = 20
+    pairs = pd.DataFrame({
+        "vaga_code": "V1",
+        "candidato_code": [str(i) for i in range(n)],
+        "job_text": "python", "cand_text": "python", "situacao_norm": "",
+        "score_tecnico": np.linspace(0, 1, n),
+        "y_status": pd.array([pd.NA] * n, dtype="Int8"),
+        "y": pd.array([1, 0] + [pd.NA] * (n - 2), dtype="Int8"),
+    })
+    monkeypatch.setattr(tune, "load_pairs", lambda: (pairs.copy(), {}))
+    df = tune.build_dataset()
+    # weak labels pelos extremos do score (como train_baseline), não só os 2 rótulos explícitos
+    assert len(df) > 2 and set(df["y"]) == {0, 1}
+    assert df.loc[df["score_tecnico"] == 1.0, "y"].item() == 1